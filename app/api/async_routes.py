@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+import time
+
+from app.api import handlers
+from app.api.deps import get_async_connection
+from app.api.schemas import (
+    BulkOfferRequest,
+    BulkOfferResponse,
+    OfferRequest,
+    OfferResponse,
+    OrderListResponse,
+    OrderResponse,
+    OrderStartRequest,
+)
+from app.repository.db.database import AsyncLazyConnection
+from app.services import offers as offers_service
+from app.services import orders as orders_service
+from app.static_config import static_config
+from app.metrics import logger
+
+# Same API as app.api.routes, served on the event loop with the async DB pool (API_MODE=async).
+router = APIRouter()
+
+@router.post("/offers", response_model=OfferResponse)
+async def create_offer(request: OfferRequest):
+    with handlers.observe("POST", "/offers"):
+        logger.info("api: POST /offers", scooter_id=request.scooter_id, user_id=request.user_id)
+        calc_start = time.time()
+        result = await offers_service.create_offer_async(request.scooter_id, request.user_id, static_config)
+        return handlers.offer_response(request, result, calc_start)
+
+
+@router.post("/offers/bulk", response_model=BulkOfferResponse)
+async def create_offers_bulk(request: BulkOfferRequest):
+    with handlers.observe("POST", "/offers/bulk"):
+        logger.info("api: POST /offers/bulk", user_id=request.user_id, scooters=len(request.scooter_ids))
+        calc_start = time.time()
+        result = await offers_service.create_offers_bulk_async(request.scooter_ids, request.user_id, static_config)
+        return handlers.bulk_offer_response(request, result, calc_start)
+
+
+@router.post("/orders", response_model=OrderResponse)
+async def create_order(request: OrderStartRequest, conn: AsyncLazyConnection = Depends(get_async_connection)):
+    with handlers.observe("POST", "/orders"), handlers.bad_request(
+        "POST", "/orders", "api: create_order validation failed"
+    ):
+        logger.info(
+            "api: POST /orders",
+            offer_id=request.offer.id,
+            user_id=request.offer.user_id,
+            scooter_id=request.offer.scooter_id,
+        )
+        order = await orders_service.start_order_async(
+            request.offer.to_dataclass(), request.pricing_token, conn, static_config
+        )
+        return handlers.started_order_response(order)
+
+
+@router.post("/orders/{order_id}/finish", response_model=OrderResponse)
+async def finish_order(order_id: str, conn: AsyncLazyConnection = Depends(get_async_connection)):
+    with handlers.observe("POST", "/orders/finish"):
+        logger.info("api: POST /orders/finish", order_id=order_id)
+        try:
+            order = await orders_service.finish_order_async(order_id, conn, static_config)
+        except KeyError:
+            raise handlers.not_found("POST", "/orders/finish", "api: finish_order not found", order_id=order_id)
+        return handlers.finished_order_response(order)
+
+
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: str, conn: AsyncLazyConnection = Depends(get_async_connection)):
+    with handlers.observe("GET", "/orders/{order_id}"):
+        logger.info("api: GET /orders", order_id=order_id)
+        order = await orders_service.get_order_async(order_id, conn, static_config)
+        return handlers.order_response(order_id, order)
+
+
+@router.get("/users/{user_id}/orders", response_model=OrderListResponse)
+async def list_user_orders(
+    user_id: str,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    conn: AsyncLazyConnection = Depends(get_async_connection),
+):
+    with handlers.observe("GET", "/users/{user_id}/orders"), handlers.bad_request(
+        "GET", "/users/{user_id}/orders", "api: list_user_orders validation failed", user_id=user_id
+    ):
+        logger.info("api: GET /users/orders", user_id=user_id, cursor=cursor)
+        orders, next_cursor = await orders_service.list_user_orders_async(
+            user_id, conn, static_config, created_from, created_to, limit, cursor
+        )
+        return handlers.user_orders_response(orders, next_cursor)
@@ -1,13 +1,17 @@
 import structlog
-from typing import Iterator
+from typing import AsyncIterator, Iterator
 
-from psycopg import Connection
-
-from app.repository.db.database import connection
+from app.repository.db.database import AsyncLazyConnection, LazyConnection, async_lazy_connection, lazy_connection
 
 logger = structlog.get_logger(__name__)
 
-def get_connection() -> Iterator[Connection]:
-    logger.debug("deps: acquiring db connection for request")
-    with connection() as conn:
+def get_connection() -> Iterator[LazyConnection]:
+    logger.debug("deps: preparing lazy db connection for request")
+    with lazy_connection() as conn:
+        yield conn
+
+
+async def get_async_connection() -> AsyncIterator[AsyncLazyConnection]:
+    logger.debug("deps: preparing lazy async db connection for request")
+    async with async_lazy_connection() as conn:
         yield conn
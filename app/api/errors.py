@@ -0,0 +1,42 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import httpx
+import structlog
+
+from app.clients.resilience import UpstreamUnavailable
+from app.utils.deadline import DeadlineExceeded
+
+logger = structlog.get_logger(__name__)
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """
+    Maps upstream failures to "try again later" responses (504 for timeouts, 503 otherwise).
+    """
+
+    @app.exception_handler(DeadlineExceeded)
+    def _deadline_exceeded(request: Request, exc: DeadlineExceeded):
+        logger.warning("app: request deadline exceeded", path=request.url.path, detail=str(exc))
+        return JSONResponse(status_code=504, content={"detail": "upstream deadline exceeded, try again later"})
+
+    @app.exception_handler(UpstreamUnavailable)
+    def _upstream_unavailable(request: Request, exc: UpstreamUnavailable):
+        logger.warning("app: upstream unavailable", path=request.url.path, service=exc.service, reason=exc.reason)
+        return JSONResponse(status_code=503, content={"detail": f"{exc.service} is unavailable, try again later"})
+
+    @app.exception_handler(httpx.TimeoutException)
+    def _upstream_timeout(request: Request, exc: httpx.TimeoutException):
+        logger.warning("app: upstream timed out", path=request.url.path, detail=str(exc), url=_url(exc))
+        return JSONResponse(status_code=504, content={"detail": "upstream timed out, try again later"})
+
+    @app.exception_handler(httpx.TransportError)
+    def _upstream_transport_error(request: Request, exc: httpx.TransportError):
+        logger.warning("app: upstream transport error", path=request.url.path, detail=str(exc), url=_url(exc))
+        return JSONResponse(status_code=503, content={"detail": "upstream is unavailable, try again later"})
+
+
+def _url(exc: httpx.TransportError) -> str | None:
+    try:
+        return str(exc.request.url)
+    except RuntimeError:
+        return None
@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import time
+
+from fastapi import HTTPException
+
+from app.api.schemas import (
+    BulkOfferItem,
+    BulkOfferRequest,
+    BulkOfferResponse,
+    OfferRequest,
+    OfferResponse,
+    OfferPayload,
+    OrderListResponse,
+    OrderResponse,
+)
+from app.models import OrderData
+from app.services import offers as offers_service
+from app.metrics import METRICS, logger
+
+# Result and error mapping shared by the sync (routes.py) and async (async_routes.py) handlers.
+
+
+def count_request(method: str, endpoint: str, status: int) -> None:
+    METRICS['api_requests_total'].labels(method=method, endpoint=endpoint, status=str(status)).inc()
+
+
+@contextmanager
+def observe(method: str, endpoint: str) -> Iterator[None]:
+    start = time.time()
+    try:
+        yield
+    finally:
+        METRICS['api_latency_seconds'].labels(method=method, endpoint=endpoint).observe(time.time() - start)
+
+
+@contextmanager
+def bad_request(method: str, endpoint: str, event: str, **log) -> Iterator[None]:
+    try:
+        yield
+    except ValueError as exc:
+        logger.warning(event, detail=str(exc), **log)
+        count_request(method, endpoint, 400)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def not_found(method: str, endpoint: str, event: str, **log) -> HTTPException:
+    logger.warning(event, **log)
+    count_request(method, endpoint, 404)
+    return HTTPException(status_code=404, detail="order not found")
+
+
+def offer_response(request: OfferRequest, result, calc_start: float) -> OfferResponse:
+    METRICS['offer_calculation_duration'].observe(time.time() - calc_start)
+    if isinstance(result, offers_service.CreateOfferError):
+        logger.warning("api: create_offer failed", user_id=request.user_id, reason=result.message)
+        METRICS['offer_conversions_total'].labels(status="fail").inc()
+        count_request("POST", "/offers", 400)
+        return OfferResponse(error=result.message)
+
+    offer, token = result
+    logger.info("api: create_offer success", offer_id=offer.id, user_id=request.user_id)
+    METRICS['offer_conversions_total'].labels(status="success").inc()
+    count_request("POST", "/offers", 200)
+    return OfferResponse(offer=OfferPayload.from_dataclass(offer), pricing_token=token)
+
+
+def bulk_offer_response(request: BulkOfferRequest, result, calc_start: float) -> BulkOfferResponse:
+    METRICS['offer_calculation_duration'].observe(time.time() - calc_start)
+    if isinstance(result, offers_service.CreateOfferError):
+        logger.warning("api: create_offers_bulk failed", user_id=request.user_id, reason=result.message)
+        count_request("POST", "/offers/bulk", 400)
+        return BulkOfferResponse(error=result.message)
+
+    items = []
+    for scooter_id, offer_result in result:
+        if isinstance(offer_result, offers_service.CreateOfferError):
+            METRICS['offer_conversions_total'].labels(status="fail").inc()
+            items.append(BulkOfferItem(scooter_id=scooter_id, error=offer_result.message))
+            continue
+        offer, token = offer_result
+        METRICS['offer_conversions_total'].labels(status="success").inc()
+        items.append(
+            BulkOfferItem(scooter_id=scooter_id, offer=OfferPayload.from_dataclass(offer), pricing_token=token)
+        )
+    logger.info("api: create_offers_bulk success", user_id=request.user_id, offers=len(items))
+    count_request("POST", "/offers/bulk", 200)
+    return BulkOfferResponse(offers=items)
+
+
+def started_order_response(order: OrderData) -> OrderResponse:
+    logger.info("api: create_order success", order_id=order.id, user_id=order.user_id)
+    count_request("POST", "/orders", 200)
+    return OrderResponse.from_dataclass(order)
+
+
+def finished_order_response(order: OrderData) -> OrderResponse:
+    logger.info("api: finish_order success", order_id=order.id)
+    count_request("POST", "/orders/finish", 200)
+    return OrderResponse.from_dataclass(order)
+
+
+def order_response(order_id: str, order: Optional[OrderData]) -> OrderResponse:
+    if order is None:
+        raise not_found("GET", "/orders/{order_id}", "api: get_order not found", order_id=order_id)
+    logger.info(
+        "api: order retrieved successfully",
+        order_id=order_id,
+        order_status="active" if order.finish_time is None else "finished",
+    )
+    count_request("GET", "/orders/{order_id}", 200)
+    return OrderResponse.from_dataclass(order)
+
+
+def user_orders_response(orders: list[OrderData], next_cursor: Optional[str]) -> OrderListResponse:
+    count_request("GET", "/users/{user_id}/orders", 200)
+    return OrderListResponse(orders=[OrderResponse.from_dataclass(order) for order in orders], next_cursor=next_cursor)
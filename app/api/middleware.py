@@ -0,0 +1,37 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+import structlog
+
+from app.static_config import static_config
+from app.utils import deadline
+
+logger = structlog.get_logger(__name__)
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+_request_settings = getattr(static_config, "request_settings", {}) or {}
+_REQUEST_TIMEOUT_SECONDS = float(_request_settings.get("timeout_seconds", 5.0))
+
+
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """
+    Starts the request deadline that upstream calls are bounded by.
+    Clients may shorten it with `X-Request-Timeout-Ms`; it never exceeds the configured request timeout.
+    """
+
+    def _timeout(self, request: Request) -> float:
+        header = request.headers.get(DEADLINE_HEADER)
+        if header is None:
+            return _REQUEST_TIMEOUT_SECONDS
+        try:
+            return min(_REQUEST_TIMEOUT_SECONDS, max(0.0, float(header) / 1000))
+        except ValueError:
+            logger.warning("middleware: invalid deadline header", value=header)
+            return _REQUEST_TIMEOUT_SECONDS
+
+    async def dispatch(self, request: Request, call_next):
+        token = deadline.set_deadline(self._timeout(request))
+        try:
+            return await call_next(request)
+        finally:
+            deadline.reset_deadline(token)
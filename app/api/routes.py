@@ -1,47 +1,51 @@
-from copy import deepcopy
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends
 from psycopg import Connection
-import structlog
 import time
 
+from app.api import handlers
 from app.api.deps import get_connection
-from app.api.schemas import OfferRequest, OfferResponse, OfferPayload, OrderResponse, OrderStartRequest
+from app.api.schemas import (
+    BulkOfferRequest,
+    BulkOfferResponse,
+    OfferRequest,
+    OfferResponse,
+    OrderListResponse,
+    OrderResponse,
+    OrderStartRequest,
+)
 from app.services import offers as offers_service
 from app.services import orders as orders_service
 from app.static_config import static_config
-from app.metrics import METRICS, logger
+from app.metrics import logger
 
 router = APIRouter()
 
 @router.post("/offers", response_model=OfferResponse)
 def create_offer(request: OfferRequest):
-    start = time.time()
-    offer_calc_start = time.time()
-    try:
+    with handlers.observe("POST", "/offers"):
         logger.info("api: POST /offers", scooter_id=request.scooter_id, user_id=request.user_id)
-        result = offers_service.create_offer(request.scooter_id, request.user_id, static_config.clone())
-        METRICS['offer_calculation_duration'].observe(time.time() - offer_calc_start)
-
-        if isinstance(result, offers_service.CreateOfferError):
-            logger.warning("api: create_offer failed", user_id=request.user_id, reason=result.message)
-            METRICS['offer_conversions_total'].labels(status="fail").inc()
-            METRICS['api_requests_total'].labels(method="POST", endpoint="/offers", status="400").inc()
-            return OfferResponse(error=result.message)
+        calc_start = time.time()
+        result = offers_service.create_offer(request.scooter_id, request.user_id, static_config)
+        return handlers.offer_response(request, result, calc_start)
 
-        offer, token = result
-        logger.info("api: create_offer success", offer_id=offer.id, user_id=request.user_id)
-        METRICS['offer_conversions_total'].labels(status="success").inc()
-        METRICS['api_requests_total'].labels(method="POST", endpoint="/offers", status="200").inc()
-        return OfferResponse(offer=OfferPayload.from_dataclass(offer), pricing_token=token)
-    finally:
-        METRICS['api_latency_seconds'].labels(method="POST", endpoint="/offers").observe(time.time() - start)
 
+@router.post("/offers/bulk", response_model=BulkOfferResponse)
+def create_offers_bulk(request: BulkOfferRequest):
+    with handlers.observe("POST", "/offers/bulk"):
+        logger.info("api: POST /offers/bulk", user_id=request.user_id, scooters=len(request.scooter_ids))
+        calc_start = time.time()
+        result = offers_service.create_offers_bulk(request.scooter_ids, request.user_id, static_config)
+        return handlers.bulk_offer_response(request, result, calc_start)
 
 
 @router.post("/orders", response_model=OrderResponse)
 def create_order(request: OrderStartRequest, conn: Connection = Depends(get_connection)):
-    start = time.time()
-    try:
+    with handlers.observe("POST", "/orders"), handlers.bad_request(
+        "POST", "/orders", "api: create_order validation failed"
+    ):
         logger.info(
             "api: POST /orders",
             offer_id=request.offer.id,
@@ -49,54 +53,44 @@ def create_order(request: OrderStartRequest, conn: Connection = Depends(get_conn
             scooter_id=request.offer.scooter_id,
         )
         order = orders_service.start_order(
-            request.offer.to_dataclass(), request.pricing_token, conn, static_config.clone()
+            request.offer.to_dataclass(), request.pricing_token, conn, static_config
         )
-        logger.info("api: create_order success", order_id=order.id, user_id=order.user_id)
-        METRICS['api_requests_total'].labels(method="POST", endpoint="/orders", status="200").inc()
-        return OrderResponse.from_dataclass(order)
-    except ValueError as exc:
-        logger.warning("api: create_order validation failed", detail=str(exc))
-        METRICS['api_requests_total'].labels(method="POST", endpoint="/orders", status="400").inc()
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    finally:
-        METRICS['api_latency_seconds'].labels(method="POST", endpoint="/orders").observe(time.time() - start)
+        return handlers.started_order_response(order)
 
 
 @router.post("/orders/{order_id}/finish", response_model=OrderResponse)
 def finish_order(order_id: str, conn: Connection = Depends(get_connection)):
-    start = time.time()
-    try:
+    with handlers.observe("POST", "/orders/finish"):
         logger.info("api: POST /orders/finish", order_id=order_id)
-        order = orders_service.finish_order(order_id, conn, static_config.clone())
-        logger.info("api: finish_order success", order_id=order_id)
-        METRICS['api_requests_total'].labels(method="POST", endpoint="/orders/finish", status="200").inc()
-        return OrderResponse.from_dataclass(order)
-    except KeyError:
-        logger.warning("api: finish_order not found", order_id=order_id)
-        METRICS['api_requests_total'].labels(method="POST", endpoint="/orders/finish", status="404").inc()
-        raise HTTPException(status_code=404, detail="order not found")
-    finally:
-        METRICS['api_latency_seconds'].labels(method="POST", endpoint="/orders/finish").observe(time.time() - start)
+        try:
+            order = orders_service.finish_order(order_id, conn, static_config)
+        except KeyError:
+            raise handlers.not_found("POST", "/orders/finish", "api: finish_order not found", order_id=order_id)
+        return handlers.finished_order_response(order)
+
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 def get_order(order_id: str, conn: Connection = Depends(get_connection)):
-    start = time.time()
-    try:
+    with handlers.observe("GET", "/orders/{order_id}"):
         logger.info("api: GET /orders", order_id=order_id)
-        order = orders_service.get_order(order_id, conn, static_config.clone())
-        if order is None:
-            logger.warning("api: get_order not found", order_id=order_id)
-            METRICS['api_requests_total'].labels(method="GET", endpoint="/orders/{order_id}", status="404").inc()
-            raise HTTPException(status_code=404, detail="order not found")
-        logger.info(
-            "api: order retrieved successfully",
-            order_id=order_id,
-            order_status="active" if order.finish_time is None else "finished",
-            from_cache=getattr(order, 'from_cache', False)
+        order = orders_service.get_order(order_id, conn, static_config)
+        return handlers.order_response(order_id, order)
+
+
+@router.get("/users/{user_id}/orders", response_model=OrderListResponse)
+def list_user_orders(
+    user_id: str,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    conn: Connection = Depends(get_connection),
+):
+    with handlers.observe("GET", "/users/{user_id}/orders"), handlers.bad_request(
+        "GET", "/users/{user_id}/orders", "api: list_user_orders validation failed", user_id=user_id
+    ):
+        logger.info("api: GET /users/orders", user_id=user_id, cursor=cursor)
+        orders, next_cursor = orders_service.list_user_orders(
+            user_id, conn, static_config, created_from, created_to, limit, cursor
         )
-        METRICS['api_requests_total'].labels(method="GET", endpoint="/orders/{order_id}", status="200").inc()
-        if hasattr(order, 'from_cache'):
-            METRICS['cache_hit_ratio'].labels(hit="true" if order.from_cache else "false").inc()
-        return OrderResponse.from_dataclass(order)
-    finally:
-        METRICS['api_latency_seconds'].labels(method="GET", endpoint="/orders/{order_id}").observe(time.time() - start)
+        return handlers.user_orders_response(orders, next_cursor)
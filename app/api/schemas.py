@@ -34,6 +34,23 @@ class OfferResponse(BaseModel):
     error: str | None = None
 
 
+class BulkOfferRequest(BaseModel):
+    user_id: str
+    scooter_ids: list[str]
+
+
+class BulkOfferItem(BaseModel):
+    scooter_id: str
+    offer: OfferPayload | None = None
+    pricing_token: str | None = None
+    error: str | None = None
+
+
+class BulkOfferResponse(BaseModel):
+    offers: list[BulkOfferItem] = []
+    error: str | None = None
+
+
 class OrderStartRequest(BaseModel):
     offer: OfferPayload
     pricing_token: str
@@ -57,3 +74,8 @@ class OrderResponse(BaseModel):
         payload["start_time"] = order.start_time.isoformat()
         payload["finish_time"] = order.finish_time.isoformat() if order.finish_time else None
         return cls(**payload)
+
+
+class OrderListResponse(BaseModel):
+    orders: list[OrderResponse] = []
+    next_cursor: Optional[str] = None
@@ -0,0 +1,95 @@
+import asyncio
+import contextvars
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _PendingBatch:
+    def __init__(self):
+        self.futures: dict = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Collects single-key lookups issued within `max_wait` seconds (or until `max_batch_size` distinct keys)
+    and resolves them with one `load_batch` call. Duplicate keys in a window share one result.
+
+    Batches are dispatched in an empty context, so they are bounded by the upstream timeouts rather than
+    by the deadline of whichever request happened to open the window.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_batch: Callable[[list[K]], Awaitable[dict[K, V]]],
+        max_batch_size: int = 50,
+        max_wait: float = 0.005,
+    ):
+        self.name = name
+        self._load_batch = load_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingBatch]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _batch(self, loop: asyncio.AbstractEventLoop) -> _PendingBatch:
+        with self._lock:
+            batch = self._pending.get(loop)
+            if batch is None:
+                batch = self._pending[loop] = _PendingBatch()
+            return batch
+
+    async def load(self, key: K) -> V:
+        loop = asyncio.get_running_loop()
+        batch = self._batch(loop)
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            if len(batch.futures) >= self.max_batch_size:
+                self._flush(loop)
+            elif batch.timer is None:
+                batch.timer = loop.call_later(self.max_wait, self._flush, loop, context=contextvars.Context())
+        return await asyncio.shield(future)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            batch = self._pending.pop(loop, None)
+        if batch is None or not batch.futures:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        loop.create_task(self._dispatch(batch.futures), context=contextvars.Context())
+
+    async def _dispatch(self, futures: dict) -> None:
+        keys = list(futures)
+        logger.debug("batching: dispatching batch", batcher=self.name, size=len(keys))
+        try:
+            results = await self._load_batch(keys)
+        except Exception as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            # the dispatch itself was cancelled (e.g. loop shutdown): don't leave callers waiting forever
+            for future in futures.values():
+                future.cancel()
+            raise
+        for key, future in futures.items():
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(LookupError(f"{self.name}: no result for {key!r}"))
@@ -1,47 +1,118 @@
-import os
-import requests
+import asyncio
+import httpx
 import structlog
 import time
 
+from app.clients import http
+from app.clients.batching import MicroBatcher
 from app.models import TariffZone, UserProfile, ScooterData, ConfigMap
 from app.metrics import METRICS, measure_external_call
 
-BASE_URL = os.environ.get("EXTERNAL_BASE_URL", "http://localhost:3629")
-
-scooter_http = f'{BASE_URL}/scooter-data'
-tariff_zone_http = f'{BASE_URL}/tariff-zone-data'
-user_http = f'{BASE_URL}/user-profile'
-config_http = f'{BASE_URL}/configs'
-hold_money_http = f'{BASE_URL}/hold-money-for-order'
-clear_money_http = f'{BASE_URL}/clear-money-for-order'
+scooter_http = '/scooter-data'
+scooter_batch_http = '/scooter-data/batch'
+tariff_zone_http = '/tariff-zone-data'
+tariff_zone_batch_http = '/tariff-zone-data/batch'
+user_http = '/user-profile'
+config_http = '/configs'
+hold_money_http = '/hold-money-for-order'
+clear_money_http = '/clear-money-for-order'
 
 logger = structlog.get_logger(__name__)
 
 
-@measure_external_call("get_scooter_data")
-def get_scooter_data(scooter_id: str) -> ScooterData:
-    logger.debug("data_requests: fetching scooter data", scooter_id=scooter_id, url=scooter_http)
-    raw_data = requests.get(scooter_http, params={'id': scooter_id}).json()
-    logger.debug("data_requests: fetched scooter data", scooter_id=scooter_id, data=raw_data)
+def _scooter_data(scooter_id: str, raw_data: dict) -> ScooterData:
     return ScooterData(id=scooter_id, zone_id=raw_data.get('zone_id', ''),
                        charge=int(raw_data.get('charge', 0)))
 
 
-@measure_external_call("get_tariff_zone")
-def get_tariff_zone(zone_id: str) -> TariffZone:
-    logger.debug("data_requests: fetching tariff zone data", zone_id=zone_id, url=tariff_zone_http)
-    raw_data = requests.get(tariff_zone_http, params={'id': zone_id}).json()
-    logger.debug("data_requests: fetched tariff zone data", zone_id=zone_id, data=raw_data)
+def _tariff_zone(zone_id: str, raw_data: dict) -> TariffZone:
     return TariffZone(id=zone_id,
                       price_per_minute=int(raw_data.get('price_per_minute', 0)),
                       price_unlock=int(raw_data.get('price_unlock', 0)),
                       default_deposit=int(raw_data.get('default_deposit', 0)))
 
 
+def _micro_batcher(service: str, load_batch) -> MicroBatcher:
+    settings = http.upstream_settings(service)
+    return MicroBatcher(
+        service,
+        load_batch,
+        max_batch_size=int(settings.get("batch_max_size", 50)),
+        max_wait=float(settings.get("batch_max_wait_ms", 5)) / 1000,
+    )
+
+
+@measure_external_call("get_scooter_data")
+async def _fetch_scooter_data(scooter_id: str) -> ScooterData:
+    logger.debug("data_requests: fetching scooter data", scooter_id=scooter_id, url=scooter_http)
+    raw_data = (await http.request("scooters", "GET", scooter_http, params={'id': scooter_id})).json()
+    logger.debug("data_requests: fetched scooter data", scooter_id=scooter_id, data=raw_data)
+    return _scooter_data(scooter_id, raw_data)
+
+
+@measure_external_call("get_scooters_data")
+async def get_scooters_data_async(scooter_ids: list[str]) -> dict[str, ScooterData]:
+    """
+    Fetches many scooters in one call; the result is keyed by scooter id.
+    """
+    ids = list(dict.fromkeys(scooter_ids))
+    if not ids:
+        return {}
+    logger.debug("data_requests: fetching scooters data", count=len(ids), url=scooter_batch_http)
+    raw_items = (await http.request("scooters", "POST", scooter_batch_http, json={'ids': ids})).json()
+    logger.debug("data_requests: fetched scooters data", count=len(raw_items))
+    return {item['id']: _scooter_data(item['id'], item) for item in raw_items}
+
+
+@measure_external_call("get_tariff_zone")
+async def _fetch_tariff_zone(zone_id: str) -> TariffZone:
+    logger.debug("data_requests: fetching tariff zone data", zone_id=zone_id, url=tariff_zone_http)
+    raw_data = (await http.request("zones", "GET", tariff_zone_http, params={'id': zone_id})).json()
+    logger.debug("data_requests: fetched tariff zone data", zone_id=zone_id, data=raw_data)
+    return _tariff_zone(zone_id, raw_data)
+
+
+@measure_external_call("get_tariff_zones")
+async def get_tariff_zones_async(zone_ids: list[str]) -> dict[str, TariffZone]:
+    """
+    Fetches many tariff zones in one call; the result is keyed by zone id.
+    """
+    ids = list(dict.fromkeys(zone_ids))
+    if not ids:
+        return {}
+    logger.debug("data_requests: fetching tariff zones data", count=len(ids), url=tariff_zone_batch_http)
+    raw_items = (await http.request("zones", "POST", tariff_zone_batch_http, json={'ids': ids})).json()
+    logger.debug("data_requests: fetched tariff zones data", count=len(raw_items))
+    return {item['id']: _tariff_zone(item['id'], item) for item in raw_items}
+
+
+_scooter_batcher = _micro_batcher("scooters", get_scooters_data_async)
+_tariff_zone_batcher = _micro_batcher("zones", get_tariff_zones_async)
+
+
+async def get_scooter_data_async(scooter_id: str) -> ScooterData:
+    """
+    Single scooter lookup. With `micro_batching` enabled for scooters, concurrent lookups within
+    `batch_max_wait_ms` are sent upstream as one batch call.
+    """
+    if http.upstream_settings("scooters").get("micro_batching"):
+        return await _scooter_batcher.load(scooter_id)
+    return await _fetch_scooter_data(scooter_id)
+
+
+async def get_tariff_zone_async(zone_id: str) -> TariffZone:
+    """
+    Single tariff zone lookup, micro-batched like `get_scooter_data_async` when enabled for zones.
+    """
+    if http.upstream_settings("zones").get("micro_batching"):
+        return await _tariff_zone_batcher.load(zone_id)
+    return await _fetch_tariff_zone(zone_id)
+
+
 @measure_external_call("get_user_profile")
-def get_user_profile(user_id: str) -> UserProfile:
+async def get_user_profile_async(user_id: str) -> UserProfile:
     logger.debug("data_requests: fetching user profile", user_id=user_id, url=user_http)
-    raw_data = requests.get(user_http, params={'id': user_id}).json()
+    raw_data = (await http.request("users", "GET", user_http, params={'id': user_id})).json()
     logger.debug("data_requests: fetched user profile", user_id=user_id, data=raw_data)
     return UserProfile(
         id=user_id,
@@ -55,90 +126,128 @@ def get_user_profile(user_id: str) -> UserProfile:
 
 
 @measure_external_call("get_configs")
-def get_configs() -> ConfigMap:
+async def get_configs_async() -> ConfigMap:
     logger.debug("data_requests: fetching configs", url=config_http)
-    raw_data = requests.get(config_http)
-    logger.debug("data_requests: fetched configs", data=raw_data.json())
-    return ConfigMap(raw_data.json())
-
-
-@measure_external_call("hold_money")
-def hold_money_for_order(user_id: str, order_id: str, amount: int):
-    logger.info("data_requests: holding money for order", user_id=user_id, order_id=order_id, amount=amount)
-
-    for _ in range(3):
+    raw_data = (await http.request("configs", "GET", config_http)).json()
+    logger.debug("data_requests: fetched configs", data=raw_data)
+    return ConfigMap(raw_data)
+
+
+async def _post_money(operation: str, url: str, user_id: str, order_id: str, amount: int) -> bool:
+    """
+    Posts a payment operation, retrying failures with jittered exponential backoff while the deadline allows.
+    Returns whether the payments service confirmed the operation; the last transport error is re-raised
+    when no attempt received a response at all.
+    """
+    attempts = int(http.upstream_settings("payments").get("retry_attempts", 3))
+    responded = False
+    last_error: httpx.TransportError | None = None
+    for attempt in range(1, attempts + 1):
         start = time.time()
-        resp = requests.post(
-            hold_money_http,
-            json={'user_id': user_id, 'order_id': order_id, 'amount': amount}
-        )
-        duration = time.time() - start
-
-        logger.debug(
-            "data_requests: hold money attempt",
-            status_code=resp.status_code,
-            duration_ms=round(duration * 1000, 2),
-            attempt=_ + 1
-        )
-
-        if resp.status_code == 200:
-            METRICS["payment_hold_success_total"].inc()
-            logger.info(
-                "data_requests: money hold success",
+        try:
+            resp = await http.request(
+                "payments", "POST", url,
+                json={'user_id': user_id, 'order_id': order_id, 'amount': amount}
+            )
+        except httpx.TransportError as exc:
+            last_error = exc
+            METRICS["payment_failures_total"].labels(reason=f"{operation}_error").inc()
+            logger.warning(
+                f"data_requests: money {operation} transport error",
                 user_id=user_id,
                 order_id=order_id,
-                amount=amount,
-                duration_ms=round(duration * 1000, 2)
+                error=str(exc),
+                attempt=attempt
+            )
+        else:
+            responded = True
+            duration = time.time() - start
+
+            logger.debug(
+                f"data_requests: {operation} money attempt",
+                status_code=resp.status_code,
+                duration_ms=round(duration * 1000, 2),
+                attempt=attempt
             )
-            return
-
-        METRICS["payment_failures_total"].labels(reason="hold_failed").inc()
-        logger.warning(
-            "data_requests: money hold failed",
-            user_id=user_id,
-            order_id=order_id,
-            amount=amount,
-            status_code=resp.status_code,
-            attempt=_ + 1
-        )
-
-@measure_external_call("clear_money")
-def clear_money_for_order(user_id: str, order_id: str, amount: int):
-    logger.info("data_requests: clearing money for order", user_id=user_id, order_id=order_id, amount=amount)
 
-    for _ in range(3):
-        start = time.time()
-        resp = requests.post(
-            clear_money_http,
-            json={'user_id': user_id, 'order_id': order_id, 'amount': amount}
-        )
-        duration = time.time() - start
-
-        logger.debug(
-            "data_requests: clear money attempt",
-            status_code=resp.status_code,
-            duration_ms=round(duration * 1000, 2),
-            attempt=_ + 1
-        )
-
-        if resp.status_code == 200:
-            METRICS["payment_clear_success_total"].inc()
-            logger.info(
-                "data_requests: money clear success",
+            if resp.status_code == 200:
+                METRICS[f"payment_{operation}_success_total"].inc()
+                logger.info(
+                    f"data_requests: money {operation} success",
+                    user_id=user_id,
+                    order_id=order_id,
+                    amount=amount,
+                    duration_ms=round(duration * 1000, 2)
+                )
+                return True
+
+            METRICS["payment_failures_total"].labels(reason=f"{operation}_failed").inc()
+            logger.warning(
+                f"data_requests: money {operation} failed",
                 user_id=user_id,
                 order_id=order_id,
                 amount=amount,
-                duration_ms=round(duration * 1000, 2)
+                status_code=resp.status_code,
+                attempt=attempt
+            )
+
+        if attempt == attempts:
+            break
+        delay = http.backoff_delay("payments", attempt)
+        if not http.can_retry("payments", delay):
+            logger.warning(
+                f"data_requests: money {operation} retry budget exhausted",
+                user_id=user_id,
+                order_id=order_id,
+                attempt=attempt
             )
-            return
-
-        METRICS["payment_failures_total"].labels(reason="clear_failed").inc()
-        logger.warning(
-            "data_requests: money clear failed",
-            user_id=user_id,
-            order_id=order_id,
-            amount=amount,
-            status_code=resp.status_code,
-            attempt=_ + 1
-        )
+            break
+        await asyncio.sleep(delay)
+
+    if last_error is not None and not responded:
+        raise last_error
+    return False
+
+
+@measure_external_call("hold_money")
+async def hold_money_for_order_async(user_id: str, order_id: str, amount: int) -> bool:
+    logger.info("data_requests: holding money for order", user_id=user_id, order_id=order_id, amount=amount)
+    return await _post_money("hold", hold_money_http, user_id, order_id, amount)
+
+
+@measure_external_call("clear_money")
+async def clear_money_for_order_async(user_id: str, order_id: str, amount: int) -> bool:
+    logger.info("data_requests: clearing money for order", user_id=user_id, order_id=order_id, amount=amount)
+    return await _post_money("clear", clear_money_http, user_id, order_id, amount)
+
+
+def get_scooter_data(scooter_id: str) -> ScooterData:
+    return http.run_sync(get_scooter_data_async(scooter_id))
+
+
+def get_scooters_data(scooter_ids: list[str]) -> dict[str, ScooterData]:
+    return http.run_sync(get_scooters_data_async(scooter_ids))
+
+
+def get_tariff_zone(zone_id: str) -> TariffZone:
+    return http.run_sync(get_tariff_zone_async(zone_id))
+
+
+def get_tariff_zones(zone_ids: list[str]) -> dict[str, TariffZone]:
+    return http.run_sync(get_tariff_zones_async(zone_ids))
+
+
+def get_user_profile(user_id: str) -> UserProfile:
+    return http.run_sync(get_user_profile_async(user_id))
+
+
+def get_configs() -> ConfigMap:
+    return http.run_sync(get_configs_async())
+
+
+def hold_money_for_order(user_id: str, order_id: str, amount: int) -> bool:
+    return http.run_sync(hold_money_for_order_async(user_id, order_id, amount))
+
 
+def clear_money_for_order(user_id: str, order_id: str, amount: int) -> bool:
+    return http.run_sync(clear_money_for_order_async(user_id, order_id, amount))
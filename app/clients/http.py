@@ -0,0 +1,204 @@
+import asyncio
+import os
+import random
+import threading
+import weakref
+from typing import Any, Awaitable, Optional, TypeVar
+
+import httpx
+import structlog
+
+from app.clients import resilience
+from app.static_config import static_config
+from app.utils import deadline
+
+BASE_URL = os.environ.get("EXTERNAL_BASE_URL", "http://localhost:3629")
+
+UPSTREAMS = ("scooters", "zones", "users", "configs", "payments")
+
+T = TypeVar("T")
+
+logger = structlog.get_logger(__name__)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def upstream_settings(service: str) -> dict:
+    """
+    Returns settings for one upstream: `default` section of `upstream_settings` overlaid with the service section.
+    """
+    settings = getattr(static_config, "upstream_settings", {}) or {}
+    merged = dict(settings.get("default", {}))
+    merged.update(settings.get(service, {}))
+    return merged
+
+
+def base_url(service: str) -> str:
+    return os.environ.get(f"{service.upper()}_BASE_URL", BASE_URL)
+
+
+def _pool_limits(service: str) -> httpx.Limits:
+    settings = upstream_settings(service)
+    prefix = f"{service.upper()}_HTTP_"
+    return httpx.Limits(
+        max_connections=int(os.getenv(f"{prefix}MAX_CONNECTIONS", settings.get("max_connections", 20))),
+        max_keepalive_connections=int(
+            os.getenv(f"{prefix}MAX_KEEPALIVE", settings.get("max_keepalive_connections", 10))
+        ),
+        keepalive_expiry=float(os.getenv(f"{prefix}KEEPALIVE_EXPIRY", settings.get("keepalive_expiry", 30.0))),
+    )
+
+
+def _create_client(service: str) -> httpx.AsyncClient:
+    limits = _pool_limits(service)
+    logger.info(
+        "http: creating client pool",
+        service=service,
+        base_url=base_url(service),
+        max_connections=limits.max_connections,
+        max_keepalive=limits.max_keepalive_connections,
+    )
+    return httpx.AsyncClient(base_url=base_url(service), limits=limits)
+
+
+def get_client(service: str) -> httpx.AsyncClient:
+    """
+    Returns the keep-alive pool for `service` bound to the running event loop.
+
+    httpx pools cannot be shared between loops, so every loop that talks to upstreams
+    (the client loop behind `run_sync` and, in async mode, the server loop) gets its own set.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(service)
+        if client is None or client.is_closed:
+            client = clients[service] = _create_client(service)
+    return client
+
+
+async def aclose_clients() -> None:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.pop(loop, {})
+    for service, client in clients.items():
+        await client.aclose()
+        logger.info("http: closed client pool", service=service)
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            logger.info("http: starting client event loop")
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_run_loop, args=(_loop,), name="http-client-loop", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Runs `coro` on the shared client loop and blocks until it completes.
+
+    This is the shim for sync callers (threadpool route handlers, scripts); it must not be
+    called from a coroutine, use the async API there instead.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop()).result()
+
+
+def start_clients() -> None:
+    _ensure_loop()
+
+
+def close_clients() -> None:
+    global _loop, _loop_thread
+    with _loop_lock:
+        loop, thread = _loop, _loop_thread
+        _loop, _loop_thread = None, None
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(aclose_clients(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=5)
+    loop.close()
+    logger.info("http: client event loop stopped")
+
+
+def _timeout(service: str, budget: Optional[float]) -> httpx.Timeout:
+    settings = upstream_settings(service)
+    limits = {
+        "connect": float(settings.get("connect_timeout", 0.5)),
+        "read": float(settings.get("read_timeout", 1.0)),
+        "write": float(settings.get("write_timeout", 1.0)),
+        "pool": float(settings.get("pool_timeout", 0.5)),
+    }
+    if budget is not None:
+        limits = {phase: min(value, budget) for phase, value in limits.items()}
+    return httpx.Timeout(**limits)
+
+
+def backoff_delay(service: str, attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the retry after `attempt` (1-based).
+    """
+    settings = upstream_settings(service)
+    base = float(settings.get("retry_backoff_base", 0.05))
+    cap = float(settings.get("retry_backoff_max", 1.0))
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def can_retry(service: str, delay: float) -> bool:
+    """
+    Whether the request deadline leaves room for sleeping `delay` and one more meaningful attempt.
+    """
+    min_budget = float(upstream_settings(service).get("retry_min_budget", 0.2))
+    return deadline.allows(delay + min_budget)
+
+
+async def _send(
+    service: str, method: str, url: str, budget: Optional[float], **kwargs: Any
+) -> httpx.Response:
+    client = get_client(service)
+    if budget is None:
+        return await client.request(method, url, timeout=_timeout(service, None), **kwargs)
+    try:
+        async with asyncio.timeout(budget):
+            return await client.request(method, url, timeout=_timeout(service, budget), **kwargs)
+    except TimeoutError as exc:
+        raise deadline.DeadlineExceeded(f"{service}: deadline exceeded") from exc
+
+
+async def request(service: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Sends a request to `service` with its configured timeouts, bounded by the remaining request deadline.
+
+    Calls go through the service circuit breaker and bulkhead: when the circuit is open or the
+    concurrency limit is reached, UpstreamUnavailable is raised without touching the network.
+    Transport errors, timeouts and 5xx responses count as breaker failures.
+    """
+    deadline.check(service)
+    with resilience.guard(service, upstream_settings(service)) as outcome:
+        try:
+            response = await _send(service, method, url, deadline.remaining(), **kwargs)
+        except (httpx.TransportError, deadline.DeadlineExceeded):
+            outcome.failure()
+            raise
+        if response.status_code >= 500:
+            outcome.failure()
+        else:
+            outcome.success()
+        return response
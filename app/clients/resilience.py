@@ -0,0 +1,203 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import structlog
+
+from app.metrics import METRICS
+
+logger = structlog.get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_GAUGE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class UpstreamUnavailable(Exception):
+    def __init__(self, service: str, reason: str):
+        super().__init__(f"{service}: {reason}")
+        self.service = service
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker shared by all threads and event loops.
+
+    After `failure_threshold` failures in a row the circuit opens and calls are rejected for
+    `reset_timeout` seconds; then up to `half_open_max_calls` probes are let through and the
+    first probe result decides whether the circuit closes or opens again.
+    """
+
+    def __init__(self, service: str, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        Admits a call or raises UpstreamUnavailable; returns whether the admitted call is a half-open probe.
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._reject()
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self._reject()
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self, probe: bool) -> None:
+        """
+        Only a probe closes the circuit: a slow call admitted before it opened does not end the cool-down.
+        """
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            if self._state == CLOSED:
+                self._failures = 0
+            elif self._state == HALF_OPEN and probe:
+                self._failures = 0
+                self._transition(CLOSED)
+
+    def record_failure(self, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def release(self, probe: bool) -> None:
+        """
+        Frees a probe slot of a call that ended without an outcome (e.g. cancelled).
+        """
+        if not probe:
+            return
+        with self._lock:
+            self._probes = max(0, self._probes - 1)
+
+    def _reject(self) -> None:
+        METRICS['upstream_rejections_total'].labels(service=self.service, reason="circuit_open").inc()
+        raise UpstreamUnavailable(self.service, "circuit open")
+
+    def _transition(self, state: str) -> None:
+        logger.warning("resilience: circuit state changed", service=self.service, old=self._state, new=state)
+        self._state = state
+        if state != HALF_OPEN:
+            self._probes = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        METRICS['upstream_circuit_state'].labels(service=self.service).set(_STATE_GAUGE_VALUES[self._state])
+
+
+class Bulkhead:
+    """
+    Caps concurrent in-flight calls to one upstream. A full bulkhead rejects immediately instead of
+    queueing, so callers blocked on a degraded upstream cannot pile up in the worker threadpool.
+    """
+
+    def __init__(self, service: str, max_concurrent: int):
+        self.service = service
+        self.max_concurrent = max_concurrent
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_concurrent:
+                return False
+            self._in_flight += 1
+            METRICS['upstream_in_flight'].labels(service=self.service).set(self._in_flight)
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            METRICS['upstream_in_flight'].labels(service=self.service).set(self._in_flight)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_bulkheads: dict[str, Bulkhead] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(service: str, settings: dict) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(service)
+        if breaker is None:
+            breaker = _breakers[service] = CircuitBreaker(
+                service,
+                failure_threshold=int(settings.get("breaker_failure_threshold", 5)),
+                reset_timeout=float(settings.get("breaker_reset_timeout", 10.0)),
+                half_open_max_calls=int(settings.get("breaker_half_open_max_calls", 1)),
+            )
+        return breaker
+
+
+def get_bulkhead(service: str, settings: dict) -> Bulkhead:
+    with _registry_lock:
+        bulkhead = _bulkheads.get(service)
+        if bulkhead is None:
+            bulkhead = _bulkheads[service] = Bulkhead(
+                service, max_concurrent=int(settings.get("max_concurrent_requests", 32))
+            )
+        return bulkhead
+
+
+class _CallOutcome:
+    def __init__(self, breaker: CircuitBreaker, probe: bool):
+        self._breaker = breaker
+        self._probe = probe
+        self.recorded = False
+
+    def success(self) -> None:
+        self.recorded = True
+        self._breaker.record_success(self._probe)
+
+    def failure(self) -> None:
+        self.recorded = True
+        self._breaker.record_failure(self._probe)
+
+
+@contextmanager
+def guard(service: str, settings: dict) -> Iterator[_CallOutcome]:
+    """
+    Runs one upstream call through the service breaker and bulkhead.
+    The caller reports the outcome via the yielded object; unreported calls only free their slots.
+    """
+    breaker = get_breaker(service, settings)
+    bulkhead = get_bulkhead(service, settings)
+    probe = breaker.before_call()
+    if not bulkhead.try_acquire():
+        breaker.release(probe)
+        METRICS['upstream_rejections_total'].labels(service=service, reason="bulkhead_full").inc()
+        raise UpstreamUnavailable(service, "too many concurrent requests")
+    outcome = _CallOutcome(breaker, probe)
+    try:
+        yield outcome
+    finally:
+        bulkhead.release()
+        if not outcome.recorded:
+            breaker.release(probe)
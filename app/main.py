@@ -1,13 +1,30 @@
+import os
+
 from fastapi import FastAPI
 import structlog
 
+from app.api.errors import register_exception_handlers
+from app.api.middleware import DeadlineMiddleware
+from app.api.async_routes import router as async_api_router
 from app.api.routes import router as api_router
-from app.repository.db.database import init_pool
+from app.clients.http import close_clients, start_clients
+from app.repository.cache import configs as configs_repo
+from app.repository.db import group_commit, summary_writer
+from app.repository.db.database import (
+    close_async_pool,
+    init_async_pool,
+    init_async_replica_pool,
+    init_pool,
+    init_replica_pool,
+)
 from app.logging_config import configure_logging
 from app.metrics import MetricsMiddleware, start_metrics_server
 
 logger = structlog.get_logger(__name__)
 
+# "sync": def handlers in the threadpool on ConnectionPool; "async": handlers on the event loop on AsyncConnectionPool
+API_MODE = os.getenv("API_MODE", "sync")
+
 def create_app() -> FastAPI:
     configure_logging(
         log_level="INFO",
@@ -17,19 +34,45 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     def _startup():
-        logger.info("app: initializing database pool")
-        init_pool()
-        logger.info("Database connection pool initialized")
+        if API_MODE != "async":
+            logger.info("app: initializing database pool")
+            init_pool()
+            init_replica_pool()
+            logger.info("Database connection pool initialized")
+        group_commit.start_writer()
+        summary_writer.start_aggregator()
+        start_clients()
+        logger.info("Upstream HTTP clients initialized")
+        configs_repo.start_refresher()
         start_metrics_server(8001)
         logger.info("Metrics server started")
 
     @app.on_event("shutdown")
     def _shutdown():
         logger.info("Shutting down SuperScooters API")
+        configs_repo.stop_refresher()
+        close_clients()
+        group_commit.stop_writer()
+        summary_writer.stop_aggregator()
+
+    if API_MODE == "async":
+        @app.on_event("startup")
+        async def _startup_async_db():
+            logger.info("app: initializing async database pool")
+            await init_async_pool()
+            await init_async_replica_pool()
+            logger.info("Async database connection pool initialized")
+
+        @app.on_event("shutdown")
+        async def _shutdown_async_db():
+            await close_async_pool()
+
+    register_exception_handlers(app)
 
-    app.include_router(api_router)
+    app.include_router(async_api_router if API_MODE == "async" else api_router)
     return app
 
 
 app = create_app()
+app.add_middleware(DeadlineMiddleware)
 app.add_middleware(MetricsMiddleware)
@@ -1,6 +1,8 @@
 from prometheus_client import Counter, Histogram, Gauge, start_http_server, REGISTRY
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+import functools
+import inspect
 import structlog
 import uuid
 import time
@@ -40,11 +42,17 @@ METRICS = {
         'Failed payment attempts',
         ['reason']
     ),
+    # kept for existing dashboards; order_cache_lookups_total replaces it
     'cache_hit_ratio': Gauge(
         'cache_hit_ratio',
-        'Cache hit ratio for order details',
+        'Deprecated: GET /orders/{order_id} lookups answered from the cache (true) or the db (false)',
         ['hit']
     ),
+    'order_cache_lookups_total': Counter(
+        'order_cache_lookups_total',
+        'Order cache lookups for GET /orders/{order_id} by result (hit, miss, negative)',
+        ['result']
+    ),
     'external_call_duration': Histogram(
         'external_call_duration_seconds',
         'External service call durations',
@@ -60,6 +68,91 @@ METRICS = {
         'money_hold_success_total',
         'Successful hold money operations'
     ),
+    'configs_staleness_seconds': Gauge(
+        'configs_staleness_seconds',
+        'Seconds since dynamic configs were last fetched successfully'
+    ),
+    'configs_refresh_total': Counter(
+        'configs_refresh_total',
+        'Dynamic config fetches',
+        ['result']
+    ),
+    'configs_version': Gauge(
+        'configs_version',
+        'Version of the config snapshot served to requests'
+    ),
+    'configs_stale_served_total': Counter(
+        'configs_stale_served_total',
+        'Requests served an expired config snapshot'
+    ),
+    'user_profile_stale_served_total': Counter(
+        'user_profile_stale_served_total',
+        'User profiles served from the last known copy because the users service failed'
+    ),
+    'upstream_circuit_state': Gauge(
+        'upstream_circuit_state',
+        'Upstream circuit breaker state (0 closed, 1 half-open, 2 open)',
+        ['service']
+    ),
+    'upstream_rejections_total': Counter(
+        'upstream_rejections_total',
+        'Upstream calls rejected without being sent',
+        ['service', 'reason']
+    ),
+    'upstream_in_flight': Gauge(
+        'upstream_in_flight',
+        'Upstream calls currently in flight',
+        ['service']
+    ),
+    'db_query_duration_seconds': Histogram(
+        'db_query_duration_seconds',
+        'Duration of registered (prepared) DB statements',
+        ['query'],
+        buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5]
+    ),
+    'db_group_commit_batch_size': Histogram(
+        'db_group_commit_batch_size',
+        'Orders written per group-commit transaction',
+        buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256]
+    ),
+    'db_group_commit_flush_seconds': Histogram(
+        'db_group_commit_flush_seconds',
+        'Duration of one group-commit transaction',
+        buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5]
+    ),
+    'user_summary_pending_users': Gauge(
+        'user_summary_pending_users',
+        'Users with user_summary deltas waiting for the write-behind flush'
+    ),
+    'user_summary_flush_users': Histogram(
+        'user_summary_flush_users',
+        'Users written per write-behind user_summary flush',
+        buckets=[1, 10, 50, 100, 500, 1000, 5000, 10000]
+    ),
+    'user_summary_flush_seconds': Histogram(
+        'user_summary_flush_seconds',
+        'Duration of one write-behind user_summary flush',
+        buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5]
+    ),
+    'user_summary_dropped_users_total': Counter(
+        'user_summary_dropped_users_total',
+        'Users whose user_summary deltas were dropped after a failed flush because the buffer was full'
+    ),
+    'orders_archive_reads_total': Counter(
+        'orders_archive_reads_total',
+        'Order lookups that missed the hot tables and were read through the archive (hit, miss)',
+        ['result']
+    ),
+    'db_replica_reads_total': Counter(
+        'db_replica_reads_total',
+        'Order reads routed to the replica by outcome (hit, not_found, error, too_recent)',
+        ['result']
+    ),
+    'db_connection_checkouts_total': Counter(
+        'db_connection_checkouts_total',
+        'Request DB handles by whether a pool connection was checked out (acquired) or never needed (avoided)',
+        ['result']
+    ),
 }
 
 
@@ -67,6 +160,9 @@ class MetricsMiddleware(BaseHTTPMiddleware):
     def _normalize_endpoint(self, path: str) -> str:
         if path.startswith('/orders'):
             return '/orders'
+        parts = path.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'orders':
+            return '/users/{user_id}/orders'
         return path
 
     async def dispatch(self, request: Request, call_next):
@@ -89,6 +185,18 @@ class MetricsMiddleware(BaseHTTPMiddleware):
 
 def measure_external_call(service_name: str):
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.time()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    elapsed = time.time() - start
+                    METRICS['external_call_duration'].labels(service=service_name).observe(elapsed)
+            return async_wrapper
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start = time.time()
             try:
@@ -1,6 +1,11 @@
+import struct
+import sys
+import uuid
 from dataclasses import dataclass
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
 
 @dataclass
@@ -54,6 +59,74 @@ class OrderData:
     finish_time: datetime
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NO_TIMESTAMP = -(1 << 63)
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    if value is None:
+        return _NO_TIMESTAMP
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    return None if value == _NO_TIMESTAMP else _EPOCH + timedelta(microseconds=value)
+
+
+class CompactOrder:
+    """
+    Slotted, packed form of `OrderData` for the order cache; timestamps come back in UTC.
+    """
+
+    __slots__ = ("id", "user_id", "scooter_id", "zone_id", "_packed")
+
+    # price_per_minute, price_unlock, deposit, total_amount (INTEGER columns), start_time, finish_time
+    _LAYOUT = struct.Struct("<iiiiqq")
+
+    def __init__(self, id: bytes, user_id: str, scooter_id: str, zone_id: str, packed: bytes):
+        self.id = id
+        self.user_id = user_id
+        self.scooter_id = scooter_id
+        self.zone_id = zone_id
+        self._packed = packed
+
+    @classmethod
+    def from_order(cls, order: OrderData, id: Optional[bytes] = None) -> "CompactOrder":
+        """
+        `id` may pass the already parsed UUID bytes of `order.id` to share them.
+        """
+        return cls(
+            id if id is not None else uuid.UUID(order.id).bytes,
+            sys.intern(order.user_id),
+            sys.intern(order.scooter_id),
+            sys.intern(order.zone_id),
+            cls._LAYOUT.pack(
+                order.price_per_minute,
+                order.price_unlock,
+                order.deposit,
+                order.total_amount,
+                _to_micros(order.start_time),
+                _to_micros(order.finish_time),
+            ),
+        )
+
+    def to_order(self) -> OrderData:
+        price_per_minute, price_unlock, deposit, total_amount, start, finish = self._LAYOUT.unpack(self._packed)
+        return OrderData(
+            id=str(uuid.UUID(bytes=self.id)),
+            user_id=self.user_id,
+            scooter_id=self.scooter_id,
+            zone_id=self.zone_id,
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            total_amount=total_amount,
+            start_time=_from_micros(start),
+            finish_time=_from_micros(finish),
+        )
+
+
 @dataclass
 class PricingTokenPayload:
     user_id: str
@@ -85,3 +158,53 @@ class ConfigMap:
     
     def clone(self):
         return ConfigMap(self._data.copy())
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Immutable, versioned configs shared by all readers without copying.
+    Reads work like ConfigMap (attribute access, missing keys are None); nested dicts are read-only views.
+    """
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data: Mapping, version: int = 0):
+        object.__setattr__(self, "_data", _freeze(data))
+        object.__setattr__(self, "version", version)
+
+    def __getattr__(self, item):
+        return self._data.get(item, None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def merged(self, other: "ConfigMap | Mapping", version: int | None = None) -> "ConfigSnapshot":
+        """
+        Returns a new snapshot with `other` merged over this one, nested dicts merged one level deep
+        like ConfigMap.merge. The version defaults to this version + 1.
+        """
+        overrides = other.to_dict() if isinstance(other, ConfigMap) else other
+        data = _thaw(self._data)
+        for key, value in overrides.items():
+            if isinstance(value, Mapping) and isinstance(data.get(key), dict):
+                data[key].update(value)
+            else:
+                data[key] = value
+        return ConfigSnapshot(data, self.version + 1 if version is None else version)
+
+    def to_dict(self) -> dict:
+        return _thaw(self._data)
@@ -1,3 +1,3 @@
-from app.repository import cache, db
+from app.repository import archive, cache, db
 
-__all__ = ["cache", "db"]
+__all__ = ["archive", "cache", "db"]
@@ -0,0 +1,177 @@
+"""
+Orders of dropped daily partitions, one zstd-compressed Parquet file per day (`orders_<YYYYMMDD>.parquet`).
+
+Rows are written sorted by id, so each row group covers a narrow id range and a point lookup reads only the
+row group whose min/max statistics contain the id. The file holding an order is found from the UUIDv7 id
+(its creation day, in UTC like the partition bounds) or, for legacy ids, from `orders_archive_index`.
+
+pyarrow is optional: without it the archive is unavailable and lookups simply miss.
+"""
+import asyncio
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+import structlog
+from psycopg import Connection
+
+from app.metrics import METRICS
+from app.models import OrderData
+from app.repository.db import archive as archive_db
+from app.repository.db.database import AsyncLazyConnection
+from app.static_config import static_config
+from app.utils.ids import parse_uuid, uuid7_time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+logger = structlog.get_logger(__name__)
+
+ARCHIVE_DIR = Path(os.getenv("ORDERS_ARCHIVE_DIR", "archive/orders"))
+
+_archive_settings = getattr(static_config, "archive_settings", {}) or {}
+_ARCHIVE_READ_THROUGH = bool(_archive_settings.get("read_through_enabled", True))
+_ARCHIVE_COMPRESSION = str(_archive_settings.get("compression", "zstd"))
+_ARCHIVE_ROW_GROUP_SIZE = int(_archive_settings.get("row_group_size", 65_536))
+# created_at can differ from the id timestamp by up to this much (see orders_db._ID_TIME_TOLERANCE)
+_ID_TIME_TOLERANCE = timedelta(seconds=1)
+
+_COLUMNS = (
+    "id", "user_id", "scooter_id", "zone_id",
+    "price_per_minute", "price_unlock", "deposit", "total_amount",
+    "start_time", "finish_time", "created_at",
+)
+
+
+def available() -> bool:
+    return pq is not None
+
+
+def _schema() -> "pa.Schema":
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("scooter_id", pa.string()),
+        ("zone_id", pa.string()),
+        ("price_per_minute", pa.int32()),
+        ("price_unlock", pa.int32()),
+        ("deposit", pa.int32()),
+        ("total_amount", pa.int32()),
+        ("start_time", timestamp),
+        ("finish_time", timestamp),
+        ("created_at", timestamp),
+    ])
+
+
+def day_path(day: date, archive_dir: Path = ARCHIVE_DIR) -> Path:
+    return archive_dir / f"orders_{day:%Y%m%d}.parquet"
+
+
+def write_day(day: date, batches: Iterable[list[dict]], archive_dir: Path = ARCHIVE_DIR) -> tuple[Path, int]:
+    """
+    Writes one day of orders (batches of DB rows, already sorted by id) and returns the file and the number
+    of rows it holds, read back from the file footer. The file appears atomically, complete or not at all.
+    """
+    if not available():
+        raise RuntimeError("pyarrow is not installed; the orders archive is unavailable")
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = day_path(day, archive_dir)
+    tmp = path.with_suffix(".parquet.tmp")
+    schema = _schema()
+    try:
+        with pq.ParquetWriter(tmp, schema, compression=_ARCHIVE_COMPRESSION) as writer:
+            for rows in batches:
+                columns = {name: [row[name] for row in rows] for name in _COLUMNS}
+                columns["id"] = [str(value) for value in columns["id"]]
+                writer.write_table(pa.table(columns, schema=schema), row_group_size=_ARCHIVE_ROW_GROUP_SIZE)
+        rows_written = pq.ParquetFile(tmp).metadata.num_rows
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.info("orders_archive: wrote day", day=str(day), path=str(path), rows=rows_written)
+    return path, rows_written
+
+
+def _candidate_days(order_id: str) -> list[date]:
+    parsed = parse_uuid(order_id)
+    created_at = uuid7_time(parsed) if parsed is not None else None
+    if created_at is None:
+        return []
+    return sorted({(created_at - _ID_TIME_TOLERANCE).date(), (created_at + _ID_TIME_TOLERANCE).date()})
+
+
+def _order_from_record(record: dict) -> OrderData:
+    return OrderData(
+        id=record["id"],
+        user_id=record["user_id"],
+        scooter_id=record["scooter_id"],
+        zone_id=record["zone_id"],
+        price_per_minute=record["price_per_minute"],
+        price_unlock=record["price_unlock"],
+        deposit=record["deposit"],
+        total_amount=record["total_amount"],
+        start_time=record["start_time"],
+        finish_time=record["finish_time"],
+    )
+
+
+def read_order(day: date, order_id: str, archive_dir: Path = ARCHIVE_DIR) -> Optional[OrderData]:
+    """
+    Point lookup in one day file; row-group statistics on id limit the read to the matching row group.
+    """
+    parsed = parse_uuid(order_id)
+    path = day_path(day, archive_dir)
+    if parsed is None or not available() or not path.exists():
+        return None
+    # ids are stored in canonical form, like the uuid column the hot tables compare against
+    table = pq.read_table(path, filters=[("id", "=", str(parsed))])
+    if table.num_rows == 0:
+        return None
+    return _order_from_record(table.slice(0, 1).to_pylist()[0])
+
+
+def _read_days(days: list[date], order_id: str) -> Optional[OrderData]:
+    for day in days:
+        order = read_order(day, order_id)
+        if order is not None:
+            return order
+    return None
+
+
+def _record(order: Optional[OrderData]) -> Optional[OrderData]:
+    METRICS['orders_archive_reads_total'].labels(result="hit" if order else "miss").inc()
+    return order
+
+
+def _read_through(order_id: str) -> bool:
+    return _ARCHIVE_READ_THROUGH and available() and parse_uuid(order_id) is not None
+
+
+def find_order(conn: Connection, order_id: str) -> Optional[OrderData]:
+    """
+    Looks an order up in the archive after the hot tables missed it.
+    """
+    if not _read_through(order_id):
+        return None
+    days = _candidate_days(order_id)
+    if not days:
+        day = archive_db.get_archived_day(conn, order_id)
+        days = [day] if day is not None else []
+    return _record(_read_days(days, order_id))
+
+
+async def find_order_async(conn: AsyncLazyConnection, order_id: str) -> Optional[OrderData]:
+    if not _read_through(order_id):
+        return None
+    days = _candidate_days(order_id)
+    if not days:
+        day = await archive_db.get_archived_day_async(conn, order_id)
+        days = [day] if day is not None else []
+    # Parquet reads are blocking file IO
+    return _record(await asyncio.to_thread(_read_days, days, order_id))
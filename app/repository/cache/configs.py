@@ -1,7 +1,12 @@
+import threading
+import time
+from typing import Optional
+
 import structlog
 
 from app.clients import data_requests as dr
-from app.models import ConfigMap
+from app.metrics import METRICS
+from app.models import ConfigMap, ConfigSnapshot
 from app.static_config import static_config
 from app.utils.cache import ThreadSafeTTLCache
 
@@ -11,44 +16,181 @@ logger = structlog.get_logger(__name__)
 _cache_settings = getattr(static_config, "cache_settings", {}) or {}
 _CONFIG_CACHE_TTL_SECONDS = int(_cache_settings.get("configs_ttl_seconds", 60))
 _CONFIG_CACHE_MAXSIZE = int(_cache_settings.get("configs_maxsize", 4))
+_CONFIG_REFRESH_RATIO = float(_cache_settings.get("configs_refresh_ratio", 0.8))
+_CONFIG_REFRESH_RETRY_SECONDS = float(_cache_settings.get("configs_refresh_retry_seconds", 5))
 _CONFIG_CACHE_KEY = "config"
 
-_config_cache: ThreadSafeTTLCache[str, ConfigMap] = ThreadSafeTTLCache(
+_config_cache: ThreadSafeTTLCache[str, ConfigSnapshot] = ThreadSafeTTLCache(
     maxsize=_CONFIG_CACHE_MAXSIZE,
     ttl=_CONFIG_CACHE_TTL_SECONDS,
 )
 
+# Last snapshot built from a successful /configs fetch; served when the TTL entry has expired.
+_last_good: Optional[ConfigSnapshot] = None
+_last_good_at: Optional[float] = None
+_last_dynamic: Optional[dict] = None
+_started_at = time.monotonic()
+_state_lock = threading.Lock()
 
-def _cache_config(config: ConfigMap) -> None:
-    _config_cache.set(_CONFIG_CACHE_KEY, config.clone())
+_refresher: Optional[threading.Thread] = None
+_refresher_lock = threading.Lock()
+_refresh_requested = threading.Event()
+_stop_refresher = threading.Event()
+# Set by stop_refresher(), so stale reads during and after shutdown do not start the thread again.
+_refresher_stopped = False
 
 
-def _cached_config() -> ConfigMap | None:
-    cached = _config_cache.get(_CONFIG_CACHE_KEY)
-    return cached.clone() if cached is not None else None
+def staleness_seconds() -> float:
+    """
+    Seconds since dynamic configs were last fetched successfully (since startup if never).
+    """
+    return time.monotonic() - (_last_good_at if _last_good_at is not None else _started_at)
+
+
+METRICS['configs_staleness_seconds'].set_function(staleness_seconds)
 
 
-def get_configs(base_config: ConfigMap | None = None) -> ConfigMap:
+def _on_fetched(base_config: ConfigSnapshot | None, dynamic: ConfigMap) -> ConfigSnapshot:
     """
-    Returns merged static+dynamic configs with TTL cache and fallback to last good value.
+    Publishes the snapshot for a fetched payload. An unchanged payload reuses the current snapshot,
+    so merging (and a new version) only happens when dynamic configs actually change.
     """
-    cached = _cached_config()
-    if cached:
-        logger.debug("configs_cache: cache hit")
-        return cached
+    global _last_good, _last_good_at, _last_dynamic
+    raw = dynamic.to_dict()
+    with _state_lock:
+        if _last_good is not None and raw == _last_dynamic:
+            snapshot = _last_good
+        else:
+            version = _last_good.version + 1 if _last_good is not None else static_config.version + 1
+            snapshot = (base_config or static_config).merged(raw, version=version)
+            _last_dynamic = raw
+            METRICS['configs_version'].set(version)
+            logger.info("configs_cache: dynamic configs changed", version=version)
+        _last_good, _last_good_at = snapshot, time.monotonic()
+    METRICS['configs_refresh_total'].labels(result="success").inc()
+    logger.debug("configs_cache: fetched dynamic configs", version=snapshot.version)
+    return snapshot
+
+
+def _on_failed(base_config: ConfigSnapshot | None, exc: Exception) -> ConfigSnapshot:
+    METRICS['configs_refresh_total'].labels(result="failure").inc()
+    logger.warning(
+        "configs_cache: failed to fetch dynamic configs, using fallback",
+        error=str(exc),
+        staleness_seconds=round(staleness_seconds(), 1),
+    )
+    return _last_good if _last_good is not None else (base_config or static_config)
 
-    merged = (base_config or static_config).clone()
+
+def _load_configs(base_config: ConfigSnapshot | None) -> ConfigSnapshot:
     try:
-        dynamic = dr.get_configs()
-        merged.merge(dynamic)
-        logger.debug("configs_cache: fetched dynamic configs")
+        return _on_fetched(base_config, dr.get_configs())
     except Exception as exc:
-        logger.warning(
-            "configs_cache: failed to fetch dynamic configs, using fallback",
-            error=str(exc),
-        )
-        if cached:
-            return cached
-
-    _cache_config(merged)
-    return merged
+        return _on_failed(base_config, exc)
+
+
+async def _load_configs_async(base_config: ConfigSnapshot | None) -> ConfigSnapshot:
+    try:
+        return _on_fetched(base_config, await dr.get_configs_async())
+    except Exception as exc:
+        return _on_failed(base_config, exc)
+
+
+def refresh_configs() -> bool:
+    """
+    Fetches dynamic configs and replaces the cached snapshot. On failure nothing is replaced, so the
+    entry expires and readers get the last good snapshot as stale. Returns whether the fetch succeeded.
+    """
+    try:
+        config = _on_fetched(None, dr.get_configs())
+    except Exception as exc:
+        _on_failed(None, exc)
+        return False
+    _config_cache.set(_CONFIG_CACHE_KEY, config)
+    return True
+
+
+def _next_refresh_delay() -> float:
+    if _last_good_at is None:
+        return 0.0
+    return max(0.0, _last_good_at + _CONFIG_CACHE_TTL_SECONDS * _CONFIG_REFRESH_RATIO - time.monotonic())
+
+
+def _refresh_loop() -> None:
+    logger.info("configs_cache: background refresher started")
+    while not _stop_refresher.is_set():
+        if not refresh_configs():
+            # back off instead of re-fetching on every stale read
+            _stop_refresher.wait(_CONFIG_REFRESH_RETRY_SECONDS)
+        _refresh_requested.clear()
+        _refresh_requested.wait(timeout=_next_refresh_delay())
+    logger.info("configs_cache: background refresher stopped")
+
+
+def start_refresher() -> None:
+    """
+    Starts the daemon thread that loads configs right away and then reloads them at
+    `configs_refresh_ratio` of the TTL, ahead of expiry.
+    """
+    global _refresher_stopped
+    with _refresher_lock:
+        _refresher_stopped = False
+        _ensure_refresher()
+
+
+def _ensure_refresher() -> None:
+    # called with _refresher_lock held
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _stop_refresher.clear()
+    _refresher = threading.Thread(target=_refresh_loop, name="configs-refresher", daemon=True)
+    _refresher.start()
+
+
+def stop_refresher() -> None:
+    global _refresher, _refresher_stopped
+    with _refresher_lock:
+        _refresher_stopped = True
+        refresher, _refresher = _refresher, None
+    if refresher is None:
+        return
+    _stop_refresher.set()
+    _refresh_requested.set()
+    refresher.join(timeout=5)
+
+
+def _serve_stale(snapshot: ConfigSnapshot) -> ConfigSnapshot:
+    METRICS['configs_stale_served_total'].inc()
+    logger.debug("configs_cache: serving stale configs", staleness_seconds=round(staleness_seconds(), 1))
+    with _refresher_lock:
+        if not _refresher_stopped:
+            _ensure_refresher()
+    _refresh_requested.set()
+    return snapshot
+
+
+def get_configs(base_config: ConfigSnapshot | None = None) -> ConfigSnapshot:
+    """
+    Returns the current static+dynamic config snapshot without waiting on `/configs` once one exists.
+    Snapshots are immutable and shared by all readers, so nothing is copied per request.
+
+    The background refresher keeps the TTL entry fresh; if it has expired anyway (upstream failing),
+    the last good snapshot is served and a refresh is requested. Only the very first call loads inline,
+    with concurrent callers sharing that fetch; `base_config` is the static base for that load.
+    """
+    cached = _config_cache.get(_CONFIG_CACHE_KEY)
+    if cached is not None:
+        return cached
+    if _last_good is not None:
+        return _serve_stale(_last_good)
+    return _config_cache.get_or_load(_CONFIG_CACHE_KEY, lambda: _load_configs(base_config))
+
+
+async def get_configs_async(base_config: ConfigSnapshot | None = None) -> ConfigSnapshot:
+    cached = _config_cache.get(_CONFIG_CACHE_KEY)
+    if cached is not None:
+        return cached
+    if _last_good is not None:
+        return _serve_stale(_last_good)
+    return await _config_cache.get_or_load_async(_CONFIG_CACHE_KEY, lambda: _load_configs_async(base_config))
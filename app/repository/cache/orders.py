@@ -1,41 +1,165 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
 import structlog
 from psycopg import Connection
 
-from app.models import OrderData
+from app.metrics import METRICS
+from app.models import CompactOrder, OrderData
+from app.repository.archive import orders as orders_archive
 from app.repository.db import orders as orders_db
+from app.repository.db.database import AsyncLazyConnection
 from app.static_config import static_config
-from app.utils.cache import ThreadSafeTTLCache
+from app.utils.cache import ShardedTTLCache
+from app.utils.ids import parse_uuid
 
 
 logger = structlog.get_logger(__name__)
 
 _cache_settings = getattr(static_config, "cache_settings", {}) or {}
-_ORDER_CACHE_TTL_SECONDS = int(_cache_settings.get("orders_ttl_seconds", 2 * 60 * 60))
+# active rides stay cached for up to a ride's length, finished orders for a short tail
+_ORDER_ACTIVE_TTL_SECONDS = int(_cache_settings.get("orders_active_ttl_seconds", 12 * 60 * 60))
+_ORDER_FINISHED_TTL_SECONDS = int(_cache_settings.get("orders_finished_ttl_seconds", 10 * 60))
 _ORDER_CACHE_MAXSIZE = int(_cache_settings.get("orders_maxsize", 150_000))
+_ORDER_CACHE_ADMISSION = bool(_cache_settings.get("orders_admission", True))
+_CACHE_SHARDS = int(_cache_settings.get("shards", 16))
+# ids a full read lookup did not find
+_ORDER_NEGATIVE_TTL_SECONDS = int(_cache_settings.get("orders_negative_ttl_seconds", 30))
+_ORDER_NEGATIVE_MAXSIZE = int(_cache_settings.get("orders_negative_maxsize", 10_000))
 
-_order_cache: ThreadSafeTTLCache[str, OrderData] = ThreadSafeTTLCache(
+# keyed by the id bytes; every read returns a fresh OrderData
+_order_cache: ShardedTTLCache[bytes, CompactOrder] = ShardedTTLCache(
     maxsize=_ORDER_CACHE_MAXSIZE,
-    ttl=_ORDER_CACHE_TTL_SECONDS,
+    ttl=_ORDER_ACTIVE_TTL_SECONDS,
+    shards=_CACHE_SHARDS,
+    admission=_ORDER_CACHE_ADMISSION,
+)
+_missing_cache: ShardedTTLCache[bytes, bool] = ShardedTTLCache(
+    maxsize=_ORDER_NEGATIVE_MAXSIZE,
+    ttl=_ORDER_NEGATIVE_TTL_SECONDS,
+    shards=_CACHE_SHARDS,
 )
 
 
+def _cache_key(order_id: str) -> Optional[bytes]:
+    parsed = parse_uuid(order_id)
+    return parsed.bytes if parsed is not None else None
+
+
+def _ttl(order: OrderData) -> int:
+    return _ORDER_ACTIVE_TTL_SECONDS if order.finish_time is None else _ORDER_FINISHED_TTL_SECONDS
+
+
 def _cache_order(order: OrderData) -> None:
-    _order_cache.set(order.id, order)
+    """
+    Caches the order with the TTL of its status.
+    """
+    key = _cache_key(order.id)
+    if key is not None:
+        _order_cache.set(key, CompactOrder.from_order(order, key), ttl=_ttl(order))
+        _missing_cache.delete(key)
+
+
+def _cached(order_id: str) -> Optional[OrderData]:
+    key = _cache_key(order_id)
+    cached = _order_cache.get(key) if key is not None else None
+    return cached.to_order() if cached is not None else None
+
+
+def _known_missing(order_id: str) -> bool:
+    key = _cache_key(order_id)
+    return key is not None and _missing_cache.get(key) is not None
 
 
-def get_order(conn: Connection, order_id: str) -> OrderData | None:
-    cached = _order_cache.get(order_id)
+def _remember_missing(order_id: str) -> None:
+    key = _cache_key(order_id)
+    if key is not None:
+        _missing_cache.set(key, True)
+
+
+def _from_cache(order_id: str) -> tuple[Optional[OrderData], str]:
+    """
+    Returns the cached order and the lookup result: "hit", "negative" (known missing) or "miss".
+    """
+    cached = _cached(order_id)
     if cached is not None:
         logger.debug("orders_cache: cache hit", order_id=order_id)
+        return cached, "hit"
+    if _known_missing(order_id):
+        logger.debug("orders_cache: negative cache hit", order_id=order_id)
+        return None, "negative"
+    logger.debug("orders_cache: cache miss, reading db", order_id=order_id)
+    return None, "miss"
+
+
+def _count_lookup(result: str) -> None:
+    METRICS['order_cache_lookups_total'].labels(result=result).inc()
+    if result != "negative":
+        METRICS['cache_hit_ratio'].labels(hit="true" if result == "hit" else "false").inc()
+
+
+def remember(order: OrderData) -> None:
+    """
+    Caches an order that was written outside this module (group commit).
+    """
+    _cache_order(order)
+
+
+def evict(order_id: str) -> None:
+    """
+    Drops an order written in a transaction that then failed to commit.
+    """
+    key = _cache_key(order_id)
+    if key is not None:
+        _order_cache.delete(key)
+
+
+def get_order(
+    conn: Connection,
+    order_id: str,
+    allow_replica: bool = False,
+    allow_archive: bool = False,
+    count_lookup: bool = False,
+) -> OrderData | None:
+    """
+    Cached order lookup; read-only paths may fall back to the replica (`allow_replica`) and the archive
+    (`allow_archive`), and lookups with the archive remember misses. `count_lookup` records the result
+    in the order cache metrics (GET /orders/{order_id} only).
+    """
+    cached, result = _from_cache(order_id)
+    if count_lookup:
+        _count_lookup(result)
+    if result != "miss":
         return cached
 
-    logger.debug("orders_cache: cache miss, reading db", order_id=order_id)
-    order = orders_db.get_order(conn, order_id)
+    if allow_replica:
+        order = orders_db.get_order_for_read(conn, order_id)
+    else:
+        order = orders_db.get_order(conn, order_id)
+    if order is None and allow_archive:
+        order = orders_archive.find_order(conn, order_id)
     if order:
         _cache_order(order)
+    elif allow_archive:
+        _remember_missing(order_id)
     return order
 
 
+def list_user_orders(
+    conn: Connection,
+    user_id: str,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, UUID]] = None,
+) -> list[tuple[datetime, OrderData]]:
+    """
+    History pages bypass the cache.
+    """
+    return orders_db.list_user_orders(conn, user_id, created_from, created_to, limit, after)
+
+
 def insert_order(conn: Connection, order: OrderData) -> None:
     orders_db.insert_order(conn, order)
     _cache_order(order)
@@ -44,3 +168,50 @@ def insert_order(conn: Connection, order: OrderData) -> None:
 def update_order_finish(conn: Connection, order: OrderData) -> None:
     orders_db.update_order_finish(conn, order)
     _cache_order(order)
+
+
+async def get_order_async(
+    conn: AsyncLazyConnection,
+    order_id: str,
+    allow_replica: bool = False,
+    allow_archive: bool = False,
+    count_lookup: bool = False,
+) -> OrderData | None:
+    cached, result = _from_cache(order_id)
+    if count_lookup:
+        _count_lookup(result)
+    if result != "miss":
+        return cached
+
+    if allow_replica:
+        order = await orders_db.get_order_for_read_async(conn, order_id)
+    else:
+        order = await orders_db.get_order_async(conn, order_id)
+    if order is None and allow_archive:
+        order = await orders_archive.find_order_async(conn, order_id)
+    if order:
+        _cache_order(order)
+    elif allow_archive:
+        _remember_missing(order_id)
+    return order
+
+
+async def list_user_orders_async(
+    conn: AsyncLazyConnection,
+    user_id: str,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, UUID]] = None,
+) -> list[tuple[datetime, OrderData]]:
+    return await orders_db.list_user_orders_async(conn, user_id, created_from, created_to, limit, after)
+
+
+async def insert_order_async(conn: AsyncLazyConnection, order: OrderData) -> None:
+    await orders_db.insert_order_async(conn, order)
+    _cache_order(order)
+
+
+async def update_order_finish_async(conn: AsyncLazyConnection, order: OrderData) -> None:
+    await orders_db.update_order_finish_async(conn, order)
+    _cache_order(order)
@@ -0,0 +1,109 @@
+from typing import Optional
+
+import structlog
+from psycopg import Connection
+
+from app.clients import data_requests as dr
+from app.metrics import METRICS
+from app.models import UserProfile
+from app.repository.db import summary_writer
+from app.repository.db import user_summary as user_summary_db
+from app.repository.db.database import AsyncLazyConnection
+from app.static_config import static_config
+from app.utils.cache import ShardedTTLCache
+
+
+logger = structlog.get_logger(__name__)
+
+_cache_settings = getattr(static_config, "cache_settings", {}) or {}
+_USER_CACHE_TTL_SECONDS = int(_cache_settings.get("users_ttl_seconds", 30))
+_USER_CACHE_MAXSIZE = int(_cache_settings.get("users_maxsize", 50_000))
+_USER_STALE_TTL_SECONDS = int(_cache_settings.get("users_stale_ttl_seconds", 60 * 60))
+_CACHE_SHARDS = int(_cache_settings.get("shards", 16))
+
+_user_cache: ShardedTTLCache[str, UserProfile] = ShardedTTLCache(
+    maxsize=_USER_CACHE_MAXSIZE,
+    ttl=_USER_CACHE_TTL_SECONDS,
+    shards=_CACHE_SHARDS,
+)
+# Last profile received from the users service, used only when it fails or times out.
+_last_known_cache: ShardedTTLCache[str, UserProfile] = ShardedTTLCache(
+    maxsize=_USER_CACHE_MAXSIZE,
+    ttl=_USER_STALE_TTL_SECONDS,
+    shards=_CACHE_SHARDS,
+)
+
+
+def _remember(profile: UserProfile) -> UserProfile:
+    _last_known_cache.set(profile.id, profile)
+    return profile
+
+
+def _last_known(user_id: str, exc: Exception) -> UserProfile:
+    stale = _last_known_cache.get(user_id)
+    if stale is None:
+        raise exc
+    METRICS['user_profile_stale_served_total'].inc()
+    logger.warning("users_cache: users service failed, serving last known profile", user_id=user_id, error=str(exc))
+    return stale
+
+
+def get_user_profile(user_id: str) -> UserProfile:
+    """
+    Cached user profile lookup with a short TTL; when the users service fails or is too slow,
+    the last known profile is served instead (users is a degradable dependency).
+    """
+    try:
+        return _user_cache.get_or_load(user_id, lambda: _remember(dr.get_user_profile(user_id)))
+    except Exception as exc:
+        return _last_known(user_id, exc)
+
+
+async def get_user_profile_async(user_id: str) -> UserProfile:
+    async def load() -> UserProfile:
+        return _remember(await dr.get_user_profile_async(user_id))
+
+    try:
+        return await _user_cache.get_or_load_async(user_id, load)
+    except Exception as exc:
+        return _last_known(user_id, exc)
+
+
+def invalidate(user_id: str) -> None:
+    _user_cache.delete(user_id)
+    _last_known_cache.delete(user_id)
+    logger.debug("users_cache: invalidated profile", user_id=user_id)
+
+
+def update_user_summary(
+    conn: Connection,
+    user_id: str,
+    delta_rides: int = 0,
+    delta_debt: int = 0,
+    last_payment_status: Optional[str] = None,
+) -> None:
+    """
+    Upserts our user_summary aggregate and drops the cached profile when the user's debt changes,
+    so the next offer re-reads it instead of pricing against an outdated debt.
+    With write-behind enabled the delta is buffered and flushed later, outside of the caller's transaction,
+    unless the aggregator turns it away (stopped or full).
+    """
+    aggregator = summary_writer.get_aggregator()
+    if aggregator is None or not aggregator.add(user_id, delta_rides, delta_debt, last_payment_status):
+        user_summary_db.upsert_user_summary(conn, user_id, delta_rides, delta_debt, last_payment_status)
+    if delta_debt:
+        invalidate(user_id)
+
+
+async def update_user_summary_async(
+    conn: AsyncLazyConnection,
+    user_id: str,
+    delta_rides: int = 0,
+    delta_debt: int = 0,
+    last_payment_status: Optional[str] = None,
+) -> None:
+    aggregator = summary_writer.get_aggregator()
+    if aggregator is None or not aggregator.add(user_id, delta_rides, delta_debt, last_payment_status):
+        await user_summary_db.upsert_user_summary_async(conn, user_id, delta_rides, delta_debt, last_payment_status)
+    if delta_debt:
+        invalidate(user_id)
@@ -3,7 +3,7 @@ import structlog
 from app.clients import data_requests as dr
 from app.models import TariffZone
 from app.static_config import static_config
-from app.utils.cache import ThreadSafeTTLCache
+from app.utils.cache import ShardedTTLCache
 
 
 logger = structlog.get_logger(__name__)
@@ -11,20 +11,54 @@ logger = structlog.get_logger(__name__)
 _cache_settings = getattr(static_config, "cache_settings", {}) or {}
 _ZONE_CACHE_TTL_SECONDS = int(_cache_settings.get("zones_ttl_seconds", 600))
 _ZONE_CACHE_MAXSIZE = int(_cache_settings.get("zones_maxsize", 10_000))
+_CACHE_SHARDS = int(_cache_settings.get("shards", 16))
 
-_zone_cache: ThreadSafeTTLCache[str, TariffZone] = ThreadSafeTTLCache(
+_zone_cache: ShardedTTLCache[str, TariffZone] = ShardedTTLCache(
     maxsize=_ZONE_CACHE_MAXSIZE,
     ttl=_ZONE_CACHE_TTL_SECONDS,
+    shards=_CACHE_SHARDS,
 )
 
 
-def get_tariff_zone(zone_id: str) -> TariffZone:
-    cached = _zone_cache.get(zone_id)
-    if cached is not None:
-        logger.debug("zones_cache: cache hit", zone_id=zone_id)
-        return cached
-
+def _load_tariff_zone(zone_id: str) -> TariffZone:
     tariff_zone = dr.get_tariff_zone(zone_id)
-    _zone_cache.set(zone_id, tariff_zone)
     logger.debug("zones_cache: cached zone", zone_id=zone_id)
     return tariff_zone
+
+
+async def _load_tariff_zone_async(zone_id: str) -> TariffZone:
+    tariff_zone = await dr.get_tariff_zone_async(zone_id)
+    logger.debug("zones_cache: cached zone", zone_id=zone_id)
+    return tariff_zone
+
+
+def get_tariff_zone(zone_id: str) -> TariffZone:
+    """
+    Cached tariff zone lookup; concurrent misses for one zone share a single upstream call.
+    """
+    return _zone_cache.get_or_load(zone_id, lambda: _load_tariff_zone(zone_id))
+
+
+async def get_tariff_zone_async(zone_id: str) -> TariffZone:
+    return await _zone_cache.get_or_load_async(zone_id, lambda: _load_tariff_zone_async(zone_id))
+
+
+async def get_tariff_zones_async(zone_ids: list[str]) -> dict[str, TariffZone]:
+    """
+    Cached bulk lookup: zones missing from the cache are fetched with one batch call and cached.
+    """
+    zones: dict[str, TariffZone] = {}
+    missing: list[str] = []
+    for zone_id in dict.fromkeys(zone_ids):
+        cached = _zone_cache.get(zone_id)
+        if cached is None:
+            missing.append(zone_id)
+        else:
+            zones[zone_id] = cached
+    if missing:
+        fetched = await dr.get_tariff_zones_async(missing)
+        for zone_id, tariff_zone in fetched.items():
+            _zone_cache.set(zone_id, tariff_zone)
+        logger.debug("zones_cache: cached zones", count=len(fetched))
+        zones.update(fetched)
+    return zones
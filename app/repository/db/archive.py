@@ -0,0 +1,107 @@
+from datetime import date, datetime, timezone
+from typing import Iterator, Optional
+
+from psycopg import Connection, sql
+import structlog
+
+from app.repository.db import queries
+from app.repository.db.database import AsyncLazyConnection
+from app.utils.ids import parse_uuid
+
+logger = structlog.get_logger(__name__)
+
+_EXPIRED_PARTITIONS_SQL = """
+    SELECT p.partition_schemaname AS schema_name,
+           p.partition_tablename AS table_name,
+           i.child_start_time AS start_time
+    FROM partman.show_partitions('public.orders') p
+    CROSS JOIN LATERAL partman.show_partition_info(p.partition_schemaname || '.' || p.partition_tablename) i
+    WHERE i.child_end_time <= %(before)s
+    ORDER BY i.child_start_time
+"""
+
+_GET_ARCHIVED_DAY = queries.register(
+    "orders_archive_index_get",
+    "SELECT archived_day FROM orders_archive_index WHERE id = %(order_id)s",
+)
+
+
+def expired_partitions(conn: Connection, before: datetime) -> list[tuple[sql.Identifier, date]]:
+    """
+    Daily `orders` partitions that end at or before `before`, oldest first, as (table, UTC start day).
+    """
+    with conn.cursor() as cur:
+        cur.execute(_EXPIRED_PARTITIONS_SQL, {"before": before})
+        rows = cur.fetchall()
+    return [
+        (sql.Identifier(row["schema_name"], row["table_name"]), row["start_time"].astimezone(timezone.utc).date())
+        for row in rows
+    ]
+
+
+def lock_partition(conn: Connection, table: sql.Identifier) -> None:
+    """
+    Blocks writes to the partition until the transaction ends, so the export, the row count and the drop
+    all see the same rows.
+    """
+    conn.execute(sql.SQL("LOCK TABLE {} IN SHARE MODE").format(table))
+
+
+def count_rows(conn: Connection, table: sql.Identifier) -> int:
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SELECT count(*) AS n FROM {}").format(table))
+        return int(cur.fetchone()["n"])
+
+
+def iter_rows(conn: Connection, table: sql.Identifier, batch_size: int) -> Iterator[list[dict]]:
+    """
+    Streams the partition ordered by id in batches through a server-side cursor.
+    """
+    with conn.cursor(name="orders_archive_export") as cur:
+        cur.itersize = batch_size
+        cur.execute(sql.SQL("SELECT * FROM {} ORDER BY id").format(table))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+
+def index_legacy_ids(conn: Connection, table: sql.Identifier, day: date) -> int:
+    # the version nibble is the 15th character of the text form; PG16 has no uuid_extract_version()
+    with conn.cursor() as cur:
+        cur.execute(
+            sql.SQL("""
+                INSERT INTO orders_archive_index (id, archived_day)
+                SELECT id, %(day)s FROM {} WHERE substring(id::text, 15, 1) <> '7'
+                ON CONFLICT (id) DO NOTHING
+            """).format(table),
+            {"day": day},
+        )
+        return cur.rowcount
+
+
+def drop_partition(conn: Connection, table: sql.Identifier) -> None:
+    conn.execute(sql.SQL("ALTER TABLE orders DETACH PARTITION {}").format(table))
+    conn.execute(sql.SQL("DROP TABLE {}").format(table))
+    logger.info("db: dropped archived partition", partition=table.as_string(conn))
+
+
+def get_archived_day(conn: Connection, order_id: str) -> Optional[date]:
+    parsed = parse_uuid(order_id)
+    if parsed is None:
+        return None
+    with conn.cursor() as cur:
+        queries.execute(cur, _GET_ARCHIVED_DAY, {"order_id": parsed})
+        row = cur.fetchone()
+    return row["archived_day"] if row else None
+
+
+async def get_archived_day_async(conn: AsyncLazyConnection, order_id: str) -> Optional[date]:
+    parsed = parse_uuid(order_id)
+    if parsed is None:
+        return None
+    async with conn.cursor() as cur:
+        await queries.execute_async(cur, _GET_ARCHIVED_DAY, {"order_id": parsed})
+        row = await cur.fetchone()
+    return row["archived_day"] if row else None
@@ -0,0 +1,258 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import psycopg
+import structlog
+
+from app.metrics import METRICS
+from app.models import OrderData
+from app.repository.db import orders as orders_db
+from app.repository.db import user_summary as user_summary_db
+from app.repository.db.database import DATABASE_URL, _configure
+from app.static_config import static_config
+from app.utils import deadline
+
+logger = structlog.get_logger(__name__)
+
+_db_settings = getattr(static_config, "db_settings", {}) or {}
+_GROUP_COMMIT_ENABLED = bool(_db_settings.get("group_commit_enabled", False))
+_GROUP_COMMIT_MAX_BATCH_SIZE = int(_db_settings.get("group_commit_max_batch_size", 64))
+_GROUP_COMMIT_MAX_WAIT_MS = float(_db_settings.get("group_commit_max_wait_ms", 5))
+_GROUP_COMMIT_CONNECT_TIMEOUT_SECONDS = int(_db_settings.get("group_commit_connect_timeout_seconds", 5))
+_GROUP_COMMIT_STATEMENT_TIMEOUT_MS = int(_db_settings.get("group_commit_statement_timeout_ms", 5000))
+
+_STOP = object()
+
+
+class _PendingWrite:
+    __slots__ = ("order", "summary", "future")
+
+    def __init__(self, order: OrderData, summary: tuple[str, int, int, Optional[str]]):
+        self.order = order
+        self.summary = summary
+        self.future: Future = Future()
+
+
+class GroupCommitWriter:
+    """
+    Writes started orders from concurrent requests in shared transactions: the first submitted order opens
+    a batch that collects for up to `max_wait` seconds (or `max_batch_size` orders), then the batch is written
+    with one COPY plus one multi-row user_summary upsert and committed once. Each submitter's future resolves
+    only after that commit, so an acknowledged order is durable.
+
+    The writer owns a dedicated connection, so it works with either API mode and never waits on the pool.
+    """
+
+    def __init__(
+        self,
+        conninfo: str = DATABASE_URL,
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        connect_timeout: int = 5,
+        statement_timeout_ms: int = 5000,
+    ):
+        self.conninfo = conninfo
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.connect_timeout = connect_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._queue: "queue.Queue[_PendingWrite | object]" = queue.Queue()
+        self._conn: Optional[psycopg.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            self._closed = False
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Flushes what is already queued, then stops the thread and closes the connection.
+        Orders still queued when `timeout` runs out fail instead of waiting for a writer that is gone.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        with self._lock:
+            self._closed = True
+            self._queue.put(_STOP)
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            self._fail_queued()
+
+    def submit(self, order: OrderData, summary: tuple[str, int, int, Optional[str]]) -> Future:
+        """
+        Queues an order insert with its (user_id, delta_rides, delta_debt, last_payment_status) summary delta.
+        """
+        pending = _PendingWrite(order, summary)
+        with self._lock:
+            if self._closed:
+                pending.future.set_exception(RuntimeError("group commit writer is stopped"))
+            else:
+                self._queue.put(pending)
+        return pending.future
+
+    def write(self, order: OrderData, summary: tuple[str, int, int, Optional[str]]) -> None:
+        """
+        Submits the order and waits for its commit within the request deadline.
+        """
+        deadline.check("group_commit")
+        future = self.submit(order, summary)
+        try:
+            future.result(timeout=deadline.remaining())
+        except TimeoutError as exc:
+            if future.cancel():
+                raise deadline.DeadlineExceeded("group_commit: deadline exceeded") from exc
+            # already claimed by a batch: report what its commit does, not a 504 for an order that may exist
+            future.result()
+
+    async def write_async(self, order: OrderData, summary: tuple[str, int, int, Optional[str]]) -> None:
+        deadline.check("group_commit")
+        future = self.submit(order, summary)
+        waiter = asyncio.wrap_future(future)
+        try:
+            async with asyncio.timeout(deadline.remaining()):
+                await asyncio.shield(waiter)
+        except TimeoutError as exc:
+            if future.cancel():
+                raise deadline.DeadlineExceeded("group_commit: deadline exceeded") from exc
+            await waiter
+
+    def _fail_queued(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item.future.set_running_or_notify_cancel():
+                item.future.set_exception(RuntimeError("group commit writer is stopped"))
+        # the stuck thread still exits once its current write returns
+        self._queue.put(_STOP)
+
+    def _collect(self, first: _PendingWrite) -> tuple[list[_PendingWrite], bool]:
+        batch = [first]
+        flush_at = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = flush_at - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        logger.info("group_commit: writer started", max_batch_size=self.max_batch_size, max_wait=self.max_wait)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect(item)
+            self._flush_claimed(batch)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._flush_claimed([item])
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        logger.info("group_commit: writer stopped")
+
+    def _connection(self) -> psycopg.Connection:
+        if self._conn is None or self._conn.closed:
+            # claimed writes are waited for past the request deadline, so a stuck statement must end too
+            self._conn = psycopg.connect(
+                self.conninfo,
+                connect_timeout=self.connect_timeout,
+                options=f"-c statement_timeout={self.statement_timeout_ms}",
+            )
+            _configure(self._conn)
+        return self._conn
+
+    def _write(self, batch: list[_PendingWrite]) -> None:
+        conn = self._connection()
+        start = time.perf_counter()
+        try:
+            orders_db.copy_orders(conn, [item.order for item in batch])
+            user_summary_db.upsert_user_summaries(conn, [item.summary for item in batch])
+            conn.commit()
+        except Exception:
+            if conn.broken:
+                self._conn = None
+            else:
+                conn.rollback()
+            raise
+        METRICS['db_group_commit_batch_size'].observe(len(batch))
+        METRICS['db_group_commit_flush_seconds'].observe(time.perf_counter() - start)
+
+    def _flush_claimed(self, batch: list[_PendingWrite]) -> None:
+        # orders whose caller already gave up are skipped
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch: list[_PendingWrite]) -> None:
+        try:
+            self._write(batch)
+        except Exception as exc:
+            if len(batch) > 1 and not isinstance(exc, psycopg.OperationalError):
+                # one bad row fails the whole COPY; retry one by one so only that caller gets the error
+                logger.warning("group_commit: batch failed, retrying orders individually", size=len(batch))
+                for item in batch:
+                    self._flush([item])
+                return
+            # a lost connection fails every row alike: retrying one by one would reconnect per row
+            logger.error("group_commit: failed to write batch", size=len(batch), error=str(exc))
+            for item in batch:
+                item.future.set_exception(exc)
+            return
+        for item in batch:
+            item.future.set_result(None)
+        logger.debug("group_commit: committed batch", size=len(batch))
+
+
+_writer: Optional[GroupCommitWriter] = None
+
+
+def get_writer() -> Optional[GroupCommitWriter]:
+    """
+    The running writer, or None when group commit is disabled (orders are then written by the request).
+    """
+    return _writer
+
+
+def start_writer() -> None:
+    global _writer
+    if not _GROUP_COMMIT_ENABLED or _writer is not None:
+        return
+    _writer = GroupCommitWriter(
+        max_batch_size=_GROUP_COMMIT_MAX_BATCH_SIZE,
+        max_wait=_GROUP_COMMIT_MAX_WAIT_MS / 1000,
+        connect_timeout=_GROUP_COMMIT_CONNECT_TIMEOUT_SECONDS,
+        statement_timeout_ms=_GROUP_COMMIT_STATEMENT_TIMEOUT_MS,
+    )
+    _writer.start()
+
+
+def stop_writer() -> None:
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
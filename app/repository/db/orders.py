@@ -1,57 +1,150 @@
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from uuid import UUID
 
 from psycopg import Connection
 
+from app.metrics import METRICS
 from app.models import OrderData
+from app.repository.db import database, queries
+from app.repository.db.database import AsyncLazyConnection
+from app.static_config import static_config
+from app.utils.ids import parse_uuid, uuid7_time
 
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+_db_settings = getattr(static_config, "db_settings", {}) or {}
+_REPLICA_MAX_LAG = timedelta(seconds=float(_db_settings.get("replica_max_lag_seconds", 5)))
 
-def insert_order(conn: Connection, order: OrderData) -> None:
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO orders (
-                id, user_id, scooter_id, zone_id,
-                price_per_minute, price_unlock, deposit,
-                total_amount, start_time, finish_time, created_at
-            )
-            VALUES (
-                %(id)s, %(user_id)s, %(scooter_id)s, %(zone_id)s,
-                %(price_per_minute)s, %(price_unlock)s, %(deposit)s,
-                %(total_amount)s, %(start_time)s, %(finish_time)s, %(start_time)s
-            )
-            """,
-            {
-                "id": order.id,
-                "user_id": order.user_id,
-                "scooter_id": order.scooter_id,
-                "zone_id": getattr(order, "zone_id", ""),
-                "price_per_minute": order.price_per_minute,
-                "price_unlock": order.price_unlock,
-                "deposit": order.deposit,
-                "total_amount": order.total_amount,
-                "start_time": order.start_time,
-                "finish_time": order.finish_time,
-            },
-        )
-    logger.debug("orders_repo: inserted order", order_id=order.id, user_id=order.user_id)
+_INSERT_ORDER = queries.register("orders_insert", """
+    INSERT INTO orders (
+        id, user_id, scooter_id, zone_id,
+        price_per_minute, price_unlock, deposit,
+        total_amount, start_time, finish_time, created_at
+    )
+    VALUES (
+        %(id)s, %(user_id)s, %(scooter_id)s, %(zone_id)s,
+        %(price_per_minute)s, %(price_unlock)s, %(deposit)s,
+        %(total_amount)s, %(start_time)s, %(finish_time)s, %(start_time)s
+    )
+""")
 
+_COPY_ORDERS_SQL = """
+    COPY orders (
+        id, user_id, scooter_id, zone_id,
+        price_per_minute, price_unlock, deposit,
+        total_amount, start_time, finish_time, created_at
+    ) FROM STDIN
+"""
 
-def get_order(conn: Connection, order_id: str) -> Optional[OrderData]:
-    with conn.cursor() as cur:
-        cur.execute(
-            "SELECT * FROM orders WHERE id = %(order_id)s",
-            {"order_id": order_id},
-        )
-        result = cur.fetchone()
+_GET_ORDER = queries.register("orders_get", "SELECT * FROM orders WHERE id = %(order_id)s")
+
+# created_at is the order start time, which is also the UUIDv7 timestamp (truncated to milliseconds),
+# so bounding created_at around it lets Postgres prune to the partition holding the order.
+_GET_ORDER_BY_TIME = queries.register("orders_get_by_time", """
+    SELECT * FROM orders
+    WHERE id = %(order_id)s
+      AND created_at >= %(created_from)s
+      AND created_at < %(created_to)s
+""")
+_ID_TIME_TOLERANCE = timedelta(seconds=1)
+
+# A user's orders newest first, one page per call: the window bounds on created_at prune partitions and
+# the (created_at, id) keyset seeks into idx_orders_user_created, so a deep page costs as much as the first.
+_LIST_USER_ORDERS = queries.register("orders_list_by_user", """
+    SELECT * FROM orders
+    WHERE user_id = %(user_id)s
+      AND created_at >= %(created_from)s
+      AND created_at < %(created_to)s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(limit)s
+""")
+_LIST_USER_ORDERS_AFTER = queries.register("orders_list_by_user_after", """
+    SELECT * FROM orders
+    WHERE user_id = %(user_id)s
+      AND created_at >= %(created_from)s
+      AND created_at < %(created_to)s
+      AND created_at <= %(after_created_at)s
+      AND (created_at, id) < (%(after_created_at)s, %(after_id)s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(limit)s
+""")
+
+_UPDATE_ORDER_FINISH = queries.register("orders_update_finish", """
+    UPDATE orders
+    SET finish_time = %(finish_time)s,
+        total_amount = %(total_amount)s
+    WHERE id = %(id)s
+      AND created_at = %(created_at)s
+""")
+
+
+def _insert_params(order: OrderData) -> dict:
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "scooter_id": order.scooter_id,
+        "zone_id": getattr(order, "zone_id", ""),
+        "price_per_minute": order.price_per_minute,
+        "price_unlock": order.price_unlock,
+        "deposit": order.deposit,
+        "total_amount": order.total_amount,
+        "start_time": order.start_time,
+        "finish_time": order.finish_time,
+    }
+
+
+def _finish_params(order: OrderData) -> dict:
+    return {
+        "finish_time": order.finish_time,
+        "total_amount": order.total_amount,
+        "id": order.id,
+        # orders are inserted with created_at = start_time, this pins the update to one partition
+        "created_at": order.start_time,
+    }
+
+
+def _get_order_query(order_id: str) -> Optional[tuple[str, dict]]:
+    """
+    Picks the lookup for an order id: time-bounded for UUIDv7 ids, id-only for legacy (UUIDv4) ids,
+    None when the id is not a UUID and cannot match any order.
+    """
+    parsed = parse_uuid(order_id)
+    if parsed is None:
+        return None
+    created_at = uuid7_time(parsed)
+    if created_at is None:
+        return _GET_ORDER, {"order_id": parsed}
+    return _GET_ORDER_BY_TIME, {
+        "order_id": parsed,
+        "created_from": created_at - _ID_TIME_TOLERANCE,
+        "created_to": created_at + _ID_TIME_TOLERANCE,
+    }
+
+
+def _list_user_orders_query(
+    user_id: str,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, UUID]],
+) -> tuple[str, dict]:
+    params = {"user_id": user_id, "created_from": created_from, "created_to": created_to, "limit": limit}
+    if after is None:
+        return _LIST_USER_ORDERS, params
+    after_created_at, after_id = after
+    params.update(after_created_at=after_created_at, after_id=after_id)
+    return _LIST_USER_ORDERS_AFTER, params
+
+
+def _order_from_row(order_id: str, result: Optional[dict]) -> Optional[OrderData]:
     if not result:
         logger.debug("orders_repo: order not found", order_id=order_id)
         return None
     logger.debug("orders_repo: fetched order", order_id=order_id)
-    order = OrderData(
+    return OrderData(
         id=str(result["id"]),
         user_id=str(result["user_id"]),
         scooter_id=str(result["scooter_id"]),
@@ -63,26 +156,169 @@ def get_order(conn: Connection, order_id: str) -> Optional[OrderData]:
         start_time=result["start_time"],
         finish_time=result["finish_time"],
     )
-    return order
+
+
+def insert_order(conn: Connection, order: OrderData) -> None:
+    with conn.cursor() as cur:
+        queries.execute(cur, _INSERT_ORDER, _insert_params(order))
+    logger.debug("orders_repo: inserted order", order_id=order.id, user_id=order.user_id)
+
+
+def get_order(conn: Connection, order_id: str) -> Optional[OrderData]:
+    query = _get_order_query(order_id)
+    if query is None:
+        logger.debug("orders_repo: not a valid order id", order_id=order_id)
+        return None
+    with conn.cursor() as cur:
+        queries.execute(cur, *query)
+        result = cur.fetchone()
+    return _order_from_row(order_id, result)
+
+
+def list_user_orders(
+    conn: Connection,
+    user_id: str,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, UUID]] = None,
+) -> list[tuple[datetime, OrderData]]:
+    """
+    Up to `limit` orders of the user created in [created_from, created_to), newest first, each with its
+    created_at; continues after the (created_at, id) of the last order of the previous page when `after` is given.
+    """
+    with conn.cursor() as cur:
+        queries.execute(cur, *_list_user_orders_query(user_id, created_from, created_to, limit, after))
+        rows = cur.fetchall()
+    logger.debug("orders_repo: listed user orders", user_id=user_id, count=len(rows))
+    return [(row["created_at"], _order_from_row(str(row["id"]), row)) for row in rows]
+
+
+def copy_orders(conn: Connection, orders: list[OrderData]) -> None:
+    """
+    Inserts many orders with one COPY; created_at is the start time, as in `insert_order`.
+    """
+    with conn.cursor() as cur:
+        with cur.copy(_COPY_ORDERS_SQL) as copy:
+            for order in orders:
+                copy.write_row((
+                    order.id, order.user_id, order.scooter_id, getattr(order, "zone_id", ""),
+                    order.price_per_minute, order.price_unlock, order.deposit,
+                    order.total_amount, order.start_time, order.finish_time, order.start_time,
+                ))
+    logger.debug("orders_repo: copied orders", count=len(orders))
 
 
 def update_order_finish(conn: Connection, order: OrderData) -> None:
     with conn.cursor() as cur:
-        cur.execute(
-            """
-            UPDATE orders
-            SET finish_time = %(finish_time)s,
-                total_amount = %(total_amount)s
-            WHERE id = %(id)s
-            """,
-            {
-                "finish_time": order.finish_time,
-                "total_amount": order.total_amount,
-                "id": order.id,
-            },
-        )
+        queries.execute(cur, _UPDATE_ORDER_FINISH, _finish_params(order))
     logger.debug(
         "orders_repo: updated finish",
         order_id=order.id,
         total_amount=order.total_amount
     )
+
+
+async def insert_order_async(conn: AsyncLazyConnection, order: OrderData) -> None:
+    async with conn.cursor() as cur:
+        await queries.execute_async(cur, _INSERT_ORDER, _insert_params(order))
+    logger.debug("orders_repo: inserted order", order_id=order.id, user_id=order.user_id)
+
+
+async def get_order_async(conn: AsyncLazyConnection, order_id: str) -> Optional[OrderData]:
+    query = _get_order_query(order_id)
+    if query is None:
+        logger.debug("orders_repo: not a valid order id", order_id=order_id)
+        return None
+    async with conn.cursor() as cur:
+        await queries.execute_async(cur, *query)
+        result = await cur.fetchone()
+    return _order_from_row(order_id, result)
+
+
+async def list_user_orders_async(
+    conn: AsyncLazyConnection,
+    user_id: str,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, UUID]] = None,
+) -> list[tuple[datetime, OrderData]]:
+    async with conn.cursor() as cur:
+        await queries.execute_async(cur, *_list_user_orders_query(user_id, created_from, created_to, limit, after))
+        rows = await cur.fetchall()
+    logger.debug("orders_repo: listed user orders", user_id=user_id, count=len(rows))
+    return [(row["created_at"], _order_from_row(str(row["id"]), row)) for row in rows]
+
+
+async def update_order_finish_async(conn: AsyncLazyConnection, order: OrderData) -> None:
+    async with conn.cursor() as cur:
+        await queries.execute_async(cur, _UPDATE_ORDER_FINISH, _finish_params(order))
+    logger.debug(
+        "orders_repo: updated finish",
+        order_id=order.id,
+        total_amount=order.total_amount
+    )
+
+
+def _replica_may_have(order_id: str) -> bool:
+    """
+    Whether the replica can be trusted to have the order: UUIDv7 orders younger than the lag tolerance may
+    not have replicated yet. Legacy ids carry no time and predate UUIDv7, so they are old enough.
+    """
+    parsed = parse_uuid(order_id)
+    if parsed is None:
+        return False
+    created_at = uuid7_time(parsed)
+    return created_at is None or datetime.now(timezone.utc) - created_at > _REPLICA_MAX_LAG
+
+
+def _replica_result(order_id: str, order: Optional[OrderData]) -> Optional[OrderData]:
+    if order is None:
+        METRICS['db_replica_reads_total'].labels(result="not_found").inc()
+        logger.debug("orders_repo: order not on replica, reading primary", order_id=order_id)
+        return None
+    METRICS['db_replica_reads_total'].labels(result="hit").inc()
+    return order
+
+
+def _replica_failed(order_id: str, exc: Exception) -> None:
+    METRICS['db_replica_reads_total'].labels(result="error").inc()
+    logger.warning("orders_repo: replica read failed, reading primary", order_id=order_id, error=str(exc))
+
+
+def get_order_for_read(conn: Connection, order_id: str) -> Optional[OrderData]:
+    """
+    Lookup for read-only paths: served by the replica (when configured) unless the order is younger than
+    `replica_max_lag_seconds`; orders the replica does not have, or a failing replica, fall back to `conn`.
+    Returned data may be stale by up to the replica lag, so read-modify-write paths use `get_order`.
+    """
+    if database.has_replica():
+        if _replica_may_have(order_id):
+            try:
+                with database.replica_connection() as replica:
+                    order = _replica_result(order_id, get_order(replica, order_id))
+            except Exception as exc:
+                _replica_failed(order_id, exc)
+            else:
+                if order is not None:
+                    return order
+        else:
+            METRICS['db_replica_reads_total'].labels(result="too_recent").inc()
+    return get_order(conn, order_id)
+
+
+async def get_order_for_read_async(conn: AsyncLazyConnection, order_id: str) -> Optional[OrderData]:
+    if database.has_async_replica():
+        if _replica_may_have(order_id):
+            try:
+                async with database.async_replica_connection() as replica:
+                    order = _replica_result(order_id, await get_order_async(replica, order_id))
+            except Exception as exc:
+                _replica_failed(order_id, exc)
+            else:
+                if order is not None:
+                    return order
+        else:
+            METRICS['db_replica_reads_total'].labels(result="too_recent").inc()
+    return await get_order_async(conn, order_id)
@@ -0,0 +1,42 @@
+import time
+
+from psycopg import AsyncCursor, Cursor
+
+from app.metrics import METRICS
+
+# hot statements by name, executed as prepared statements
+_queries: dict[str, str] = {}
+
+
+def register(name: str, sql: str) -> str:
+    """
+    Adds a statement to the registry and returns its name for `execute`.
+    """
+    if _queries.get(name, sql) != sql:
+        raise ValueError(f"query {name!r} is already registered with different SQL")
+    _queries[name] = sql
+    return name
+
+
+def get(name: str) -> str:
+    return _queries[name]
+
+
+def registered() -> dict[str, str]:
+    return dict(_queries)
+
+
+def execute(cur: Cursor, name: str, params: dict) -> Cursor:
+    start = time.perf_counter()
+    try:
+        return cur.execute(_queries[name], params, prepare=True)
+    finally:
+        METRICS['db_query_duration_seconds'].labels(query=name).observe(time.perf_counter() - start)
+
+
+async def execute_async(cur: AsyncCursor, name: str, params: dict) -> AsyncCursor:
+    start = time.perf_counter()
+    try:
+        return await cur.execute(_queries[name], params, prepare=True)
+    finally:
+        METRICS['db_query_duration_seconds'].labels(query=name).observe(time.perf_counter() - start)
@@ -0,0 +1,204 @@
+import threading
+import time
+from typing import Optional
+
+import psycopg
+import structlog
+
+from app.metrics import METRICS
+from app.repository.db import user_summary as user_summary_db
+from app.repository.db.database import DATABASE_URL, _configure
+from app.static_config import static_config
+
+logger = structlog.get_logger(__name__)
+
+_db_settings = getattr(static_config, "db_settings", {}) or {}
+_SUMMARY_WRITE_BEHIND_ENABLED = bool(_db_settings.get("summary_write_behind_enabled", False))
+_SUMMARY_FLUSH_INTERVAL_MS = float(_db_settings.get("summary_flush_interval_ms", 1000))
+_SUMMARY_MAX_PENDING_USERS = int(_db_settings.get("summary_max_pending_users", 10_000))
+
+
+class UserSummaryAggregator:
+    """
+    Write-behind buffer for user_summary: deltas are folded per user in memory and written with one
+    multi-row upsert at most `flush_interval` seconds later (sooner once `max_pending_users` users are
+    pending), so a busy rider costs one row update per interval instead of one per event.
+
+    Deltas are acknowledged before they are durable: a crash loses up to one interval of them, and readers of
+    user_summary see them only after the flush. A failed flush keeps the deltas and retries on the next one,
+    as long as they fit in `max_pending_users`; the rest are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        conninfo: str = DATABASE_URL,
+        flush_interval: float = 1.0,
+        max_pending_users: int = 10_000,
+    ):
+        self.conninfo = conninfo
+        self.flush_interval = flush_interval
+        self.max_pending_users = max_pending_users
+        self._pending: dict[str, tuple[int, int, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._closed = False
+        self._conn: Optional[psycopg.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        with self._lock:
+            self._closed = False
+        self._thread = threading.Thread(target=self._run, name="user-summary-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the thread after a final flush of everything still pending; later `add` calls are rejected.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        with self._lock:
+            self._closed = True
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout=timeout)
+
+    def add(
+        self,
+        user_id: str,
+        delta_rides: int = 0,
+        delta_debt: int = 0,
+        last_payment_status: Optional[str] = None,
+    ) -> bool:
+        """
+        Buffers the delta; returns False when it was not taken (the aggregator is stopped, or the buffer is full
+        and the user has nothing pending yet) and the caller has to write it itself.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if user_id not in self._pending and len(self._pending) >= self.max_pending_users:
+                self._wakeup.set()
+                return False
+            rides, debt, status = self._pending.get(user_id, (0, 0, None))
+            self._pending[user_id] = (rides + delta_rides, debt + delta_debt, last_payment_status or status)
+            pending = len(self._pending)
+        METRICS['user_summary_pending_users'].set(pending)
+        if pending >= self.max_pending_users:
+            self._wakeup.set()
+        return True
+
+    def pending(self) -> dict[str, tuple[int, int, Optional[str]]]:
+        with self._lock:
+            return dict(self._pending)
+
+    def _take(self) -> dict[str, tuple[int, int, Optional[str]]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        METRICS['user_summary_pending_users'].set(0)
+        return pending
+
+    def _restore(self, failed: dict[str, tuple[int, int, Optional[str]]]) -> None:
+        # deltas added since the failed flush are newer, so they go last and their status wins
+        with self._lock:
+            room = self.max_pending_users - len(self._pending)
+            kept, dropped = [], 0
+            for user_id, delta in failed.items():
+                if user_id in self._pending:
+                    kept.append((user_id, *delta))
+                elif room > 0:
+                    kept.append((user_id, *delta))
+                    room -= 1
+                else:
+                    dropped += 1
+            merged = user_summary_db.merge_deltas(
+                kept + [(user_id, *delta) for user_id, delta in self._pending.items()]
+            )
+            self._pending = merged
+            pending = len(merged)
+        METRICS['user_summary_pending_users'].set(pending)
+        if dropped:
+            METRICS['user_summary_dropped_users_total'].inc(dropped)
+            logger.error("summary_writer: buffer full, dropping deltas", users=dropped)
+
+    def _run(self) -> None:
+        logger.info("summary_writer: started", flush_interval=self.flush_interval)
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        logger.info("summary_writer: stopped")
+
+    def _connection(self) -> psycopg.Connection:
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg.connect(self.conninfo)
+            _configure(self._conn)
+        return self._conn
+
+    def _write(self, deltas: list[tuple[str, int, int, Optional[str]]]) -> None:
+        conn = self._connection()
+        try:
+            user_summary_db.upsert_user_summaries(conn, deltas)
+            conn.commit()
+        except Exception:
+            if conn.broken:
+                self._conn = None
+            else:
+                conn.rollback()
+            raise
+
+    def flush(self) -> int:
+        """
+        Writes all pending deltas; returns the number of users written (0 when the write failed).
+        """
+        pending = self._take()
+        if not pending:
+            return 0
+        start = time.perf_counter()
+        try:
+            self._write([(user_id, *delta) for user_id, delta in pending.items()])
+        except Exception as exc:
+            self._restore(pending)
+            logger.error("summary_writer: flush failed, keeping deltas", users=len(pending), error=str(exc))
+            return 0
+        METRICS['user_summary_flush_users'].observe(len(pending))
+        METRICS['user_summary_flush_seconds'].observe(time.perf_counter() - start)
+        logger.debug("summary_writer: flushed", users=len(pending))
+        return len(pending)
+
+
+_aggregator: Optional[UserSummaryAggregator] = None
+
+
+def get_aggregator() -> Optional[UserSummaryAggregator]:
+    """
+    The running aggregator, or None when write-behind is disabled (summaries are then upserted by the request).
+    """
+    return _aggregator
+
+
+def start_aggregator() -> None:
+    global _aggregator
+    if not _SUMMARY_WRITE_BEHIND_ENABLED or _aggregator is not None:
+        return
+    _aggregator = UserSummaryAggregator(
+        flush_interval=_SUMMARY_FLUSH_INTERVAL_MS / 1000,
+        max_pending_users=_SUMMARY_MAX_PENDING_USERS,
+    )
+    _aggregator.start()
+
+
+def stop_aggregator() -> None:
+    global _aggregator
+    aggregator, _aggregator = _aggregator, None
+    if aggregator is not None:
+        aggregator.stop()
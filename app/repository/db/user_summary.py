@@ -1,9 +1,81 @@
-from typing import Optional
+from typing import Iterable, Optional
 from psycopg import Connection
 import structlog
 
+from app.repository.db import queries
+from app.repository.db.database import AsyncLazyConnection
+
 logger = structlog.get_logger(__name__)
 
+_UPSERT_USER_SUMMARY = queries.register("user_summary_upsert", """
+    INSERT INTO user_summary (user_id, rides_count, current_debt, last_payment_status)
+    VALUES (%(user_id)s, %(delta_rides)s, %(delta_debt)s, %(last_payment_status)s)
+    ON CONFLICT (user_id) DO UPDATE
+    SET rides_count = user_summary.rides_count + EXCLUDED.rides_count,
+        current_debt = user_summary.current_debt + EXCLUDED.current_debt,
+        last_payment_status = COALESCE(EXCLUDED.last_payment_status, user_summary.last_payment_status)
+""")
+
+# One statement for many users; user ids must be unique within it (see merge_deltas).
+_UPSERT_USER_SUMMARIES = queries.register("user_summary_upsert_many", """
+    INSERT INTO user_summary (user_id, rides_count, current_debt, last_payment_status)
+    SELECT * FROM unnest(
+        %(user_ids)s::text[], %(delta_rides)s::integer[], %(delta_debts)s::integer[], %(last_payment_statuses)s::text[]
+    )
+    ON CONFLICT (user_id) DO UPDATE
+    SET rides_count = user_summary.rides_count + EXCLUDED.rides_count,
+        current_debt = user_summary.current_debt + EXCLUDED.current_debt,
+        last_payment_status = COALESCE(EXCLUDED.last_payment_status, user_summary.last_payment_status)
+""")
+
+_GET_USER_SUMMARY = queries.register(
+    "user_summary_get",
+    "SELECT user_id, rides_count, current_debt, last_payment_status FROM user_summary WHERE user_id = %(user_id)s",
+)
+
+
+def _upsert_params(
+    user_id: str, delta_rides: int, delta_debt: int, last_payment_status: Optional[str]
+) -> dict:
+    return {
+        "user_id": user_id,
+        "delta_rides": delta_rides,
+        "delta_debt": delta_debt,
+        "last_payment_status": last_payment_status,
+    }
+
+
+def merge_deltas(
+    deltas: Iterable[tuple[str, int, int, Optional[str]]],
+) -> dict[str, tuple[int, int, Optional[str]]]:
+    """
+    Folds (user_id, delta_rides, delta_debt, last_payment_status) deltas into one per user:
+    deltas are summed and the latest non-empty payment status wins, as sequential upserts would leave it.
+    """
+    merged: dict[str, tuple[int, int, Optional[str]]] = {}
+    for user_id, delta_rides, delta_debt, last_payment_status in deltas:
+        rides, debt, status = merged.get(user_id, (0, 0, None))
+        merged[user_id] = (rides + delta_rides, debt + delta_debt, last_payment_status or status)
+    return merged
+
+
+def upsert_user_summaries(conn: Connection, deltas: Iterable[tuple[str, int, int, Optional[str]]]) -> int:
+    """
+    Applies many summary deltas with a single multi-row upsert; returns the number of users touched.
+    """
+    merged = merge_deltas(deltas)
+    if not merged:
+        return 0
+    with conn.cursor() as cur:
+        queries.execute(cur, _UPSERT_USER_SUMMARIES, {
+            "user_ids": list(merged),
+            "delta_rides": [rides for rides, _, _ in merged.values()],
+            "delta_debts": [debt for _, debt, _ in merged.values()],
+            "last_payment_statuses": [status for _, _, status in merged.values()],
+        })
+    logger.debug("db: user_summary batch upserted", users=len(merged))
+    return len(merged)
+
 
 def upsert_user_summary(
     conn: Connection,
@@ -21,21 +93,10 @@ def upsert_user_summary(
             payment_status=last_payment_status,
         )
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO user_summary (user_id, rides_count, current_debt, last_payment_status)
-                VALUES (%(user_id)s, %(delta_rides)s, %(delta_debt)s, %(last_payment_status)s)
-                ON CONFLICT (user_id) DO UPDATE
-                SET rides_count = user_summary.rides_count + EXCLUDED.rides_count,
-                    current_debt = user_summary.current_debt + EXCLUDED.current_debt,
-                    last_payment_status = COALESCE(EXCLUDED.last_payment_status, user_summary.last_payment_status)
-                """,
-                {
-                    "user_id": user_id,
-                    "delta_rides": delta_rides,
-                    "delta_debt": delta_debt,
-                    "last_payment_status": last_payment_status,
-                },
+            queries.execute(
+                cur,
+                _UPSERT_USER_SUMMARY,
+                _upsert_params(user_id, delta_rides, delta_debt, last_payment_status),
             )
             logger.debug(
                 "db: user_summary updated successfully",
@@ -54,10 +115,7 @@ def get_user_summary(conn: Connection, user_id: str) -> Optional[dict]:
     logger.debug("db: get user_summary", user_id=user_id)
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                "SELECT user_id, rides_count, current_debt, last_payment_status FROM user_summary WHERE user_id = %(user_id)s",
-                {"user_id": user_id},
-            )
+            queries.execute(cur, _GET_USER_SUMMARY, {"user_id": user_id})
             result = cur.fetchone()
             logger.debug(
                 "db: user_summary fetched successfully",
@@ -72,3 +130,58 @@ def get_user_summary(conn: Connection, user_id: str) -> Optional[dict]:
             error=str(e),
         )
         raise
+
+
+async def upsert_user_summary_async(
+    conn: AsyncLazyConnection,
+    user_id: str,
+    delta_rides: int = 0,
+    delta_debt: int = 0,
+    last_payment_status: Optional[str] = None,
+) -> None:
+    try:
+        logger.info(
+            "db: upsert user_summary",
+            user_id=user_id,
+            rides=delta_rides,
+            debt=delta_debt,
+            payment_status=last_payment_status,
+        )
+        async with conn.cursor() as cur:
+            await queries.execute_async(
+                cur,
+                _UPSERT_USER_SUMMARY,
+                _upsert_params(user_id, delta_rides, delta_debt, last_payment_status),
+            )
+            logger.debug(
+                "db: user_summary updated successfully",
+                user_id=user_id,
+            )
+    except Exception as e:
+        logger.error(
+            "db: failed to upsert user_summary",
+            user_id=user_id,
+            error=str(e),
+        )
+        raise
+
+
+async def get_user_summary_async(conn: AsyncLazyConnection, user_id: str) -> Optional[dict]:
+    logger.debug("db: get user_summary", user_id=user_id)
+    try:
+        async with conn.cursor() as cur:
+            await queries.execute_async(cur, _GET_USER_SUMMARY, {"user_id": user_id})
+            result = await cur.fetchone()
+            logger.debug(
+                "db: user_summary fetched successfully",
+                user_id=user_id,
+                result=result,
+            )
+            return result
+    except Exception as e:
+        logger.error(
+            "db: failed to get user_summary",
+            user_id=user_id,
+            error=str(e),
+        )
+        raise
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from psycopg import Connection, sql
+import structlog
+
+from app.repository.archive import orders as orders_archive
+from app.repository.db import archive as archive_db
+from app.static_config import static_config
+
+logger = structlog.get_logger(__name__)
+
+_archive_settings = getattr(static_config, "archive_settings", {}) or {}
+_ARCHIVE_HOT_DAYS = int(_archive_settings.get("hot_days", 30))
+_ARCHIVE_EXPORT_BATCH_SIZE = int(_archive_settings.get("row_group_size", 65_536))
+
+
+def _archive_partition(conn: Connection, table: sql.Identifier, day: date, archive_dir: Path) -> int:
+    """
+    Exports one partition and drops it in a single transaction; the partition is only dropped once the
+    file holds exactly as many rows as the partition, and writes to it are blocked meanwhile.
+    """
+    try:
+        archive_db.lock_partition(conn, table)
+        expected = archive_db.count_rows(conn, table)
+        path, written = orders_archive.write_day(
+            day, archive_db.iter_rows(conn, table, _ARCHIVE_EXPORT_BATCH_SIZE), archive_dir
+        )
+        if written != expected:
+            path.unlink(missing_ok=True)
+            raise RuntimeError(f"archive row count mismatch for {day}: {written} written, {expected} in partition")
+        legacy = archive_db.index_legacy_ids(conn, table, day)
+        archive_db.drop_partition(conn, table)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        logger.exception("archive: failed to archive partition", day=str(day))
+        raise
+    logger.info("archive: partition archived", day=str(day), rows=written, legacy_ids=legacy, path=str(path))
+    return written
+
+
+def archive_expired_partitions(
+    conn: Connection,
+    hot_days: int = _ARCHIVE_HOT_DAYS,
+    archive_dir: Path = orders_archive.ARCHIVE_DIR,
+    dry_run: bool = False,
+) -> list[tuple[date, int]]:
+    """
+    Moves every daily `orders` partition that ended more than `hot_days` days ago to the archive,
+    oldest first; returns (day, rows) per archived partition (rows is -1 for a dry run).
+    Stops at the first failure, leaving that partition and newer ones in place.
+    """
+    if not dry_run and not orders_archive.available():
+        raise RuntimeError("pyarrow is not installed; the orders archive is unavailable")
+    cutoff = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=hot_days)
+    partitions = archive_db.expired_partitions(conn, cutoff)
+    conn.commit()
+    logger.info("archive: expired partitions", count=len(partitions), cutoff=cutoff.isoformat())
+    if dry_run:
+        return [(day, -1) for _, day in partitions]
+    return [(day, _archive_partition(conn, table, day, archive_dir)) for table, day in partitions]
@@ -1,35 +1,103 @@
+import asyncio
 import uuid
 import structlog
 
 from app.clients import data_requests as dr
-from app.models import ConfigMap, OfferData, TariffZone, UserProfile
+from app.clients import http
+from app.models import ConfigSnapshot, OfferData, ScooterData, TariffZone, UserProfile
 from app.repository.cache import configs as configs_repo
+from app.repository.cache import users as users_repo
 from app.repository.cache import zones as zones_repo
+from app.static_config import static_config
+from app.utils import deadline
 from app.utils.pricing import DEFAULT_TARIFF_VERSION, PRICING_ALGO_VERSION, generate_pricing_token
 
 logger = structlog.get_logger(__name__)
 
+_offer_settings = getattr(static_config, "offer_settings", {}) or {}
+_OFFER_LATENCY_BUDGET_SECONDS = float(_offer_settings.get("latency_budget_seconds", 2.0))
+_OFFER_BULK_MAX_SCOOTERS = int(_offer_settings.get("bulk_max_scooters", 50))
+
 
 class CreateOfferError:
     def __init__(self, message: str):
         self.message = message
 
 
-def create_offer(scooter_id: str, user_id: str, configs: ConfigMap) -> tuple[OfferData, str] | CreateOfferError:
-    logger.info("create_offer: start", scooter_id=scooter_id, user_id=user_id)
+async def _fetch_scooter_and_zone(scooter_id: str) -> tuple[ScooterData, TariffZone]:
+    scooter_data = await dr.get_scooter_data_async(scooter_id)
+    tariff = await zones_repo.get_tariff_zone_async(scooter_data.zone_id)
+    return scooter_data, tariff
+
+
+async def _cancel_pending(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
-    scooter_data = dr.get_scooter_data(scooter_id)
-    tariff = zones_repo.get_tariff_zone(scooter_data.zone_id)
-    user_profile = dr.get_user_profile(user_id)
 
-    configs = configs_repo.get_configs(configs)
+async def create_offer_async(
+    scooter_id: str, user_id: str, configs: ConfigSnapshot
+) -> tuple[OfferData, str] | CreateOfferError:
+    """
+    Fetches the scooter->zone chain, the user profile and configs concurrently within the offer latency budget
+    (or the request deadline, whichever is earlier). The user profile is awaited first: a user with debt
+    is rejected without waiting for the other lookups.
+    """
+    logger.info("create_offer: start", scooter_id=scooter_id, user_id=user_id)
 
-    if user_profile.current_debt > 0:
+    with deadline.deadline_scope(_OFFER_LATENCY_BUDGET_SECONDS):
+        return await _create_offer_within_deadline(scooter_id, user_id, configs)
+
+
+async def _create_offer_within_deadline(
+    scooter_id: str, user_id: str, configs: ConfigSnapshot
+) -> tuple[OfferData, str] | CreateOfferError:
+    scooter_task = asyncio.create_task(_fetch_scooter_and_zone(scooter_id))
+    user_task = asyncio.create_task(users_repo.get_user_profile_async(user_id))
+    configs_task = asyncio.create_task(configs_repo.get_configs_async(configs))
+    tasks = [scooter_task, user_task, configs_task]
+    try:
+        async with asyncio.timeout(deadline.remaining()):
+            user_profile = await user_task
+            if user_profile.current_debt > 0:
+                logger.warning(
+                    "create_offer: user has debt", user_id=user_id, current_debt=user_profile.current_debt
+                )
+                return CreateOfferError("User has debt")
+
+            scooter_data, tariff = await scooter_task
+            configs = await configs_task
+    except TimeoutError:
         logger.warning(
-            "create_offer: user has debt", user_id=user_id, current_debt=user_profile.current_debt
+            "create_offer: latency budget exceeded",
+            user_id=user_id,
+            scooter_id=scooter_id,
         )
-        return CreateOfferError("User has debt")
+        return CreateOfferError("Offer calculation timed out, try again later")
+    finally:
+        await _cancel_pending(tasks)
+
+    offer = price_offer(scooter_data, tariff, user_profile, configs)
+    pricing_token = sign_offer(offer, configs)
+
+    logger.info(
+        "create_offer: success",
+        offer_id=offer.id,
+        user_id=user_id,
+        scooter_id=scooter_id,
+        zone_id=scooter_data.zone_id,
+    )
+
+    return offer, pricing_token
 
+
+def price_offer(
+    scooter_data: ScooterData, tariff: TariffZone, user_profile: UserProfile, configs: ConfigSnapshot
+) -> OfferData:
+    """
+    Prices one scooter for a user from already fetched data; does no I/O.
+    """
     actual_price_per_min = tariff.price_per_minute
     if configs.price_coeff_settings is not None:
         actual_price_per_min = int(actual_price_per_min * float(configs.price_coeff_settings["surge"]))
@@ -41,8 +109,8 @@ def create_offer(scooter_id: str, user_id: str, configs: ConfigMap) -> tuple[Off
 
     logger.debug(
         "create_offer: pricing calculated",
-        user_id=user_id,
-        scooter_id=scooter_id,
+        user_id=user_profile.id,
+        scooter_id=scooter_data.id,
         price_per_min=actual_price_per_min,
         price_unlock=tariff.price_unlock,
         deposit_default=tariff.default_deposit,
@@ -59,30 +127,95 @@ def create_offer(scooter_id: str, user_id: str, configs: ConfigMap) -> tuple[Off
         multiplier = deposit_multiplier if user_profile.total_debt > deposit_debt_threshold else 1.0
         return int(tariff.default_deposit * multiplier)
 
-    offer = OfferData(
+    return OfferData(
         str(uuid.uuid4()),
-        user_id=user_id,
-        scooter_id=scooter_id,
+        user_id=user_profile.id,
+        scooter_id=scooter_data.id,
         zone_id=scooter_data.zone_id,
         price_per_minute=actual_price_per_min,
         price_unlock=actual_price_unlock,
         deposit=calc_deposit(user_profile, tariff),
     )
 
+
+def sign_offer(offer: OfferData, configs: ConfigSnapshot) -> str:
     tariff_version = getattr(configs, "tariff_version", DEFAULT_TARIFF_VERSION) or DEFAULT_TARIFF_VERSION
-    pricing_token = generate_pricing_token(
+    return generate_pricing_token(
         offer=offer,
-        user_id=user_id,
+        user_id=offer.user_id,
         tariff_version=tariff_version,
         pricing_algo_version=PRICING_ALGO_VERSION,
     )
 
-    logger.info(
-        "create_offer: success",
-        offer_id=offer.id,
-        user_id=user_id,
-        scooter_id=scooter_id,
-        zone_id=scooter_data.zone_id,
-    )
 
-    return offer, pricing_token
+async def _fetch_scooters_and_zones(
+    scooter_ids: list[str],
+) -> tuple[dict[str, ScooterData], dict[str, TariffZone]]:
+    scooters = await dr.get_scooters_data_async(scooter_ids)
+    zones = await zones_repo.get_tariff_zones_async([scooter.zone_id for scooter in scooters.values()])
+    return scooters, zones
+
+
+async def create_offers_bulk_async(
+    scooter_ids: list[str], user_id: str, configs: ConfigSnapshot
+) -> list[tuple[str, tuple[OfferData, str] | CreateOfferError]] | CreateOfferError:
+    """
+    Quotes many scooters for one user: the user and configs are fetched once, scooters and their zones
+    in bulk, then every scooter is priced and signed. Returns a result per requested scooter id
+    (in request order, duplicates dropped); a user with debt or a blown budget fails the whole request.
+    """
+    scooter_ids = list(dict.fromkeys(scooter_ids))
+    if len(scooter_ids) > _OFFER_BULK_MAX_SCOOTERS:
+        return CreateOfferError(f"Too many scooters, at most {_OFFER_BULK_MAX_SCOOTERS} per request")
+    logger.info("create_offers_bulk: start", user_id=user_id, scooters=len(scooter_ids))
+
+    with deadline.deadline_scope(_OFFER_LATENCY_BUDGET_SECONDS):
+        return await _create_offers_bulk_within_deadline(scooter_ids, user_id, configs)
+
+
+async def _create_offers_bulk_within_deadline(
+    scooter_ids: list[str], user_id: str, configs: ConfigSnapshot
+) -> list[tuple[str, tuple[OfferData, str] | CreateOfferError]] | CreateOfferError:
+    scooters_task = asyncio.create_task(_fetch_scooters_and_zones(scooter_ids))
+    user_task = asyncio.create_task(users_repo.get_user_profile_async(user_id))
+    configs_task = asyncio.create_task(configs_repo.get_configs_async(configs))
+    tasks = [scooters_task, user_task, configs_task]
+    try:
+        async with asyncio.timeout(deadline.remaining()):
+            user_profile = await user_task
+            if user_profile.current_debt > 0:
+                logger.warning(
+                    "create_offers_bulk: user has debt", user_id=user_id, current_debt=user_profile.current_debt
+                )
+                return CreateOfferError("User has debt")
+
+            scooters, zones = await scooters_task
+            configs = await configs_task
+    except TimeoutError:
+        logger.warning("create_offers_bulk: latency budget exceeded", user_id=user_id, scooters=len(scooter_ids))
+        return CreateOfferError("Offer calculation timed out, try again later")
+    finally:
+        await _cancel_pending(tasks)
+
+    results: list[tuple[str, tuple[OfferData, str] | CreateOfferError]] = []
+    for scooter_id in scooter_ids:
+        scooter_data = scooters.get(scooter_id)
+        tariff = zones.get(scooter_data.zone_id) if scooter_data is not None else None
+        if scooter_data is None or tariff is None:
+            results.append((scooter_id, CreateOfferError("Scooter not found")))
+            continue
+        offer = price_offer(scooter_data, tariff, user_profile, configs)
+        results.append((scooter_id, (offer, sign_offer(offer, configs))))
+
+    logger.info("create_offers_bulk: success", user_id=user_id, scooters=len(scooter_ids))
+    return results
+
+
+def create_offer(scooter_id: str, user_id: str, configs: ConfigSnapshot) -> tuple[OfferData, str] | CreateOfferError:
+    return http.run_sync(create_offer_async(scooter_id, user_id, configs))
+
+
+def create_offers_bulk(
+    scooter_ids: list[str], user_id: str, configs: ConfigSnapshot
+) -> list[tuple[str, tuple[OfferData, str] | CreateOfferError]] | CreateOfferError:
+    return http.run_sync(create_offers_bulk_async(scooter_ids, user_id, configs))
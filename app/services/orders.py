@@ -1,20 +1,32 @@
-import uuid
-from datetime import datetime, timezone
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from uuid import UUID
 from psycopg import Connection
 import structlog
 
 from app.clients import data_requests as dr
-from app.models import ConfigMap, OfferData, OrderData
+from app.models import ConfigSnapshot, OfferData, OrderData
 from app.repository.cache import configs as configs_repo
 from app.repository.cache import orders as orders_repo
+from app.repository.cache import users as users_repo
+from app.repository.db import group_commit
+from app.repository.db.database import AsyncLazyConnection, async_pipeline_transaction, pipeline_transaction
+from app.static_config import static_config
+from app.utils.ids import parse_uuid, uuid7
 from app.utils.pricing import validate_pricing_token
 
 logger = structlog.get_logger(__name__)
 
+_order_settings = getattr(static_config, "order_settings", {}) or {}
+_HISTORY_DEFAULT_WINDOW = timedelta(days=float(_order_settings.get("history_default_window_days", 30)))
+_HISTORY_MAX_WINDOW = timedelta(days=float(_order_settings.get("history_max_window_days", 92)))
+_HISTORY_DEFAULT_PAGE_SIZE = int(_order_settings.get("history_default_page_size", 20))
+_HISTORY_MAX_PAGE_SIZE = int(_order_settings.get("history_max_page_size", 100))
 
-def start_order(offer: OfferData, pricing_token: str, conn: Connection, configs: ConfigMap) -> OrderData:
-    configs = configs_repo.get_configs(configs)
+
+def _new_order(offer: OfferData, pricing_token: str, configs: ConfigSnapshot) -> OrderData:
     validate_pricing_token(offer, pricing_token, configs)
 
     logger.info(
@@ -24,8 +36,10 @@ def start_order(offer: OfferData, pricing_token: str, conn: Connection, configs:
         scooter_id=offer.scooter_id,
     )
 
-    order = OrderData(
-        str(uuid.uuid4()),
+    start_time = datetime.now(timezone.utc)
+    return OrderData(
+        # time-ordered id: created_at (= start_time) can be recovered from it for partition-pruned lookups
+        str(uuid7(start_time)),
         user_id=offer.user_id,
         scooter_id=offer.scooter_id,
         zone_id=offer.zone_id,
@@ -33,19 +47,12 @@ def start_order(offer: OfferData, pricing_token: str, conn: Connection, configs:
         price_unlock=offer.price_unlock,
         deposit=offer.deposit,
         total_amount=0,
-        start_time=datetime.now(timezone.utc),
+        start_time=start_time,
         finish_time=None,
     )
 
-    dr.hold_money_for_order(offer.user_id, order.id, offer.deposit)
-    logger.debug(
-        "start_order: holding deposit",
-        user_id=offer.user_id,
-        order_id=order.id,
-        deposit=offer.deposit,
-    )
 
-    orders_repo.insert_order(conn, order)
+def _log_started(order: OrderData) -> None:
     logger.info(
         "start_order: created order",
         order_id=order.id,
@@ -53,45 +60,242 @@ def start_order(offer: OfferData, pricing_token: str, conn: Connection, configs:
         scooter_id=order.scooter_id,
         zone_id=order.zone_id,
     )
-    return order
 
 
-def finish_order(order_id: str, conn: Connection, configs: ConfigMap) -> OrderData:
-    configs = configs_repo.get_configs(configs)
-
-    order = orders_repo.get_order(conn, order_id)
-    if order is None:
-        raise KeyError(order_id)
-
+def _close_order(order: OrderData, configs: ConfigSnapshot) -> float:
+    """
+    Stamps the finish time and computes the total; rides shorter than the free threshold cost nothing.
+    Returns the ride duration in seconds.
+    """
     order.finish_time = datetime.now(timezone.utc)
     duration_sec = (order.finish_time - order.start_time).total_seconds()
 
     rules = getattr(configs, "pricing_rules", {}) or {}
     free_seconds_threshold = float(rules.get("free_ride_seconds_threshold", 5))
 
-    if duration_sec < free_seconds_threshold:
-        dr.clear_money_for_order(order.user_id, order_id, 0)
+    if duration_sec >= free_seconds_threshold:
+        order.total_amount = (
+            int(duration_sec) * order.price_per_minute // 60
+            + order.price_unlock
+        )
+    return duration_sec
+
+
+def _log_charged(order: OrderData, duration_sec: float) -> None:
+    if order.total_amount == 0:
         logger.info(
             "finish_order: short ride cleared deposit",
-            order_id=order_id,
+            order_id=order.id,
             user_id=order.user_id,
             duration_sec=duration_sec,
         )
     else:
-        order.total_amount = (
-            int(duration_sec) * order.price_per_minute // 60
-            + order.price_unlock
-        )
-        dr.clear_money_for_order(order.user_id, order_id, order.total_amount)
         logger.info(
             "finish_order: charged",
-            order_id=order_id,
+            order_id=order.id,
             user_id=order.user_id,
             amount=order.total_amount,
             duration_sec=duration_sec,
         )
 
-    orders_repo.update_order_finish(conn, order)
+
+def _hold_status(held: bool) -> str:
+    return "success" if held else "failed"
+
+
+def _summary_delta(order: OrderData, cleared: bool) -> dict:
+    return {
+        "delta_rides": 1,
+        "delta_debt": 0 if cleared else order.total_amount,
+        "last_payment_status": "success" if cleared else "failed",
+    }
+
+
+def start_order(offer: OfferData, pricing_token: str, conn: Connection, configs: ConfigSnapshot) -> OrderData:
+    configs = configs_repo.get_configs(configs)
+    order = _new_order(offer, pricing_token, configs)
+
+    held = dr.hold_money_for_order(offer.user_id, order.id, offer.deposit)
+    logger.debug(
+        "start_order: holding deposit",
+        user_id=offer.user_id,
+        order_id=order.id,
+        deposit=offer.deposit,
+    )
+
+    writer = group_commit.get_writer()
+    if writer is not None:
+        writer.write(order, (order.user_id, 0, 0, _hold_status(held)))
+        orders_repo.remember(order)
+        _log_started(order)
+        return order
+
+    try:
+        with pipeline_transaction(conn):
+            orders_repo.insert_order(conn, order)
+            users_repo.update_user_summary(conn, order.user_id, last_payment_status=_hold_status(held))
+    except Exception:
+        orders_repo.evict(order.id)
+        raise
+    _log_started(order)
+    return order
+
+
+def finish_order(order_id: str, conn: Connection, configs: ConfigSnapshot) -> OrderData:
+    configs = configs_repo.get_configs(configs)
+
+    order = orders_repo.get_order(conn, order_id)
+    if order is None:
+        raise KeyError(order_id)
+
+    duration_sec = _close_order(order, configs)
+    cleared = dr.clear_money_for_order(order.user_id, order_id, order.total_amount)
+    _log_charged(order, duration_sec)
+
+    try:
+        with pipeline_transaction(conn):
+            orders_repo.update_order_finish(conn, order)
+            users_repo.update_user_summary(conn, order.user_id, **_summary_delta(order, cleared))
+    except Exception:
+        orders_repo.evict(order.id)
+        raise
+    logger.debug(
+        "finish_order: persisted finish",
+        order_id=order.id,
+        finish_time=order.finish_time,
+    )
+    return order
+
+
+def get_order(order_id: str, conn: Connection, configs: ConfigSnapshot) -> Optional[OrderData]:
+    logger.debug("get_order: fetching order", order_id=order_id)
+    return orders_repo.get_order(conn, order_id, allow_replica=True, allow_archive=True, count_lookup=True)
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _encode_cursor(created_at: datetime, order_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Opaque page cursor: the (created_at, id) of the last order on the previous page.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, order_id = raw.split("|", 1)
+        parsed = parse_uuid(order_id)
+        if parsed is None:
+            raise ValueError(order_id)
+        return _utc(datetime.fromisoformat(created_at)), parsed
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def _history_page_args(
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> tuple[datetime, datetime, int, Optional[tuple[datetime, UUID]]]:
+    """
+    Resolves the history window (default: the last `history_default_window_days`, at most
+    `history_max_window_days`), the page size and the cursor; invalid values raise ValueError.
+    """
+    created_to = _utc(created_to) if created_to is not None else datetime.now(timezone.utc)
+    created_from = _utc(created_from) if created_from is not None else created_to - _HISTORY_DEFAULT_WINDOW
+    if created_from >= created_to:
+        raise ValueError("created_from must be earlier than created_to")
+    if created_to - created_from > _HISTORY_MAX_WINDOW:
+        raise ValueError(f"Time window is too wide, at most {_HISTORY_MAX_WINDOW.days} days per request")
+    limit = _HISTORY_DEFAULT_PAGE_SIZE if limit is None else limit
+    if not 1 <= limit <= _HISTORY_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {_HISTORY_MAX_PAGE_SIZE}")
+    after = _decode_cursor(cursor) if cursor else None
+    return created_from, created_to, limit, after
+
+
+def _history_page(rows: list[tuple[datetime, OrderData]], limit: int) -> tuple[list[OrderData], Optional[str]]:
+    # one extra row is fetched to know whether another page exists without a COUNT
+    orders = [order for _, order in rows[:limit]]
+    if len(rows) <= limit:
+        return orders, None
+    created_at, last = rows[limit - 1]
+    return orders, _encode_cursor(created_at, last.id)
+
+
+def list_user_orders(
+    user_id: str,
+    conn: Connection,
+    configs: ConfigSnapshot,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> tuple[list[OrderData], Optional[str]]:
+    """
+    One page of the user's order history, newest first, and the cursor of the next page (None on the last).
+    """
+    created_from, created_to, limit, after = _history_page_args(created_from, created_to, limit, cursor)
+    logger.debug("list_user_orders: fetching page", user_id=user_id, created_from=created_from, created_to=created_to)
+    rows = orders_repo.list_user_orders(conn, user_id, created_from, created_to, limit + 1, after)
+    return _history_page(rows, limit)
+
+
+async def start_order_async(
+    offer: OfferData, pricing_token: str, conn: AsyncLazyConnection, configs: ConfigSnapshot
+) -> OrderData:
+    configs = await configs_repo.get_configs_async(configs)
+    order = _new_order(offer, pricing_token, configs)
+
+    held = await dr.hold_money_for_order_async(offer.user_id, order.id, offer.deposit)
+    logger.debug(
+        "start_order: holding deposit",
+        user_id=offer.user_id,
+        order_id=order.id,
+        deposit=offer.deposit,
+    )
+
+    writer = group_commit.get_writer()
+    if writer is not None:
+        await writer.write_async(order, (order.user_id, 0, 0, _hold_status(held)))
+        orders_repo.remember(order)
+        _log_started(order)
+        return order
+
+    try:
+        async with async_pipeline_transaction(conn):
+            await orders_repo.insert_order_async(conn, order)
+            await users_repo.update_user_summary_async(conn, order.user_id, last_payment_status=_hold_status(held))
+    except Exception:
+        orders_repo.evict(order.id)
+        raise
+    _log_started(order)
+    return order
+
+
+async def finish_order_async(order_id: str, conn: AsyncLazyConnection, configs: ConfigSnapshot) -> OrderData:
+    configs = await configs_repo.get_configs_async(configs)
+
+    order = await orders_repo.get_order_async(conn, order_id)
+    if order is None:
+        raise KeyError(order_id)
+
+    duration_sec = _close_order(order, configs)
+    cleared = await dr.clear_money_for_order_async(order.user_id, order_id, order.total_amount)
+    _log_charged(order, duration_sec)
+
+    try:
+        async with async_pipeline_transaction(conn):
+            await orders_repo.update_order_finish_async(conn, order)
+            await users_repo.update_user_summary_async(conn, order.user_id, **_summary_delta(order, cleared))
+    except Exception:
+        orders_repo.evict(order.id)
+        raise
     logger.debug(
         "finish_order: persisted finish",
         order_id=order.id,
@@ -100,6 +304,21 @@ def finish_order(order_id: str, conn: Connection, configs: ConfigMap) -> OrderDa
     return order
 
 
-def get_order(order_id: str, conn: Connection, configs: ConfigMap) -> Optional[OrderData]:
+async def get_order_async(order_id: str, conn: AsyncLazyConnection, configs: ConfigSnapshot) -> Optional[OrderData]:
     logger.debug("get_order: fetching order", order_id=order_id)
-    return orders_repo.get_order(conn, order_id)
+    return await orders_repo.get_order_async(conn, order_id, allow_replica=True, allow_archive=True, count_lookup=True)
+
+
+async def list_user_orders_async(
+    user_id: str,
+    conn: AsyncLazyConnection,
+    configs: ConfigSnapshot,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> tuple[list[OrderData], Optional[str]]:
+    created_from, created_to, limit, after = _history_page_args(created_from, created_to, limit, cursor)
+    logger.debug("list_user_orders: fetching page", user_id=user_id, created_from=created_from, created_to=created_to)
+    rows = await orders_repo.list_user_orders_async(conn, user_id, created_from, created_to, limit + 1, after)
+    return _history_page(rows, limit)
@@ -1,6 +1,6 @@
-from app.models import ConfigMap
+from app.models import ConfigSnapshot
 
-static_config = ConfigMap({
+static_config = ConfigSnapshot({
     "price_coeff_settings": {
         "surge": 2.5,
         "low_charge_discount": 0.5,
@@ -12,11 +12,84 @@ static_config = ConfigMap({
         "free_ride_seconds_threshold": 5,
     },
     "cache_settings": {
-        "orders_ttl_seconds": 2 * 60 * 60,
+        "orders_active_ttl_seconds": 12 * 60 * 60,
+        "orders_finished_ttl_seconds": 10 * 60,
+        "orders_admission": True,
         "orders_maxsize": 150_000,
+        "orders_negative_ttl_seconds": 30,
+        "orders_negative_maxsize": 10_000,
         "zones_ttl_seconds": 600,
         "zones_maxsize": 10_000,
         "configs_ttl_seconds": 60,
         "configs_maxsize": 4,
-    }
+        "configs_refresh_ratio": 0.8,
+        "configs_refresh_retry_seconds": 5,
+        "users_ttl_seconds": 30,
+        "users_maxsize": 50_000,
+        "users_stale_ttl_seconds": 60 * 60,
+        "shards": 16,
+    },
+    "request_settings": {
+        "timeout_seconds": 5.0,
+    },
+    "db_settings": {
+        "group_commit_enabled": False,
+        "group_commit_max_batch_size": 64,
+        "group_commit_max_wait_ms": 5,
+        "group_commit_connect_timeout_seconds": 5,
+        "group_commit_statement_timeout_ms": 5000,
+        "replica_max_lag_seconds": 5,
+        "summary_write_behind_enabled": False,
+        "summary_flush_interval_ms": 1000,
+        "summary_max_pending_users": 10_000,
+    },
+    "archive_settings": {
+        "hot_days": 30,
+        "read_through_enabled": True,
+        "compression": "zstd",
+        "row_group_size": 65_536,
+    },
+    "order_settings": {
+        "history_default_window_days": 30,
+        "history_max_window_days": 92,
+        "history_default_page_size": 20,
+        "history_max_page_size": 100,
+    },
+    "offer_settings": {
+        "latency_budget_seconds": 2.0,
+        "bulk_max_scooters": 50,
+    },
+    "upstream_settings": {
+        "default": {
+            "max_connections": 20,
+            "max_keepalive_connections": 10,
+            "keepalive_expiry": 30.0,
+            "connect_timeout": 0.5,
+            "read_timeout": 1.0,
+            "write_timeout": 1.0,
+            "pool_timeout": 0.5,
+            "max_concurrent_requests": 32,
+            "breaker_failure_threshold": 5,
+            "breaker_reset_timeout": 10.0,
+            "breaker_half_open_max_calls": 1,
+            "micro_batching": False,
+            "batch_max_size": 50,
+            "batch_max_wait_ms": 5,
+        },
+        "configs": {
+            "read_timeout": 0.5,
+        },
+        "users": {
+            "read_timeout": 0.3,
+        },
+        "payments": {
+            "max_connections": 10,
+            "max_concurrent_requests": 10,
+            "read_timeout": 2.0,
+            "retry_attempts": 3,
+            "retry_backoff_base": 0.05,
+            "retry_backoff_max": 0.5,
+            "retry_min_budget": 0.2,
+        },
+    },
 })
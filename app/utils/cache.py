@@ -1,5 +1,11 @@
-from threading import RLock
-from typing import Generic, Optional, TypeVar
+import asyncio
+import heapq
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from threading import Lock, RLock
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
 
 from cachetools import TTLCache
 
@@ -8,10 +14,82 @@ K = TypeVar("K")
 V = TypeVar("V")
 
 
-class ThreadSafeTTLCache(Generic[K, V]):
+class _SingleFlightCache(ABC, Generic[K, V]):
+    """
+    `get_or_load`/`get_or_load_async` on top of a cache that implements `_join` and `_settle`.
+    """
+
+    @abstractmethod
+    def _join(self, key: K) -> tuple[Optional[V], Optional[Future], bool]:
+        """
+        Returns (cached value, in-flight load, whether the caller leads the load) for a lookup of `key`.
+        """
+
+    @abstractmethod
+    def _settle(self, key: K, value: Optional[V], store: bool) -> None:
+        """
+        Ends the in-flight load of `key`, caching `value` when `store` is set.
+        """
+
+    def _finish(self, key: K, future: Future, value: Optional[V] = None, error: Optional[BaseException] = None) -> None:
+        self._settle(key, value, error is None)
+        if error is None:
+            future.set_result(value)
+        elif isinstance(error, (CancelledError, asyncio.CancelledError)):
+            future.cancel()
+        else:
+            future.set_exception(error)
+
+    def get_or_load(self, key: K, loader: Callable[[], V]) -> V:
+        """
+        Returns the cached value or loads it; concurrent misses for the same key share one loader call.
+        """
+        while True:
+            value, future, leader = self._join(key)
+            if future is None:
+                return value
+            if not leader:
+                try:
+                    return future.result()
+                except CancelledError:
+                    continue
+            try:
+                value = loader()
+            except BaseException as exc:
+                self._finish(key, future, error=exc)
+                raise
+            self._finish(key, future, value)
+            return value
+
+    async def get_or_load_async(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """
+        Async counterpart of `get_or_load`; shares in-flight loads with sync callers of the same cache.
+        """
+        while True:
+            value, future, leader = self._join(key)
+            if future is None:
+                return value
+            if not leader:
+                try:
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except asyncio.CancelledError:
+                    if future.cancelled() and not asyncio.current_task().cancelling():
+                        continue
+                    raise
+            try:
+                value = await loader()
+            except BaseException as exc:
+                self._finish(key, future, error=exc)
+                raise
+            self._finish(key, future, value)
+            return value
+
+
+class ThreadSafeTTLCache(_SingleFlightCache[K, V]):
     def __init__(self, maxsize: int, ttl: float):
         self._cache: TTLCache[K, V] = TTLCache(maxsize=maxsize, ttl=ttl)
         self._lock = RLock()
+        self._in_flight: dict[K, Future] = {}
 
     def get(self, key: K) -> Optional[V]:
         with self._lock:
@@ -21,6 +99,270 @@ class ThreadSafeTTLCache(Generic[K, V]):
         with self._lock:
             self._cache[key] = value
 
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
     def clear(self) -> None:
         with self._lock:
             self._cache.clear()
+
+    def _join(self, key: K) -> tuple[Optional[V], Optional[Future], bool]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                return value, None, False
+            future = self._in_flight.get(key)
+            if future is not None:
+                return None, future, False
+            future = self._in_flight[key] = Future()
+            return None, future, True
+
+    def _settle(self, key: K, value: Optional[V], store: bool) -> None:
+        with self._lock:
+            if store:
+                self._cache[key] = value
+            self._in_flight.pop(key, None)
+
+
+_MASK64 = (1 << 64) - 1
+_HALVE = bytes(count >> 1 for count in range(256))
+
+
+def _mix(key) -> int:
+    # splitmix64 finalizer; keys of one shard share the low bits of their hash
+    x = hash(key) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class TinyLFU:
+    """
+    TinyLFU frequency sketch: 4-bit count-min counters behind a doorkeeper Bloom filter, halved every
+    `sample_factor * capacity` records.
+    """
+
+    __slots__ = ("_rows", "_mask", "_door", "_door_mask", "_samples", "_sample_size")
+
+    def __init__(self, capacity: int, sample_factor: int = 10):
+        width = 1 << max(4, (capacity - 1).bit_length())
+        self._rows = [bytearray(width) for _ in range(4)]
+        self._mask = width - 1
+        self._samples = 0
+        self._sample_size = sample_factor * max(1, capacity)
+        # ~8 doorkeeper bits per key of a sample period
+        door_bytes = 1 << max(4, (self._sample_size - 1).bit_length())
+        self._door = bytearray(door_bytes)
+        self._door_mask = door_bytes * 8 - 1
+
+    def _door_bits(self, h1: int, h2: int) -> tuple[int, int]:
+        return h1 & self._door_mask, (h1 + h2) & self._door_mask
+
+    def _in_door(self, h1: int, h2: int) -> bool:
+        door = self._door
+        return all(door[bit >> 3] & (1 << (bit & 7)) for bit in self._door_bits(h1, h2))
+
+    def record(self, key) -> None:
+        x = _mix(key)
+        h1, h2 = x & 0xFFFFFFFF, (x >> 32) | 1
+        if not self._in_door(h1, h2):
+            for bit in self._door_bits(h1, h2):
+                self._door[bit >> 3] |= 1 << (bit & 7)
+        else:
+            # conservative update: only the counters at the minimum grow
+            indexes = [(h1 + i * h2) & self._mask for i in range(len(self._rows))]
+            count = min(row[index] for row, index in zip(self._rows, indexes))
+            if count < 15:
+                for row, index in zip(self._rows, indexes):
+                    if row[index] == count:
+                        row[index] = count + 1
+        self._samples += 1
+        if self._samples >= self._sample_size:
+            self._rows = [row.translate(_HALVE) for row in self._rows]
+            self._door = bytearray(len(self._door))
+            self._samples //= 2
+
+    def estimate(self, key) -> int:
+        x = _mix(key)
+        h1, h2 = x & 0xFFFFFFFF, (x >> 32) | 1
+        count = min(row[(h1 + i * h2) & self._mask] for i, row in enumerate(self._rows))
+        return count + 1 if self._in_door(h1, h2) else count
+
+    def admit(self, candidate, victim) -> bool:
+        """
+        Whether `candidate` has been accessed more often than `victim` and should replace it.
+        """
+        return self.estimate(candidate) > self.estimate(victim)
+
+
+class _Shard:
+    __slots__ = ("lock", "entries", "window", "sketch", "buckets", "bucket_heap", "in_flight")
+
+    def __init__(self, sketch: Optional[TinyLFU] = None):
+        self.lock = Lock()
+        # key -> (value, expires_at); ordered from least to most recently used
+        self.entries: OrderedDict = OrderedDict()
+        # newly cached keys wait here for admission into `entries` (only with a sketch)
+        self.window: OrderedDict = OrderedDict()
+        self.sketch = sketch
+        self.buckets: dict[int, set] = {}
+        self.bucket_heap: list[int] = []
+        self.in_flight: dict = {}
+
+    def pop(self, key):
+        entry = self.entries.pop(key, None)
+        return entry if entry is not None else self.window.pop(key, None)
+
+
+class ShardedTTLCache(_SingleFlightCache[K, V]):
+    """
+    `ThreadSafeTTLCache` split into independently locked LRU shards; expired entries are dropped on writes
+    in buckets of `resolution` seconds. With `admission`, shards use W-TinyLFU admission.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        shards: int = 16,
+        resolution: float = 1.0,
+        timer: Callable[[], float] = time.monotonic,
+        admission: bool = False,
+        window_ratio: float = 0.01,
+    ):
+        shards = 1 << max(0, min(shards, maxsize) - 1).bit_length()
+        self._mask = shards - 1
+        self._shard_maxsize = max(1, -(-maxsize // shards))
+        admission = admission and self._shard_maxsize >= 2
+        self._window_maxsize = max(1, int(self._shard_maxsize * window_ratio)) if admission else 0
+        self._main_maxsize = self._shard_maxsize - self._window_maxsize
+        self._shards = [
+            _Shard(TinyLFU(self._shard_maxsize) if admission else None) for _ in range(shards)
+        ]
+        self._ttl = ttl
+        self._resolution = resolution
+        self._timer = timer
+
+    def _shard(self, key: K) -> _Shard:
+        return self._shards[hash(key) & self._mask]
+
+    def _bucket(self, expires_at: float) -> int:
+        return int(expires_at // self._resolution) + 1
+
+    def _unbucket(self, shard: _Shard, key: K, expires_at: float) -> None:
+        bucket = self._bucket(expires_at)
+        keys = shard.buckets.get(bucket)
+        if keys is not None:
+            # emptied buckets stay until `_expire` pops them off the heap
+            keys.discard(key)
+
+    def _expire(self, shard: _Shard, now: float) -> None:
+        heap = shard.bucket_heap
+        while heap and heap[0] * self._resolution <= now:
+            for key in shard.buckets.pop(heapq.heappop(heap), ()):
+                shard.pop(key)
+
+    def _evict_lru(self, shard: _Shard, segment: OrderedDict) -> None:
+        evicted, (_, evicted_expires_at) = segment.popitem(last=False)
+        self._unbucket(shard, evicted, evicted_expires_at)
+
+    def _admit_from_window(self, shard: _Shard) -> None:
+        candidate = next(iter(shard.window))
+        if len(shard.entries) >= self._main_maxsize:
+            if not shard.sketch.admit(candidate, next(iter(shard.entries))):
+                self._evict_lru(shard, shard.window)
+                return
+            self._evict_lru(shard, shard.entries)
+        shard.entries[candidate] = shard.window.pop(candidate)
+
+    def _store(self, shard: _Shard, key: K, value: V, ttl: Optional[float] = None) -> None:
+        now = self._timer()
+        self._expire(shard, now)
+        expires_at = now + (self._ttl if ttl is None else ttl)
+        bucket = self._bucket(expires_at)
+        segment = shard.entries
+        if key in shard.window or (shard.sketch is not None and key not in shard.entries):
+            segment = shard.window
+        old = segment.pop(key, None)
+        if old is not None:
+            self._unbucket(shard, key, old[1])
+        segment[key] = (value, expires_at)
+        keys = shard.buckets.get(bucket)
+        if keys is None:
+            keys = shard.buckets[bucket] = set()
+            heapq.heappush(shard.bucket_heap, bucket)
+        keys.add(key)
+        if shard.sketch is None:
+            while len(shard.entries) > self._shard_maxsize:
+                self._evict_lru(shard, shard.entries)
+        else:
+            while len(shard.window) > self._window_maxsize:
+                self._admit_from_window(shard)
+
+    def _lookup(self, shard: _Shard, key: K, now: float) -> Optional[V]:
+        if shard.sketch is not None:
+            shard.sketch.record(key)
+        segment = shard.entries
+        entry = segment.get(key)
+        if entry is None:
+            segment = shard.window
+            entry = segment.get(key)
+            if entry is None:
+                return None
+        value, expires_at = entry
+        if expires_at <= now:
+            del segment[key]
+            self._unbucket(shard, key, expires_at)
+            return None
+        segment.move_to_end(key)
+        return value
+
+    def get(self, key: K) -> Optional[V]:
+        shard = self._shard(key)
+        now = self._timer()
+        with shard.lock:
+            return self._lookup(shard, key, now)
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            self._store(shard, key, value, ttl)
+
+    def delete(self, key: K) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.pop(key)
+            if entry is not None:
+                self._unbucket(shard, key, entry[1])
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.window.clear()
+                shard.buckets.clear()
+                shard.bucket_heap.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) + len(shard.window) for shard in self._shards)
+
+    def _join(self, key: K) -> tuple[Optional[V], Optional[Future], bool]:
+        shard = self._shard(key)
+        now = self._timer()
+        with shard.lock:
+            value = self._lookup(shard, key, now)
+            if value is not None:
+                return value, None, False
+            future = shard.in_flight.get(key)
+            if future is not None:
+                return None, future, False
+            future = shard.in_flight[key] = Future()
+            return None, future, True
+
+    def _settle(self, key: K, value: Optional[V], store: bool) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            if store:
+                self._store(shard, key, value)
+            shard.in_flight.pop(key, None)
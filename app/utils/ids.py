@@ -0,0 +1,44 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def uuid7(at: Optional[datetime] = None) -> uuid.UUID:
+    """
+    RFC 9562 UUIDv7: 48-bit Unix timestamp in milliseconds followed by 74 random bits,
+    so ids sort by creation time and the creation time can be recovered from the id.
+    """
+    at = at or datetime.now(timezone.utc)
+    unix_ts_ms = int(at.timestamp() * 1000)
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (unix_ts_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                      # version
+    value |= ((rand >> 62) & 0xFFF) << 64   # rand_a
+    value |= 0b10 << 62                     # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF   # rand_b
+    return uuid.UUID(int=value)
+
+
+def parse_uuid(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+# a 48-bit timestamp reaches year 10889; later ones are not creation times (and leave room for ± windows)
+_UUID7_MAX_MS = int(datetime(9999, 12, 31, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def uuid7_time(value: uuid.UUID) -> Optional[datetime]:
+    """
+    Creation time encoded in a UUIDv7 (millisecond precision); None for other UUID versions
+    and for timestamps past year 9999.
+    """
+    if value.version != 7:
+        return None
+    unix_ts_ms = value.int >> 80
+    if unix_ts_ms >= _UUID7_MAX_MS:
+        return None
+    return datetime.fromtimestamp(unix_ts_ms / 1000, tz=timezone.utc)
@@ -0,0 +1,5 @@
+-- Per-user order history (GET /users/{user_id}/orders): keyset pagination on (created_at, id) newest first.
+-- Created on the partitioned parent, so every existing and future (partman-made) partition gets it.
+-- On a large live table build it per partition with CREATE INDEX CONCURRENTLY and ALTER INDEX ... ATTACH
+-- PARTITION on an index created with ON ONLY orders, to avoid locking writes for the whole build.
+CREATE INDEX IF NOT EXISTS idx_orders_user_created ON orders (user_id, created_at DESC, id DESC);
@@ -0,0 +1,7 @@
+-- Orders of archived (dropped) daily partitions live in columnar files, one per day.
+-- UUIDv7 ids carry their creation time, so their file is found from the id alone; this table maps the
+-- remaining legacy (pre-UUIDv7) ids to the day they were archived under.
+CREATE TABLE IF NOT EXISTS orders_archive_index (
+    id UUID PRIMARY KEY,
+    archived_day DATE NOT NULL
+);
@@ -0,0 +1,84 @@
+"""
+Hit ratio of the orders cache with plain LRU eviction versus W-TinyLFU admission on a synthetic trace:
+active rides are started (cached on insert), polled until they finish and then dropped, mixed with random
+one-off lookups of historical orders (support tools, old links), all cached look-aside on a miss.
+
+    python scripts/bench_cache_admission.py --capacity 10000 --active 8000 --history-share 0.3,0.5,0.7
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.utils.cache import ShardedTTLCache
+
+
+def _trace(requests: int, active: int, polls_per_ride: int, history_share: float, history_keys: int, seed: int):
+    """
+    Yields ("start" | "poll" | "history", key); the number of active rides stays at `active`.
+    """
+    rng = random.Random(seed)
+    next_ride = 0
+    rides: list[list] = []
+    for _ in range(active):
+        rides.append([f"ride-{next_ride}", rng.randrange(1, polls_per_ride * 2)])
+        next_ride += 1
+        yield "start", rides[-1][0]
+    for _ in range(requests):
+        if rng.random() < history_share:
+            yield "history", f"history-{rng.randrange(history_keys)}"
+            continue
+        index = rng.randrange(len(rides))
+        ride = rides[index]
+        yield "poll", ride[0]
+        ride[1] -= 1
+        if ride[1] == 0:
+            rides[index] = [f"ride-{next_ride}", rng.randrange(1, polls_per_ride * 2)]
+            next_ride += 1
+            yield "start", rides[index][0]
+
+
+def _run(cache: ShardedTTLCache, trace) -> dict[str, tuple[int, int]]:
+    stats = {"poll": [0, 0], "history": [0, 0]}
+    for kind, key in trace:
+        if kind == "start":
+            cache.set(key, kind)
+            continue
+        hit = cache.get(key) is not None
+        stats[kind][0] += hit
+        stats[kind][1] += 1
+        if not hit:
+            cache.set(key, kind)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--capacity", type=int, default=10_000)
+    parser.add_argument("--active", type=int, default=8_000)
+    parser.add_argument("--polls-per-ride", type=int, default=50)
+    parser.add_argument("--history-keys", type=int, default=5_000_000)
+    parser.add_argument("--history-share", default="0.3,0.5,0.7", help="comma-separated list, one run per value")
+    args = parser.parse_args()
+
+    print(f"{'history share':>13} {'policy':>10} {'overall':>8} {'polls':>8} {'history':>8}")
+    for share in (float(value) for value in args.history_share.split(",")):
+        for name, admission in (("lru", False), ("w-tinylfu", True)):
+            cache = ShardedTTLCache(maxsize=args.capacity, ttl=10**9, admission=admission)
+            stats = _run(
+                cache,
+                _trace(args.requests, args.active, args.polls_per_ride, share, args.history_keys, seed=1),
+            )
+            hits = sum(hit for hit, _ in stats.values())
+            total = sum(count for _, count in stats.values())
+            polls, history = (hit / max(count, 1) for hit, count in stats.values())
+            print(f"{share:>13.1f} {name:>10} {hits / total:>8.1%} {polls:>8.1%} {history:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
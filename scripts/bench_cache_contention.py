@@ -0,0 +1,94 @@
+"""
+Throughput and tail latency of ThreadSafeTTLCache (one lock) versus ShardedTTLCache (striped locks) under
+concurrent reads and writes, at several thread counts:
+
+    python scripts/bench_cache_contention.py --threads 8,32,64 --duration 3 --write-ratio 0.05
+
+Each thread does random get/set calls over a prefilled key space, like GET /orders hits with a trickle of
+new and finished orders.
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.utils.cache import ShardedTTLCache, ThreadSafeTTLCache
+
+
+def _run(cache, threads: int, duration: float, keys: list[str], write_ratio: float) -> tuple[int, list[float]]:
+    ops = [0] * threads
+    samples: list[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+    stop = threading.Event()
+
+    def worker(index: int):
+        rng = random.Random(index)
+        local = []
+        count = 0
+        barrier.wait()
+        while not stop.is_set():
+            key = keys[rng.randrange(len(keys))]
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                cache.set(key, key)
+            else:
+                cache.get(key)
+            if count % 64 == 0:
+                local.append(time.perf_counter() - start)
+            count += 1
+        ops[index] = count
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    time.sleep(duration)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sum(ops), sorted(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", default="8,32,64")
+    parser.add_argument("--duration", type=float, default=3)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--maxsize", type=int, default=150_000)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    keys = [f"order-{i}" for i in range(args.keys)]
+    factories = {
+        "ThreadSafeTTLCache": lambda: ThreadSafeTTLCache(maxsize=args.maxsize, ttl=3600),
+        f"ShardedTTLCache/{args.shards}": lambda: ShardedTTLCache(maxsize=args.maxsize, ttl=3600, shards=args.shards),
+    }
+    print(f"python {sys.version.split()[0]}, GIL {'enabled' if getattr(sys, '_is_gil_enabled', lambda: True)() else 'disabled'}")
+    print(f"{'cache':22} {'threads':>7} {'ops/s':>12} {'p50 us':>8} {'p99 us':>8} {'p99.9 us':>9}")
+    for threads in (int(value) for value in args.threads.split(",")):
+        for name, factory in factories.items():
+            cache = factory()
+            for key in keys:
+                cache.set(key, key)
+            ops, samples = _run(cache, threads, args.duration, keys, args.write_ratio)
+            p99 = samples[int(len(samples) * 0.99)] * 1e6
+            p999 = samples[min(len(samples) - 1, int(len(samples) * 0.999))] * 1e6
+            print(
+                f"{name:22} {threads:>7} {ops / args.duration:>12,.0f} "
+                f"{statistics.median(samples) * 1e6:>8.2f} {p99:>8.2f} {p999:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
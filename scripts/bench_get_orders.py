@@ -0,0 +1,95 @@
+"""
+Open-loop GET /orders/{id} load against a running API, for comparing API_MODE=sync and API_MODE=async.
+
+Requests are issued on a fixed schedule (not after the previous one returns), and latency is measured from
+the scheduled send time, so a saturated server shows up as tail latency instead of a lower request rate.
+
+    API_MODE=sync  uvicorn app.main:app --port 8000 &   # then, after stopping it:
+    API_MODE=async uvicorn app.main:app --port 8000 &
+    python scripts/bench_get_orders.py --url http://localhost:8000 --rps 1000 --duration 30 --miss-ratio 0.2
+
+`--miss-ratio` is the share of requests for ids that do not exist; those always reach the database.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def _seed_orders(client: httpx.AsyncClient, count: int) -> list[str]:
+    order_ids = []
+    for i in range(count):
+        resp = await client.post("/offers", json={"user_id": "user-1", "scooter_id": f"bench-scooter-{i}"})
+        resp.raise_for_status()
+        data = resp.json()
+        resp = await client.post("/orders", json={"offer": data["offer"], "pricing_token": data["pricing_token"]})
+        resp.raise_for_status()
+        order_ids.append(resp.json()["id"])
+    return order_ids
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        order_ids = await _seed_orders(client, args.orders)
+        latencies: list[float] = []
+        statuses: dict[str, int] = {}
+
+        async def one(scheduled: float, order_id: str) -> None:
+            try:
+                resp = await client.get(f"/orders/{order_id}")
+                status = str(resp.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - scheduled)
+            statuses[status] = statuses.get(status, 0) + 1
+
+        total = int(args.rps * args.duration)
+        interval = 1.0 / args.rps
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            order_id = str(uuid.uuid4()) if random.random() < args.miss_ratio else random.choice(order_ids)
+            tasks.append(asyncio.create_task(one(scheduled, order_id)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"mode={args.label} target_rps={args.rps} achieved_rps={total / elapsed:.0f} requests={total}")
+    print(
+        f"p50={statistics.median(latencies) * 1000:.1f}ms p90={_percentile(latencies, 0.90) * 1000:.1f}ms "
+        f"p99={_percentile(latencies, 0.99) * 1000:.1f}ms p99.9={_percentile(latencies, 0.999) * 1000:.1f}ms "
+        f"max={latencies[-1] * 1000:.1f}ms"
+    )
+    print("statuses:", dict(sorted(statuses.items())))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--label", default="", help="printed with the results, e.g. sync or async")
+    parser.add_argument("--rps", type=float, default=1000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--orders", type=int, default=200, help="orders created before the run")
+    parser.add_argument("--miss-ratio", type=float, default=0.2)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=10)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compares single-id and micro-batched scooter/zone lookups against the local stubs.
+
+    python stubs/fastapi_stubs.py &
+    python scripts/bench_upstream_batching.py --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.clients import data_requests as dr
+from app.clients import http
+
+
+async def _lookup(scooter_id: str, batched: bool, limit: asyncio.Semaphore) -> float:
+    async with limit:
+        start = time.perf_counter()
+        if batched:
+            scooter = await dr._scooter_batcher.load(scooter_id)
+            await dr._tariff_zone_batcher.load(scooter.zone_id)
+        else:
+            scooter = await dr._fetch_scooter_data(scooter_id)
+            await dr._fetch_tariff_zone(scooter.zone_id)
+        return time.perf_counter() - start
+
+
+async def _run(requests: int, concurrency: int, batched: bool) -> None:
+    # stay within the per-upstream bulkhead, otherwise single-id mode is rejected rather than measured
+    limit = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(_lookup(f"scooter-{i}", batched, limit) for i in range(requests))))
+    total = time.perf_counter() - start
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(
+        f"{'batched' if batched else 'single ':8} requests={requests} concurrency={concurrency} total={total * 1000:.1f}ms "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms p99={p99 * 1000:.1f}ms"
+    )
+    await http.aclose_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.concurrency, batched=False))
+    asyncio.run(_run(args.requests, args.concurrency, batched=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Bytes per cached order in the orders cache: OrderData objects keyed by id strings (the previous layout)
+versus CompactOrder records keyed by UUID bytes (the current one), with the cache's own bookkeeping included:
+
+    python scripts/report_order_cache_memory.py --orders 150000
+"""
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+from uuid import UUID
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.models import CompactOrder, OrderData
+from app.utils.cache import ShardedTTLCache
+from app.utils.ids import uuid7
+
+
+def _orders(count: int) -> Iterator[OrderData]:
+    """
+    Fresh orders, as they arrive from DB rows or requests: no objects are shared between them.
+    """
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+    for _ in range(count):
+        start_time = now - timedelta(seconds=rng.randrange(7200))
+        finished = rng.random() < 0.5
+        yield OrderData(
+            str(uuid7(start_time)),
+            f"user-{rng.randrange(count)}",
+            f"scooter-{rng.randrange(20_000)}",
+            f"zone-{rng.randrange(200)}",
+            rng.randrange(5, 20),
+            rng.randrange(30, 100),
+            rng.randrange(200, 2000),
+            rng.randrange(0, 5000) if finished else 0,
+            start_time,
+            start_time + timedelta(seconds=rng.randrange(60, 3600)) if finished else None,
+        )
+
+
+def _measure(count: int, fill) -> int:
+    """
+    Bytes still held by the cache after `fill` cached `count` orders.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = fill(count)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cache
+    return after - before
+
+
+def _fill_order_data(count: int) -> ShardedTTLCache:
+    cache = ShardedTTLCache(maxsize=count, ttl=7200)
+    for order in _orders(count):
+        cache.set(order.id, order)
+    return cache
+
+
+def _fill_compact(count: int) -> ShardedTTLCache:
+    cache = ShardedTTLCache(maxsize=count, ttl=7200)
+    for order in _orders(count):
+        key = UUID(order.id).bytes
+        cache.set(key, CompactOrder.from_order(order, key))
+    return cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=150_000)
+    args = parser.parse_args()
+
+    before = _measure(args.orders, _fill_order_data)
+    after = _measure(args.orders, _fill_compact)
+    print(f"{'layout':34} {'total MB':>9} {'bytes/order':>12}")
+    print(f"{'OrderData, str keys':34} {before / 2**20:>9.1f} {before / args.orders:>12.0f}")
+    print(f"{'CompactOrder, UUID-bytes keys':34} {after / 2**20:>9.1f} {after / args.orders:>12.0f}")
+    print(f"saved: {1 - after / before:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,15 @@ async def get_scooter_data(id: Optional[str] = Query(None, description="An optio
     return ScooterData(id, 'korolev', 57)
 
 
+class BatchRequest(BaseModel):
+    ids: list[str]
+
+
+@app.post("/scooter-data/batch")
+async def get_scooter_data_batch(request: BatchRequest):
+    return [ScooterData(id, 'korolev', 57) for id in request.ids]
+
+
 @app.get("/tariff-zone-data")
 async def get_tariff_zone_data(id: Optional[str] = Query(None, description="An optional ID parameter")):
     if id is None:
@@ -29,6 +38,11 @@ async def get_tariff_zone_data(id: Optional[str] = Query(None, description="An o
     return TariffZone(id, price_per_minute=12, price_unlock=45, default_deposit=300)
 
 
+@app.post("/tariff-zone-data/batch")
+async def get_tariff_zone_data_batch(request: BatchRequest):
+    return [TariffZone(id, price_per_minute=12, price_unlock=45, default_deposit=300) for id in request.ids]
+
+
 @app.get("/user-profile")
 async def get_user_profile(id: Optional[str] = Query(None, description="An optional ID parameter")):
     users_db_mock = {
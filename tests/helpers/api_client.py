@@ -17,6 +17,16 @@ def create_offer(user_id: str, scooter_id: str) -> Tuple[dict, str]:
     return data["offer"], data["pricing_token"]
 
 
+def create_offers_bulk(user_id: str, scooter_ids: list[str]) -> dict:
+    resp = requests.post(
+        f"{API_URL}/offers/bulk",
+        json={"user_id": user_id, "scooter_ids": scooter_ids},
+        timeout=5,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
 def start_order(offer: dict, token: str) -> dict:
     resp = requests.post(
         f"{API_URL}/orders",
@@ -37,3 +47,9 @@ def get_order(order_id: str) -> dict:
     resp = requests.get(f"{API_URL}/orders/{order_id}", timeout=5)
     resp.raise_for_status()
     return resp.json()
+
+
+def list_user_orders(user_id: str, **params) -> dict:
+    resp = requests.get(f"{API_URL}/users/{user_id}/orders", params=params, timeout=5)
+    resp.raise_for_status()
+    return resp.json()
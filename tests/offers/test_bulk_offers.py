@@ -0,0 +1,40 @@
+import pytest
+
+from tests.helpers.api_client import create_offers_bulk, start_order
+
+
+@pytest.mark.integration
+def test_bulk_offers_price_every_scooter():
+    data = create_offers_bulk("user-1", ["scooter-1", "scooter-2", "scooter-3"])
+
+    assert data["error"] is None
+    assert [item["scooter_id"] for item in data["offers"]] == ["scooter-1", "scooter-2", "scooter-3"]
+    for item in data["offers"]:
+        assert item["offer"]["user_id"] == "user-1"
+        assert item["offer"]["scooter_id"] == item["scooter_id"]
+        assert item["pricing_token"]
+
+
+@pytest.mark.integration
+def test_bulk_offers_drop_duplicate_scooters():
+    data = create_offers_bulk("user-1", ["scooter-1", "scooter-1"])
+
+    assert [item["scooter_id"] for item in data["offers"]] == ["scooter-1"]
+
+
+@pytest.mark.integration
+def test_bulk_offers_user_with_debt():
+    data = create_offers_bulk("user-2", ["scooter-1", "scooter-2"])
+
+    assert data["error"] == "User has debt"
+    assert data["offers"] == []
+
+
+@pytest.mark.integration
+def test_bulk_offer_can_start_order():
+    data = create_offers_bulk("user-1", ["scooter-4", "scooter-5"])
+    item = data["offers"][1]
+
+    order = start_order(item["offer"], item["pricing_token"])
+
+    assert order["scooter_id"] == "scooter-5"
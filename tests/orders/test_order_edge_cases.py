@@ -1,7 +1,10 @@
 import time
+import uuid
+
 import pytest
+import requests
 
-from tests.helpers.api_client import create_offer, start_order, finish_order, get_order
+from tests.helpers.api_client import API_URL, create_offer, start_order, finish_order, get_order
 
 
 @pytest.mark.integration
@@ -98,3 +101,28 @@ def test_order_start_time_is_set():
     assert "start_time" in order
     assert order["start_time"] is not None
     assert "T" in order["start_time"]
+
+
+@pytest.mark.integration
+def test_order_id_is_time_ordered():
+    """New order ids should be UUIDv7"""
+    offer, token = create_offer("user-1", "scooter-1")
+    order = start_order(offer, token)
+
+    assert uuid.UUID(order["id"]).version == 7
+
+
+@pytest.mark.integration
+def test_get_order_with_malformed_id():
+    """Non-UUID order ids should be 404, not a database error"""
+    resp = requests.get(f"{API_URL}/orders/not-a-uuid", timeout=5)
+
+    assert resp.status_code == 404
+
+
+@pytest.mark.integration
+def test_get_order_with_unknown_legacy_id():
+    """Unknown UUIDv4 ids still go through the fallback lookup"""
+    resp = requests.get(f"{API_URL}/orders/{uuid.uuid4()}", timeout=5)
+
+    assert resp.status_code == 404
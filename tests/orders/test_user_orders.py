@@ -0,0 +1,40 @@
+import uuid
+
+import pytest
+import requests
+
+from tests.helpers.api_client import API_URL, create_offer, list_user_orders, start_order
+
+
+@pytest.mark.integration
+def test_user_orders_are_paged_newest_first():
+    user_id = f"user-history-{uuid.uuid4()}"
+    started = []
+    for scooter_id in ("scooter-1", "scooter-2", "scooter-3"):
+        offer, token = create_offer(user_id, scooter_id)
+        started.append(start_order(offer, token)["id"])
+
+    first = list_user_orders(user_id, limit=2)
+    second = list_user_orders(user_id, limit=2, cursor=first["next_cursor"])
+
+    assert [order["id"] for order in first["orders"]] == started[::-1][:2]
+    assert [order["id"] for order in second["orders"]] == started[:1]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.integration
+def test_user_orders_reject_too_wide_window():
+    resp = requests.get(
+        f"{API_URL}/users/user-1/orders",
+        params={"created_from": "2020-01-01T00:00:00Z", "created_to": "2026-01-01T00:00:00Z"},
+        timeout=5,
+    )
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.integration
+def test_user_orders_reject_malformed_cursor():
+    resp = requests.get(f"{API_URL}/users/user-1/orders", params={"cursor": "not-a-cursor"}, timeout=5)
+
+    assert resp.status_code == 400
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.models import OrderData
+from app.utils.ids import uuid7
+
+
+def make_order(
+    order_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    finish_time: Optional[datetime] = None,
+) -> OrderData:
+    start_time = start_time or datetime.now(timezone.utc)
+    order_id = order_id or str(uuid7(start_time))
+    return OrderData(order_id, "user-1", "scooter-1", "zone-1", 10, 50, 300, 0, start_time, finish_time)
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
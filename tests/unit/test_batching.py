@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.clients.batching import MicroBatcher
+
+
+def _recording_batcher(**kwargs):
+    calls = []
+
+    async def load_batch(keys):
+        calls.append(list(keys))
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    return MicroBatcher("test", load_batch, **kwargs), calls
+
+
+def test_concurrent_lookups_share_one_batch():
+    """Test that lookups within the wait window go upstream as one batch"""
+    batcher, calls = _recording_batcher(max_wait=0.01)
+
+    async def lookups():
+        return await asyncio.gather(*(batcher.load(key) for key in ["a", "b", "a", "c"]))
+
+    assert asyncio.run(lookups()) == ["A", "B", "A", "C"]
+    assert calls == [["a", "b", "c"]]
+
+
+def test_full_batch_is_dispatched_without_waiting():
+    """Test that reaching max_batch_size flushes immediately and starts a new batch"""
+    batcher, calls = _recording_batcher(max_batch_size=2, max_wait=10)
+
+    async def lookups():
+        return await asyncio.wait_for(asyncio.gather(batcher.load("a"), batcher.load("b")), timeout=1)
+
+    assert asyncio.run(lookups()) == ["A", "B"]
+    assert calls == [["a", "b"]]
+
+
+def test_missing_key_fails_only_its_caller():
+    """Test that a key absent from the batch response raises LookupError for that caller"""
+    batcher, _ = _recording_batcher(max_wait=0.01)
+
+    async def lookups():
+        return await asyncio.gather(batcher.load("a"), batcher.load("missing"), return_exceptions=True)
+
+    found, missing = asyncio.run(lookups())
+
+    assert found == "A"
+    assert isinstance(missing, LookupError)
+
+
+def test_batch_failure_propagates_to_all_callers():
+    """Test that an upstream error is raised to every caller in the batch"""
+    async def failing(keys):
+        raise RuntimeError("zones down")
+
+    batcher = MicroBatcher("test", failing, max_wait=0.01)
+
+    async def lookups():
+        await asyncio.gather(batcher.load("a"), batcher.load("b"))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(lookups())
+
+
+def test_cancelled_dispatch_releases_callers():
+    """Test that callers are cancelled, not left hanging, when the batch dispatch is cancelled"""
+    async def lookups():
+        started = asyncio.Event()
+
+        async def hanging(keys):
+            started.set()
+            await asyncio.Event().wait()
+
+        batcher = MicroBatcher("test", hanging, max_wait=0)
+        caller = asyncio.ensure_future(batcher.load("a"))
+        await started.wait()
+        for task in asyncio.all_tasks():
+            if task is not caller and task is not asyncio.current_task():
+                task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1)
+
+    asyncio.run(lookups())
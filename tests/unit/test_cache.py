@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.cache import ShardedTTLCache, ThreadSafeTTLCache, TinyLFU
+from tests.unit.helpers import FakeTimer
+
+
+@pytest.fixture(params=[ThreadSafeTTLCache, ShardedTTLCache])
+def cache_cls(request):
+    return request.param
+
+
+def test_get_or_load_caches_value(cache_cls):
+    """Test that a loaded value is served from cache afterwards"""
+    cache = cache_cls(maxsize=10, ttl=60)
+    calls = []
+
+    assert cache.get_or_load("zone", lambda: calls.append(1) or "tariff") == "tariff"
+    assert cache.get_or_load("zone", lambda: calls.append(1) or "other") == "tariff"
+    assert len(calls) == 1
+
+
+def test_get_or_load_coalesces_concurrent_misses(cache_cls):
+    """Test that concurrent misses for one key share a single loader call"""
+    cache = cache_cls(maxsize=10, ttl=60)
+    calls = []
+    lock = threading.Lock()
+
+    def loader():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return "configs"
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: cache.get_or_load("config", loader), range(16)))
+
+    assert results == ["configs"] * 16
+    assert len(calls) == 1
+
+
+def test_get_or_load_shares_loader_error_and_retries_later(cache_cls):
+    """Test that waiters see the leader error and the key is not poisoned"""
+    cache = cache_cls(maxsize=10, ttl=60)
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        cache.get_or_load("zone", failing)
+
+    assert cache.get_or_load("zone", lambda: "tariff") == "tariff"
+
+
+def test_get_or_load_async_coalesces_concurrent_misses(cache_cls):
+    """Test that concurrent coroutines share a single async loader call"""
+    cache = cache_cls(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "tariff"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load_async("zone", loader) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["tariff"] * 10
+    assert len(calls) == 1
+
+
+def test_get_or_load_async_waiter_retries_after_leader_cancelled(cache_cls):
+    """Test that cancelling the leading coroutine does not fail the waiters"""
+    cache = cache_cls(maxsize=10, ttl=60)
+
+    async def slow():
+        await asyncio.sleep(10)
+        return "never"
+
+    async def fast():
+        return "tariff"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_load_async("zone", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load_async("zone", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "tariff"
+
+
+def test_sharded_entries_expire_after_ttl():
+    """Test that reads stop returning an entry once its TTL has passed"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=10, ttl=5, shards=4, timer=timer)
+    cache.set("order", "data")
+
+    timer.now += 4.9
+    assert cache.get("order") == "data"
+    timer.now += 0.2
+    assert cache.get("order") is None
+
+
+def test_sharded_writes_drop_expired_buckets():
+    """Test that expired entries are removed in bulk without being read"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=1000, ttl=5, shards=1, timer=timer)
+    for i in range(100):
+        cache.set(f"order-{i}", i)
+
+    timer.now += 10
+    cache.set("fresh", "data")
+
+    assert len(cache) == 1
+
+
+def test_sharded_rewrite_extends_ttl():
+    """Test that setting a key again moves it to a later expiry bucket"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=10, ttl=5, shards=1, timer=timer)
+    cache.set("order", "v1")
+    timer.now += 4
+    cache.set("order", "v2")
+    timer.now += 4
+    cache.set("other", "data")
+
+    assert cache.get("order") == "v2"
+
+
+def test_sharded_rewrites_do_not_grow_the_bucket_heap():
+    """Test that rewriting and re-adding a key within one tick keeps a single heap entry per bucket"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=10, ttl=60, shards=1, timer=timer)
+    for i in range(1000):
+        cache.set("order", i)
+        if i % 2:
+            cache.delete("order")
+
+    assert len(cache._shards[0].bucket_heap) == 1
+    timer.now += 61
+    cache.set("other", "data")
+    assert len(cache._shards[0].bucket_heap) == 1
+
+
+def test_sharded_evicts_least_recently_used():
+    """Test that a full shard evicts the entry read least recently"""
+    cache = ShardedTTLCache(maxsize=2, ttl=60, shards=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_sharded_small_cache_uses_fewer_shards():
+    """Test that tiny caches are not split into shards smaller than one entry"""
+    cache = ShardedTTLCache(maxsize=1, ttl=60, shards=16)
+    cache.set("configs", "snapshot")
+
+    assert cache.get("configs") == "snapshot"
+
+
+def test_sharded_per_entry_ttl():
+    """Test that an entry's own TTL overrides the cache-wide one"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=10, ttl=60, shards=1, timer=timer)
+    cache.set("finished", "data", ttl=5)
+    cache.set("active", "data")
+
+    timer.now += 10
+    cache.set("other", "data")
+
+    assert cache.get("finished") is None
+    assert cache.get("active") == "data"
+
+
+def test_tinylfu_counts_repeated_keys():
+    """Test that the sketch ranks often-seen keys above rare ones and forgets over time"""
+    sketch = TinyLFU(capacity=100, sample_factor=10)
+    for _ in range(10):
+        sketch.record("hot")
+    sketch.record("cold")
+
+    assert sketch.estimate("hot") > sketch.estimate("cold")
+    assert sketch.admit("hot", "cold")
+    assert not sketch.admit("cold", "hot")
+
+    before = sketch.estimate("hot")
+    for i in range(1000):
+        sketch.record(f"noise-{i}")
+    assert sketch.estimate("hot") < before
+
+
+@pytest.mark.parametrize("admission", [True, False])
+def test_admission_protects_frequent_entries_from_scans(admission):
+    """Test that a scan of one-off keys evicts often-read entries only without admission"""
+    cache = ShardedTTLCache(maxsize=1000, ttl=60, shards=1, admission=admission)
+    hot = [f"ride-{i}" for i in range(100)]
+    for key in hot:
+        cache.set(key, key)
+    for _ in range(5):
+        for key in hot:
+            cache.get(key)
+
+    for i in range(5000):
+        key = f"history-{i}"
+        if cache.get(key) is None:
+            cache.set(key, key)
+
+    survivors = sum(cache.get(key) is not None for key in hot)
+    # the sketch is approximate: a rare one-off key can collide with popular counters and win
+    assert survivors >= 95 if admission else survivors == 0
+    assert len(cache) <= 1000
+
+
+def test_admission_window_serves_new_entries():
+    """Test that a just-cached key is readable before it competes for the main segment"""
+    cache = ShardedTTLCache(maxsize=100, ttl=60, shards=1, admission=True)
+    cache.set("new", "data")
+
+    assert cache.get("new") == "data"
+    cache.delete("new")
+    assert cache.get("new") is None
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import CompactOrder
+from app.repository.cache import orders as orders_repo
+from app.utils.cache import ShardedTTLCache
+from tests.unit.helpers import FakeTimer, make_order
+
+# microseconds must survive packing
+_START = datetime(2026, 10, 17, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def test_compact_order_round_trip():
+    """Test that an order survives packing, including an open finish time"""
+    active = make_order(start_time=_START)
+    finished = make_order(start_time=_START, finish_time=_START + timedelta(minutes=7, microseconds=1))
+    finished.total_amount = 120
+
+    assert CompactOrder.from_order(active).to_order() == active
+    assert CompactOrder.from_order(finished).to_order() == finished
+
+
+def test_cache_returns_copies():
+    """Test that mutating an order read from the cache does not change the cached record"""
+    order = make_order(start_time=_START)
+    orders_repo.remember(order)
+
+    read = orders_repo._cached(order.id)
+    read.total_amount = 999
+
+    assert orders_repo._cached(order.id).total_amount == 0
+    orders_repo.evict(order.id)
+    assert orders_repo._cached(order.id) is None
+
+
+def test_non_uuid_ids_are_not_cached():
+    """Test that ids that cannot be orders are skipped instead of failing"""
+    assert orders_repo._cached("not-a-uuid") is None
+
+
+def test_finished_orders_keep_only_a_short_tail(monkeypatch):
+    """Test that finishing an order demotes it from the active TTL to the finished tail"""
+    timer = FakeTimer()
+    cache = ShardedTTLCache(maxsize=10, ttl=orders_repo._ORDER_ACTIVE_TTL_SECONDS, shards=1, timer=timer)
+    monkeypatch.setattr(orders_repo, "_order_cache", cache)
+    active, finished = make_order(start_time=_START), make_order(start_time=_START)
+    orders_repo.remember(active)
+    orders_repo.remember(finished)
+
+    finished.finish_time = finished.start_time + timedelta(minutes=5)
+    orders_repo.remember(finished)
+    timer.now += orders_repo._ORDER_FINISHED_TTL_SECONDS + 1
+
+    assert orders_repo._cached(active.id) is not None
+    assert orders_repo._cached(finished.id) is None
@@ -0,0 +1,115 @@
+import pytest
+
+from app.models import ConfigMap, ConfigSnapshot
+from app.repository.cache import configs as configs_repo
+
+
+@pytest.fixture
+def fresh_configs_cache(monkeypatch):
+    monkeypatch.setattr(configs_repo, "_last_good", None)
+    monkeypatch.setattr(configs_repo, "_last_good_at", None)
+    monkeypatch.setattr(configs_repo, "_last_dynamic", None)
+    monkeypatch.setattr(configs_repo, "_refresher_stopped", True)
+    configs_repo._config_cache.clear()
+    yield
+    configs_repo._config_cache.clear()
+
+
+def test_refresh_replaces_snapshot(fresh_configs_cache, monkeypatch):
+    """Test that a successful refresh merges dynamic configs over static ones"""
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v2"}))
+
+    assert configs_repo.refresh_configs()
+    configs = configs_repo.get_configs()
+
+    assert configs.tariff_version == "v2"
+    assert configs.cache_settings is not None
+
+
+def test_expired_snapshot_is_served_stale_when_upstream_fails(fresh_configs_cache, monkeypatch):
+    """Test that the last good snapshot survives TTL expiry and a failing upstream"""
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v2"}))
+    configs_repo.refresh_configs()
+
+    def failing():
+        raise RuntimeError("configs down")
+
+    monkeypatch.setattr(configs_repo.dr, "get_configs", failing)
+    assert not configs_repo.refresh_configs()
+    configs_repo._config_cache.clear()
+
+    assert configs_repo.get_configs().tariff_version == "v2"
+
+
+def test_stale_read_after_stop_does_not_restart_refresher(fresh_configs_cache, monkeypatch):
+    """Test that serving stale configs after shutdown leaves the refresher stopped"""
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v2"}))
+    configs_repo.refresh_configs()
+    configs_repo._config_cache.clear()
+    monkeypatch.setattr(configs_repo, "_refresher_stopped", False)
+    configs_repo.stop_refresher()
+
+    assert configs_repo.get_configs().tariff_version == "v2"
+    assert configs_repo._refresher is None
+
+
+def test_cold_start_failure_falls_back_to_static(fresh_configs_cache, monkeypatch):
+    """Test that the static config is used when configs were never fetched"""
+    def failing():
+        raise RuntimeError("configs down")
+
+    monkeypatch.setattr(configs_repo.dr, "get_configs", failing)
+
+    configs = configs_repo.get_configs()
+
+    assert configs.tariff_version is None
+    assert configs.pricing_rules["deposit_multiplier"] == 1.25
+
+
+def test_unchanged_payload_reuses_snapshot(fresh_configs_cache, monkeypatch):
+    """Test that refreshing identical dynamic configs does not merge or bump the version"""
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v2"}))
+    configs_repo.refresh_configs()
+    first = configs_repo.get_configs()
+
+    configs_repo.refresh_configs()
+    second = configs_repo.get_configs()
+
+    assert second is first
+    assert second.version == first.version
+
+
+def test_changed_payload_bumps_version(fresh_configs_cache, monkeypatch):
+    """Test that changed dynamic configs publish a new version"""
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v2"}))
+    configs_repo.refresh_configs()
+    first = configs_repo.get_configs()
+
+    monkeypatch.setattr(configs_repo.dr, "get_configs", lambda: ConfigMap({"tariff_version": "v3"}))
+    configs_repo.refresh_configs()
+    second = configs_repo.get_configs()
+
+    assert second.version == first.version + 1
+    assert second.tariff_version == "v3"
+    assert first.tariff_version == "v2"
+
+
+def test_snapshot_is_immutable():
+    """Test that snapshots reject attribute and nested writes"""
+    snapshot = ConfigSnapshot({"pricing_rules": {"deposit_multiplier": 1.25}})
+
+    with pytest.raises(AttributeError):
+        snapshot.pricing_rules = {}
+    with pytest.raises(TypeError):
+        snapshot.pricing_rules["deposit_multiplier"] = 2
+
+
+def test_snapshot_merge_keeps_nested_keys():
+    """Test that merging overrides nested keys one level deep like ConfigMap.merge"""
+    base = ConfigSnapshot({"price_coeff_settings": {"surge": 2.5, "low_charge_threshold": 28}}, version=3)
+
+    merged = base.merged(ConfigMap({"price_coeff_settings": {"surge": 2}}))
+
+    assert merged.version == 4
+    assert merged.price_coeff_settings == {"surge": 2, "low_charge_threshold": 28}
+    assert base.price_coeff_settings["surge"] == 2.5
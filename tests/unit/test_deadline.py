@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from app.clients import http
+from app.utils import deadline
+
+
+def test_remaining_is_none_without_deadline():
+    """Test that no deadline means an unbounded budget"""
+    assert deadline.remaining() is None
+    assert deadline.allows(3600)
+
+
+def test_deadline_scope_sets_and_resets():
+    """Test that the deadline is visible inside the scope only"""
+    with deadline.deadline_scope(1.0):
+        left = deadline.remaining()
+        assert 0 < left <= 1.0
+    assert deadline.remaining() is None
+
+
+def test_nested_scope_cannot_extend_deadline():
+    """Test that an inner scope keeps the earlier outer deadline"""
+    with deadline.deadline_scope(0.5):
+        with deadline.deadline_scope(10.0):
+            assert deadline.remaining() <= 0.5
+
+
+def test_check_raises_when_expired():
+    """Test that an expired deadline raises DeadlineExceeded"""
+    with deadline.deadline_scope(0.0):
+        time.sleep(0.001)
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check("payments")
+
+
+def test_deadline_propagates_to_client_loop():
+    """Test that run_sync carries the caller deadline onto the client loop"""
+    async def remaining():
+        return deadline.remaining()
+
+    with deadline.deadline_scope(2.0):
+        left = http.run_sync(remaining())
+
+    assert left is not None and 0 < left <= 2.0
+
+
+def test_request_fails_fast_after_deadline():
+    """Test that upstream requests are not sent once the deadline passed"""
+    async def call():
+        with deadline.deadline_scope(0.0):
+            await asyncio.sleep(0.001)
+            await http.request("users", "GET", "/user-profile")
+
+    with pytest.raises(deadline.DeadlineExceeded):
+        http.run_sync(call())
+
+
+def test_backoff_delay_is_capped():
+    """Test that jittered backoff never exceeds the configured cap"""
+    cap = http.upstream_settings("payments")["retry_backoff_max"]
+    delays = [http.backoff_delay("payments", attempt) for attempt in range(1, 20)]
+
+    assert all(0 <= delay <= cap for delay in delays)
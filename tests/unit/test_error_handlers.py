@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.errors import register_exception_handlers
+from app.clients.resilience import UpstreamUnavailable
+from app.utils.deadline import DeadlineExceeded
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    register_exception_handlers(app)
+    request = httpx.Request("POST", "http://payments/hold")
+    errors = {
+        "read-timeout": httpx.ReadTimeout("timed out", request=request),
+        "connect-error": httpx.ConnectError("connection refused", request=request),
+        "deadline": DeadlineExceeded("scooters: deadline exceeded"),
+        "circuit": UpstreamUnavailable("payments", "circuit open"),
+    }
+
+    @app.get("/fail/{kind}")
+    def fail(kind: str):
+        raise errors[kind]
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize(
+    "kind, status",
+    [("read-timeout", 504), ("connect-error", 503), ("deadline", 504), ("circuit", 503)],
+)
+def test_upstream_failures_ask_to_retry(client, kind, status):
+    """Test that upstream timeouts and transport errors are answered with 504/503 instead of 500"""
+    response = client.get(f"/fail/{kind}")
+
+    assert response.status_code == status
+    assert "try again later" in response.json()["detail"]
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+
+import psycopg
+import pytest
+
+from app.repository.db import user_summary as user_summary_db
+from app.repository.db.group_commit import GroupCommitWriter
+from app.utils import deadline
+from tests.unit.helpers import make_order
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = GroupCommitWriter(max_batch_size=8, max_wait=0.05)
+    writer.batches = []
+
+    def write(batch):
+        if any(item.order.id == "bad" for item in batch):
+            raise ValueError("duplicate key")
+        writer.batches.append([item.order.id for item in batch])
+
+    monkeypatch.setattr(writer, "_write", write)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def test_concurrent_inserts_share_one_commit(writer):
+    """Test that orders submitted within the wait window are committed together"""
+    futures = []
+    barrier = threading.Barrier(4)
+
+    def submit(i):
+        barrier.wait()
+        futures.append(writer.submit(make_order(f"order-{i}"), ("user-1", 0, 0, "success")))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(timeout=1)
+
+    assert len(writer.batches) == 1
+    assert sorted(writer.batches[0]) == [f"order-{i}" for i in range(4)]
+
+
+def test_bad_row_fails_only_its_caller(writer):
+    """Test that a failing batch is retried row by row"""
+    good = writer.submit(make_order("good"), ("user-1", 0, 0, None))
+    bad = writer.submit(make_order("bad"), ("user-1", 0, 0, None))
+
+    good.result(timeout=1)
+    with pytest.raises(ValueError):
+        bad.result(timeout=1)
+    assert ["good"] in writer.batches
+
+
+def test_stop_flushes_queued_orders(monkeypatch):
+    """Test that orders queued before shutdown are still written"""
+    writer = GroupCommitWriter(max_batch_size=8, max_wait=10)
+    written = []
+    monkeypatch.setattr(writer, "_write", lambda batch: written.extend(item.order.id for item in batch))
+    writer.start()
+
+    future = writer.submit(make_order("last"), ("user-1", 0, 0, None))
+    writer.stop()
+
+    future.result(timeout=1)
+    assert written == ["last"]
+
+
+def test_summary_deltas_are_merged_per_user():
+    """Test that deltas for one user fold into a single upsert row"""
+    merged = user_summary_db.merge_deltas([
+        ("user-1", 1, 100, "failed"),
+        ("user-2", 1, 0, "success"),
+        ("user-1", 1, 0, None),
+    ])
+
+    assert merged == {"user-1": (2, 100, "failed"), "user-2": (1, 0, "success")}
+
+
+def test_submit_after_stop_fails(writer):
+    """Test that an order submitted to a stopped writer fails instead of waiting forever"""
+    writer.stop()
+
+    with pytest.raises(RuntimeError):
+        writer.submit(make_order("late"), ("user-1", 0, 0, None)).result(timeout=1)
+
+
+def test_write_gives_up_at_the_deadline(monkeypatch):
+    """Test that a write still waiting for its batch is abandoned at the request deadline"""
+    writer = GroupCommitWriter(max_batch_size=8, max_wait=0.3)
+    written = []
+    monkeypatch.setattr(writer, "_write", lambda batch: written.extend(item.order.id for item in batch))
+    writer.start()
+
+    with deadline.deadline_scope(0.05), pytest.raises(deadline.DeadlineExceeded):
+        writer.write(make_order("slow"), ("user-1", 0, 0, None))
+    writer.stop()
+
+    assert written == []
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_claimed_write_outlives_the_deadline(monkeypatch, use_async):
+    """Test that a write already being committed is waited for instead of reported as timed out"""
+    writer = GroupCommitWriter(max_batch_size=1, max_wait=0)
+    written = []
+
+    def slow(batch):
+        time.sleep(0.1)
+        written.extend(item.order.id for item in batch)
+
+    monkeypatch.setattr(writer, "_write", slow)
+    writer.start()
+
+    async def write_async():
+        with deadline.deadline_scope(0.03):
+            await writer.write_async(make_order("claimed"), ("user-1", 0, 0, None))
+
+    if use_async:
+        asyncio.run(write_async())
+    else:
+        with deadline.deadline_scope(0.03):
+            writer.write(make_order("claimed"), ("user-1", 0, 0, None))
+    writer.stop()
+
+    assert written == ["claimed"]
+
+
+def test_connection_error_fails_the_batch_at_once(monkeypatch):
+    """Test that a lost connection fails all orders of a batch without per-row retries"""
+    writer = GroupCommitWriter(max_batch_size=8, max_wait=10)
+    attempts = []
+
+    def lost(batch):
+        attempts.append(len(batch))
+        raise psycopg.OperationalError("server closed the connection unexpectedly")
+
+    monkeypatch.setattr(writer, "_write", lost)
+    writer.start()
+    futures = [writer.submit(make_order(f"order-{i}"), ("user-1", 0, 0, None)) for i in range(3)]
+    writer.stop()
+
+    for future in futures:
+        with pytest.raises(psycopg.OperationalError):
+            future.result(timeout=1)
+    assert attempts == [3]
+
+
+def test_stop_fails_orders_behind_a_stuck_write(monkeypatch):
+    """Test that orders queued behind a write that never returns fail when stop times out"""
+    writer = GroupCommitWriter(max_batch_size=1, max_wait=0)
+    started, release = threading.Event(), threading.Event()
+
+    def stuck(batch):
+        started.set()
+        release.wait()
+
+    monkeypatch.setattr(writer, "_write", stuck)
+    writer.start()
+    first = writer.submit(make_order("stuck"), ("user-1", 0, 0, None))
+    started.wait(timeout=1)
+    queued = writer.submit(make_order("queued"), ("user-1", 0, 0, None))
+
+    writer.stop(timeout=0.1)
+
+    with pytest.raises(RuntimeError):
+        queued.result(timeout=1)
+    release.set()
+    first.result(timeout=1)
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.clients import http
+
+
+def test_run_sync_returns_coroutine_result():
+    """Test that sync shim runs a coroutine on the client loop"""
+    async def answer():
+        return 42
+
+    assert http.run_sync(answer()) == 42
+
+
+def test_get_client_reuses_pool_per_loop():
+    """Test that one loop keeps a single keep-alive pool per upstream"""
+    async def clients():
+        return http.get_client("scooters"), http.get_client("scooters"), http.get_client("payments")
+
+    first, second, payments = http.run_sync(clients())
+
+    assert first is second
+    assert first is not payments
+
+
+def test_get_client_separates_event_loops():
+    """Test that pools are not shared between event loops"""
+    async def client():
+        return http.get_client("users")
+
+    shared = http.run_sync(client())
+    local = asyncio.run(client())
+
+    assert shared is not local
+
+
+def test_upstream_settings_overlay_default():
+    """Test that per-service settings override defaults"""
+    payments = http.upstream_settings("payments")
+    users = http.upstream_settings("users")
+
+    assert payments["max_connections"] == 10
+    assert users["max_connections"] == 20
+    assert payments["keepalive_expiry"] == users["keepalive_expiry"]
@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.repository.db import orders as orders_db
+from app.repository.db import queries
+from app.utils.ids import parse_uuid, uuid7, uuid7_time
+
+
+def test_uuid7_encodes_creation_time():
+    """Test that the creation time is recovered from a UUIDv7 to the millisecond"""
+    at = datetime(2026, 10, 17, 12, 30, 0, 123456, tzinfo=timezone.utc)
+
+    value = uuid7(at)
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert uuid7_time(value) == at.replace(microsecond=123000)
+
+
+def test_uuid7_sorts_by_time():
+    """Test that later ids sort after earlier ones"""
+    at = datetime(2026, 10, 17, tzinfo=timezone.utc)
+
+    assert str(uuid7(at)) < str(uuid7(at + timedelta(milliseconds=1)))
+
+
+def test_legacy_uuid_has_no_time():
+    """Test that UUIDv4 ids fall back to the id-only lookup"""
+    legacy = str(uuid.uuid4())
+
+    assert uuid7_time(uuid.UUID(legacy)) is None
+    name, params = orders_db._get_order_query(legacy)
+    assert "created_at" not in queries.get(name)
+    assert params == {"order_id": uuid.UUID(legacy)}
+
+
+def test_uuid7_lookup_is_time_bounded():
+    """Test that UUIDv7 lookups bound created_at around the id timestamp"""
+    at = datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc)
+
+    name, params = orders_db._get_order_query(str(uuid7(at)))
+
+    assert "created_at" in queries.get(name)
+    assert params["created_from"] <= at < params["created_to"]
+
+
+def test_invalid_id_skips_query():
+    """Test that non-UUID ids never reach the database"""
+    assert parse_uuid("not-a-uuid") is None
+    assert orders_db._get_order_query("not-a-uuid") is None
+    assert orders_db.get_order(None, "not-a-uuid") is None
+
+
+@pytest.mark.parametrize(
+    "order_id", ["ffffffff-ffff-7fff-bfff-ffffffffffff", "FFFFFFFFFFFF7FFFBFFFFFFFFFFFFFFF"]
+)
+def test_out_of_range_uuid7_uses_id_only_lookup(order_id):
+    """Test that a v7 id with a timestamp past datetime.max falls back to the id-only lookup"""
+    assert uuid7_time(parse_uuid(order_id)) is None
+    name, params = orders_db._get_order_query(order_id)
+    assert "created_at" not in queries.get(name)
+    assert params == {"order_id": uuid.UUID(order_id)}
@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+
+from app.repository.db import database
+
+
+class FakeConnection:
+    def cursor(self):
+        return "cursor"
+
+
+@pytest.fixture
+def checkouts(monkeypatch):
+    events = []
+
+    @contextmanager
+    def connection():
+        events.append("checkout")
+        try:
+            yield FakeConnection()
+            events.append("commit")
+        except Exception:
+            events.append("rollback")
+            raise
+
+    monkeypatch.setattr(database, "connection", connection)
+    return events
+
+
+def test_unused_handle_never_checks_out(checkouts):
+    """Test that a request answered without queries does not touch the pool"""
+    with database.lazy_connection() as conn:
+        assert not conn.acquired
+
+    assert checkouts == []
+
+
+def test_first_use_checks_out_once_and_commits(checkouts):
+    """Test that the connection is acquired on first use and committed on exit"""
+    with database.lazy_connection() as conn:
+        assert conn.cursor() == "cursor"
+        assert conn.cursor() == "cursor"
+        assert conn.acquired
+
+    assert checkouts == ["checkout", "commit"]
+
+
+def test_error_rolls_back_acquired_connection(checkouts):
+    """Test that an exception inside the request reaches the connection's rollback"""
+    with pytest.raises(KeyError):
+        with database.lazy_connection() as conn:
+            conn.cursor()
+            raise KeyError("order")
+
+    assert checkouts == ["checkout", "rollback"]
+
+
+class FakeAsyncConnection:
+    @asynccontextmanager
+    async def cursor(self):
+        yield "cursor"
+
+
+def test_async_handle_checks_out_on_first_cursor(monkeypatch):
+    """Test that the async handle acquires a connection only when a cursor is opened"""
+    events = []
+
+    @asynccontextmanager
+    async def async_connection():
+        events.append("checkout")
+        yield FakeAsyncConnection()
+        events.append("commit")
+
+    monkeypatch.setattr(database, "async_connection", async_connection)
+
+    async def request(use_db):
+        async with database.async_lazy_connection() as conn:
+            if use_db:
+                async with conn.cursor() as cur:
+                    assert cur == "cursor"
+
+    asyncio.run(request(use_db=False))
+    assert events == []
+
+    asyncio.run(request(use_db=True))
+    assert events == ["checkout", "commit"]
@@ -0,0 +1,19 @@
+import pytest
+
+from app.metrics import MetricsMiddleware
+
+
+@pytest.mark.parametrize(
+    "path, endpoint",
+    [
+        ("/users/user-42/orders", "/users/{user_id}/orders"),
+        ("/users/8f0c1e2a-0000-4000-8000-000000000000/orders/", "/users/{user_id}/orders"),
+        ("/orders/0191c1de-0000-7000-8000-000000000000/finish", "/orders"),
+        ("/offers", "/offers"),
+    ],
+)
+def test_endpoint_labels_do_not_carry_ids(path, endpoint):
+    """Test that per-user and per-order paths collapse to one label value"""
+    middleware = MetricsMiddleware(app=None)
+
+    assert middleware._normalize_endpoint(path) == endpoint
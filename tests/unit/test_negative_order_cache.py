@@ -0,0 +1,98 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from app.repository.archive import orders as orders_archive
+from app.repository.cache import orders as orders_repo
+from app.repository.db import orders as orders_db
+from app.utils.cache import ShardedTTLCache
+from app.utils.ids import uuid7
+from tests.unit.helpers import make_order
+
+
+def _fresh_caches(monkeypatch):
+    monkeypatch.setattr(orders_repo, "_order_cache", ShardedTTLCache(maxsize=10, ttl=60, shards=1))
+    monkeypatch.setattr(orders_repo, "_missing_cache", ShardedTTLCache(maxsize=10, ttl=60, shards=1))
+
+
+def _count_lookups(monkeypatch, found=None) -> list[str]:
+    lookups = []
+
+    def lookup(conn, order_id):
+        lookups.append(order_id)
+        return found
+
+    monkeypatch.setattr(orders_db, "get_order", lookup)
+    monkeypatch.setattr(orders_db, "get_order_for_read", lookup)
+    monkeypatch.setattr(orders_archive, "find_order", lambda conn, order_id: None)
+    return lookups
+
+
+def test_unknown_order_is_looked_up_once(monkeypatch):
+    """Test that a repeated lookup of a missing order is answered by the negative cache"""
+    _fresh_caches(monkeypatch)
+    lookups = _count_lookups(monkeypatch)
+    order_id = str(uuid7())
+
+    for _ in range(3):
+        assert orders_repo.get_order(object(), order_id, allow_replica=True, allow_archive=True) is None
+    # update paths honour the entry too
+    assert orders_repo.get_order(object(), order_id) is None
+
+    assert lookups == [order_id]
+
+
+def test_partial_lookup_does_not_remember_missing(monkeypatch):
+    """Test that a miss without the archive fallback is not cached, since the order may be archived"""
+    _fresh_caches(monkeypatch)
+    lookups = _count_lookups(monkeypatch)
+    order_id = str(uuid7())
+
+    orders_repo.get_order(object(), order_id)
+    orders_repo.get_order(object(), order_id)
+
+    assert lookups == [order_id, order_id]
+
+
+def test_insert_clears_negative_entry(monkeypatch):
+    """Test that inserting an order drops the negative entry for its id, in both API modes"""
+    _fresh_caches(monkeypatch)
+    _count_lookups(monkeypatch)
+    monkeypatch.setattr(orders_db, "insert_order", lambda conn, order: None)
+
+    async def insert_order_async(conn, order):
+        return None
+
+    monkeypatch.setattr(orders_db, "insert_order_async", insert_order_async)
+    sync_order, async_order = make_order(), make_order()
+    for order in (sync_order, async_order):
+        orders_repo.get_order(object(), order.id, allow_archive=True)
+        assert orders_repo._known_missing(order.id)
+
+    orders_repo.insert_order(object(), sync_order)
+    asyncio.run(orders_repo.insert_order_async(object(), async_order))
+
+    for order in (sync_order, async_order):
+        assert not orders_repo._known_missing(order.id)
+        assert orders_repo.get_order(object(), order.id, allow_archive=True) == order
+
+
+def _lookups(result: str) -> float:
+    return REGISTRY.get_sample_value("order_cache_lookups_total", {"result": result}) or 0.0
+
+
+def test_only_counted_lookups_are_recorded(monkeypatch):
+    """Test that lookups are counted by result only when the caller asks for it"""
+    _fresh_caches(monkeypatch)
+    _count_lookups(monkeypatch)
+    order_id = str(uuid7())
+    before = {result: _lookups(result) for result in ("hit", "miss", "negative")}
+
+    orders_repo.get_order(object(), order_id, allow_replica=True, allow_archive=True, count_lookup=True)
+    orders_repo.get_order(object(), order_id, allow_replica=True, allow_archive=True, count_lookup=True)
+    orders_repo.get_order(object(), order_id, allow_archive=True)
+    orders_repo.get_order(object(), order_id)
+
+    assert _lookups("miss") - before["miss"] == 1
+    assert _lookups("negative") - before["negative"] == 1
+    assert _lookups("hit") == before["hit"]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+
+from app.models import OrderData
+from app.services import orders as orders_service
+from app.utils.ids import uuid7
+
+
+def _row(at: datetime) -> tuple[datetime, OrderData]:
+    order = OrderData(str(uuid7(at)), "user-1", "scooter-1", "zone-1", 10, 50, 300, 0, at, None)
+    return at, order
+
+
+def test_cursor_round_trip():
+    """Test that a page cursor decodes to the keyset of the last order"""
+    created_at, order = _row(datetime(2026, 10, 17, 12, 0, 0, 123456, tzinfo=timezone.utc))
+
+    cursor = orders_service._encode_cursor(created_at, order.id)
+
+    assert orders_service._decode_cursor(cursor) == (created_at, UUID(order.id))
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm9waXBl", "MjAyNi0xMC0xN3xub3QtYS11dWlk"])
+def test_malformed_cursor_is_rejected(cursor):
+    """Test that garbage cursors surface as ValueError (400), not as a DB error"""
+    with pytest.raises(ValueError):
+        orders_service._decode_cursor(cursor)
+
+
+def test_next_cursor_only_when_more_rows():
+    """Test that the extra fetched row decides whether another page exists"""
+    now = datetime.now(timezone.utc)
+    rows = [_row(now - timedelta(minutes=i)) for i in range(3)]
+
+    orders, cursor = orders_service._history_page(rows, limit=2)
+    assert [order.id for order in orders] == [rows[0][1].id, rows[1][1].id]
+    assert orders_service._decode_cursor(cursor)[0] == rows[1][0]
+
+    orders, cursor = orders_service._history_page(rows[:2], limit=2)
+    assert len(orders) == 2 and cursor is None
+
+
+def test_default_window_and_limits():
+    """Test the history window defaults and bounds"""
+    created_from, created_to, limit, after = orders_service._history_page_args(None, None, None, None)
+
+    assert created_to - created_from == orders_service._HISTORY_DEFAULT_WINDOW
+    assert limit == orders_service._HISTORY_DEFAULT_PAGE_SIZE and after is None
+
+    with pytest.raises(ValueError):
+        orders_service._history_page_args(created_to - timedelta(days=365), created_to, None, None)
+    with pytest.raises(ValueError):
+        orders_service._history_page_args(created_to, created_from, None, None)
+    with pytest.raises(ValueError):
+        orders_service._history_page_args(None, None, orders_service._HISTORY_MAX_PAGE_SIZE + 1, None)
@@ -0,0 +1,77 @@
+import uuid
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.models import OrderData
+from app.repository.archive import orders as orders_archive
+from app.repository.db import archive as archive_db
+from app.services import archive as archive_service
+from app.utils.ids import uuid7
+
+
+def test_archive_day_comes_from_the_id():
+    """Test that a UUIDv7 id points at its day file, and at both days right at midnight"""
+    midday = str(uuid7(datetime(2026, 9, 1, 12, tzinfo=timezone.utc)))
+    midnight = str(uuid7(datetime(2026, 9, 2, 0, 0, 0, 500_000, tzinfo=timezone.utc)))
+
+    assert orders_archive._candidate_days(midday) == [date(2026, 9, 1)]
+    assert orders_archive._candidate_days(midnight) == [date(2026, 9, 1), date(2026, 9, 2)]
+    assert orders_archive._candidate_days(str(uuid.uuid4())) == []
+    assert orders_archive._candidate_days("ffffffff-ffff-7fff-bfff-ffffffffffff") == []
+
+
+def test_legacy_ids_use_the_archive_index(monkeypatch):
+    """Test that ids without a timestamp are located through orders_archive_index"""
+    order_id = str(uuid.uuid4())
+    looked_up = []
+    monkeypatch.setattr(orders_archive, "available", lambda: True)
+    monkeypatch.setattr(archive_db, "get_archived_day", lambda conn, oid: date(2020, 1, 1))
+    monkeypatch.setattr(orders_archive, "read_order", lambda day, oid: looked_up.append(day))
+
+    assert orders_archive.find_order(object(), order_id) is None
+    assert looked_up == [date(2020, 1, 1)]
+
+
+def test_mismatched_export_keeps_the_partition(monkeypatch, tmp_path):
+    """Test that a partition is not dropped when the file row count differs"""
+    events = []
+
+    class Conn:
+        def commit(self):
+            events.append("commit")
+
+        def rollback(self):
+            events.append("rollback")
+
+    monkeypatch.setattr(archive_db, "lock_partition", lambda conn, table: None)
+    monkeypatch.setattr(archive_db, "count_rows", lambda conn, table: 10)
+    monkeypatch.setattr(archive_db, "iter_rows", lambda conn, table, size: iter(()))
+    monkeypatch.setattr(archive_db, "drop_partition", lambda conn, table: events.append("drop"))
+    monkeypatch.setattr(orders_archive, "write_day", lambda day, rows, d: (tmp_path / "day.parquet", 9))
+
+    with pytest.raises(RuntimeError):
+        archive_service._archive_partition(Conn(), "orders_p20260901", date(2026, 9, 1), tmp_path)
+
+    assert events == ["rollback"]
+
+
+def test_written_day_is_readable(tmp_path):
+    """Test that an exported day round-trips through a point lookup"""
+    pytest.importorskip("pyarrow")
+    at = datetime(2026, 9, 1, 12, tzinfo=timezone.utc)
+    rows = []
+    for i in range(3):
+        order = OrderData(str(uuid7(at)), f"user-{i}", "scooter-1", "zone-1", 10, 50, 300, 120, at, at)
+        rows.append({**asdict(order), "created_at": at})
+    rows.sort(key=lambda row: row["id"])
+
+    path, written = orders_archive.write_day(at.date(), [rows], tmp_path)
+
+    assert written == 3 and path.exists()
+    found = orders_archive.read_order(at.date(), rows[1]["id"], tmp_path)
+    assert found is not None and found.user_id == rows[1]["user_id"]
+    found = orders_archive.read_order(at.date(), rows[1]["id"].replace("-", "").upper(), tmp_path)
+    assert found is not None and found.id == rows[1]["id"]
+    assert orders_archive.read_order(at.date(), str(uuid7(at)), tmp_path) is None
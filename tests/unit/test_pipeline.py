@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+
+import pytest
+
+from app.repository.db import database
+
+
+class FakeConnection:
+    def __init__(self, events):
+        self.events = events
+
+    @contextmanager
+    def pipeline(self):
+        self.events.append("pipeline")
+        yield
+        self.events.append("sync")
+
+    def execute(self, statement):
+        self.events.append(statement)
+
+    def commit(self):
+        self.events.append("commit")
+
+
+def test_commit_is_sent_inside_the_pipeline():
+    """Test that COMMIT is queued with the writes, before the pipeline syncs"""
+    events = []
+    conn = FakeConnection(events)
+
+    with database.pipeline_transaction(conn):
+        conn.execute("insert")
+        conn.execute("upsert")
+
+    assert events == ["pipeline", "insert", "upsert", "commit", "sync"]
+
+
+def test_failed_block_is_not_committed():
+    """Test that an error in the block skips the commit and propagates"""
+    events = []
+    conn = FakeConnection(events)
+
+    with pytest.raises(RuntimeError):
+        with database.pipeline_transaction(conn):
+            conn.execute("insert")
+            raise RuntimeError("boom")
+
+    assert "commit" not in events
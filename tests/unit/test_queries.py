@@ -0,0 +1,36 @@
+import pytest
+
+from app.repository.db import orders as orders_db  # noqa: F401 (registers the order statements)
+from app.repository.db import queries
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params, prepare=None):
+        self.calls.append((sql, params, prepare))
+        return self
+
+
+def test_hot_statements_are_registered():
+    """Test that the order statements are available by name"""
+    assert {"orders_insert", "orders_get", "orders_get_by_time", "orders_update_finish"} <= set(queries.registered())
+
+
+def test_execute_prepares_statement():
+    """Test that registered statements are executed as prepared statements"""
+    cur = RecordingCursor()
+
+    queries.execute(cur, "orders_get", {"order_id": "x"})
+
+    assert cur.calls == [(queries.get("orders_get"), {"order_id": "x"}, True)]
+
+
+def test_conflicting_registration_is_rejected():
+    """Test that one name cannot silently point at two statements"""
+    queries.register("test_select_one", "SELECT 1")
+    assert queries.register("test_select_one", "SELECT 1") == "test_select_one"
+
+    with pytest.raises(ValueError):
+        queries.register("test_select_one", "SELECT 2")
@@ -0,0 +1,109 @@
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.repository.db import database
+from app.repository.db import orders as orders_db
+from app.utils.ids import uuid7
+from tests.unit.helpers import make_order
+
+
+def _use_replica(monkeypatch, replica_lookup):
+    """Routes replica_connection() to a sentinel and answers get_order() per connection"""
+    replica, primary = object(), object()
+
+    @contextmanager
+    def replica_connection():
+        yield replica
+
+    def get_order(conn, order_id):
+        if conn is replica:
+            return replica_lookup(order_id)
+        assert conn is primary
+        return make_order(order_id)
+
+    monkeypatch.setattr(database, "has_replica", lambda: True)
+    monkeypatch.setattr(database, "replica_connection", replica_connection)
+    monkeypatch.setattr(orders_db, "get_order", get_order)
+    return primary
+
+
+def test_recent_orders_are_not_read_from_replica():
+    """Test that orders younger than the lag tolerance stay on the primary"""
+    fresh = str(uuid7())
+    old = str(uuid7(datetime.now(timezone.utc) - timedelta(minutes=1)))
+
+    assert not orders_db._replica_may_have(fresh)
+    assert orders_db._replica_may_have(old)
+    assert orders_db._replica_may_have(str(uuid.uuid4()))
+    assert not orders_db._replica_may_have("not-a-uuid")
+
+
+def test_out_of_range_uuid7_is_routed_like_a_legacy_id():
+    """Test that a v7 id with an impossible timestamp does not break replica routing"""
+    assert orders_db._replica_may_have("ffffffff-ffff-7fff-bfff-ffffffffffff")
+
+
+def test_replica_hit_skips_primary(monkeypatch):
+    """Test that an order found on the replica is returned without touching the primary"""
+    order_id = str(uuid7(datetime.now(timezone.utc) - timedelta(minutes=1)))
+    replica_order = make_order(order_id)
+    _use_replica(monkeypatch, lambda _: replica_order)
+
+    assert orders_db.get_order_for_read(object(), order_id) is replica_order
+
+
+def test_replica_miss_falls_back_to_primary(monkeypatch):
+    """Test that an order missing on the replica is looked up on the primary"""
+    order_id = str(uuid7(datetime.now(timezone.utc) - timedelta(minutes=1)))
+    primary = _use_replica(monkeypatch, lambda _: None)
+
+    order = orders_db.get_order_for_read(primary, order_id)
+
+    assert order is not None and order.id == order_id
+
+
+def test_replica_error_falls_back_to_primary(monkeypatch):
+    """Test that a failing replica does not fail the read"""
+    order_id = str(uuid.uuid4())
+
+    def broken(_):
+        raise RuntimeError("replica down")
+
+    primary = _use_replica(monkeypatch, broken)
+
+    assert orders_db.get_order_for_read(primary, order_id).id == order_id
+
+
+def test_recent_order_goes_to_primary(monkeypatch):
+    """Test that a fresh order is never looked up on the replica"""
+    order_id = str(uuid7())
+
+    def unexpected(_):
+        raise AssertionError("replica must not be queried")
+
+    primary = _use_replica(monkeypatch, unexpected)
+
+    assert orders_db.get_order_for_read(primary, order_id).id == order_id
+
+
+def test_pool_sessions_use_utc():
+    """Test that primary and replica sessions read timestamps in UTC, like the partition bounds"""
+
+    class FakeConnection:
+        def __init__(self):
+            self.executed = []
+            self.read_only = False
+
+        def execute(self, statement):
+            self.executed.append(statement)
+
+        def commit(self):
+            pass
+
+    primary, replica = FakeConnection(), FakeConnection()
+    database._configure(primary)
+    database._configure_replica(replica)
+
+    assert database.TIME_ZONE_SQL in primary.executed
+    assert database.TIME_ZONE_SQL in replica.executed and replica.read_only
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from app.clients import resilience
+from app.clients.resilience import Bulkhead, CircuitBreaker, UpstreamUnavailable
+
+
+def test_breaker_opens_after_threshold():
+    """Test that consecutive failures open the circuit"""
+    breaker = CircuitBreaker("test-open", failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        probe = breaker.before_call()
+        breaker.record_failure(probe)
+
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(UpstreamUnavailable, match="circuit open"):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count():
+    """Test that a success between failures keeps the circuit closed"""
+    breaker = CircuitBreaker("test-reset", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(breaker.before_call())
+    breaker.record_success(breaker.before_call())
+    breaker.record_failure(breaker.before_call())
+
+    assert breaker.state == resilience.CLOSED
+
+
+def test_breaker_half_open_probe_closes_circuit():
+    """Test that a successful probe after the reset timeout closes the circuit"""
+    breaker = CircuitBreaker("test-probe", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure(breaker.before_call())
+    time.sleep(0.02)
+
+    probe = breaker.before_call()
+    assert probe
+    assert breaker.state == resilience.HALF_OPEN
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    breaker.record_success(probe)
+    assert breaker.state == resilience.CLOSED
+
+
+def test_breaker_failed_probe_reopens_circuit():
+    """Test that a failed probe opens the circuit again"""
+    breaker = CircuitBreaker("test-reopen", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure(breaker.before_call())
+    time.sleep(0.02)
+
+    breaker.record_failure(breaker.before_call())
+
+    assert breaker.state == resilience.OPEN
+
+
+def test_late_success_does_not_close_open_circuit():
+    """Test that a call admitted before the circuit opened cannot close it by succeeding afterwards"""
+    breaker = CircuitBreaker("test-late-success", failure_threshold=1, reset_timeout=0.05)
+    slow = breaker.before_call()
+    breaker.record_failure(breaker.before_call())
+
+    breaker.record_success(slow)
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    probe = breaker.before_call()
+    breaker.record_success(slow)
+    assert breaker.state == resilience.HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == resilience.CLOSED
+
+
+def test_bulkhead_rejects_when_full():
+    """Test that the bulkhead caps concurrent calls without queueing"""
+    bulkhead = Bulkhead("test-bulkhead", max_concurrent=2)
+
+    assert bulkhead.try_acquire()
+    assert bulkhead.try_acquire()
+    assert not bulkhead.try_acquire()
+
+    bulkhead.release()
+    assert bulkhead.try_acquire()
+
+
+def test_guard_releases_probe_of_unfinished_call():
+    """Test that a cancelled probe does not block the next probe"""
+    settings = {"breaker_failure_threshold": 1, "breaker_reset_timeout": 0.01}
+    breaker = resilience.get_breaker("test-guard", settings)
+    breaker.record_failure(breaker.before_call())
+    time.sleep(0.02)
+
+    with pytest.raises(RuntimeError):
+        with resilience.guard("test-guard", settings):
+            raise RuntimeError("cancelled")
+
+    with resilience.guard("test-guard", settings) as outcome:
+        outcome.success()
+    assert breaker.state == resilience.CLOSED
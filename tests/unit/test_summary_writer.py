@@ -0,0 +1,104 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from app.repository.cache import users as users_repo
+from app.repository.db import summary_writer
+from app.repository.db.summary_writer import UserSummaryAggregator
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    aggregator = UserSummaryAggregator(flush_interval=60)
+    aggregator.writes = []
+    aggregator.fail = False
+
+    def write(deltas):
+        if aggregator.fail:
+            raise RuntimeError("db down")
+        aggregator.writes.append(sorted(deltas))
+
+    monkeypatch.setattr(aggregator, "_write", write)
+    return aggregator
+
+
+def test_deltas_are_folded_per_user(aggregator):
+    """Test that many events for one user become a single row in the flush"""
+    for _ in range(3):
+        aggregator.add("user-1", delta_rides=1, delta_debt=10)
+    aggregator.add("user-1", last_payment_status="failed")
+    aggregator.add("user-2", delta_rides=1)
+
+    assert aggregator.flush() == 2
+    assert aggregator.writes == [[("user-1", 3, 30, "failed"), ("user-2", 1, 0, None)]]
+    assert aggregator.flush() == 0
+
+
+def test_failed_flush_keeps_deltas(aggregator):
+    """Test that deltas survive a failed flush and merge with newer ones"""
+    aggregator.add("user-1", delta_rides=1, last_payment_status="success")
+    aggregator.fail = True
+    assert aggregator.flush() == 0
+
+    aggregator.add("user-1", delta_rides=1, delta_debt=5, last_payment_status="failed")
+    aggregator.fail = False
+    aggregator.flush()
+
+    assert aggregator.writes == [[("user-1", 2, 5, "failed")]]
+
+
+def test_stop_flushes_pending(aggregator):
+    """Test that shutdown writes what is still buffered"""
+    aggregator.start()
+    aggregator.add("user-1", delta_rides=1)
+    aggregator.stop()
+
+    assert aggregator.writes == [[("user-1", 1, 0, None)]]
+
+
+def test_update_user_summary_buffers_and_invalidates(aggregator, monkeypatch):
+    """Test that the repository buffers deltas without a DB call and still drops the profile on debt"""
+    invalidated = []
+    monkeypatch.setattr(summary_writer, "_aggregator", aggregator)
+    monkeypatch.setattr(users_repo, "invalidate", invalidated.append)
+
+    users_repo.update_user_summary(None, "user-1", delta_rides=1, delta_debt=10)
+    users_repo.update_user_summary(None, "user-2", last_payment_status="success")
+
+    assert aggregator.pending() == {"user-1": (1, 10, None), "user-2": (0, 0, "success")}
+    assert invalidated == ["user-1"]
+
+
+def test_failed_flush_keeps_at_most_max_pending_users(aggregator):
+    """Test that deltas restored after a failed flush respect the buffer bound and the rest are counted"""
+    aggregator.max_pending_users = 2
+    dropped = REGISTRY.get_sample_value("user_summary_dropped_users_total") or 0.0
+    aggregator.add("user-1", delta_rides=1)
+    aggregator.add("user-3", delta_rides=1)
+
+    aggregator._restore({"user-1": (1, 0, None), "user-2": (1, 0, None), "user-4": (1, 0, None)})
+
+    assert aggregator.pending() == {"user-1": (2, 0, None), "user-3": (1, 0, None)}
+    assert REGISTRY.get_sample_value("user_summary_dropped_users_total") - dropped == 2
+
+
+def test_full_or_stopped_aggregator_turns_deltas_away(aggregator, monkeypatch):
+    """Test that the repository writes the delta itself when the aggregator is full or already stopped"""
+    written = []
+    monkeypatch.setattr(summary_writer, "_aggregator", aggregator)
+    monkeypatch.setattr(
+        users_repo.user_summary_db, "upsert_user_summary", lambda conn, user_id, *delta: written.append(user_id)
+    )
+    aggregator.max_pending_users = 1
+
+    users_repo.update_user_summary(None, "user-1", delta_rides=1)
+    users_repo.update_user_summary(None, "user-1", delta_rides=1)
+    users_repo.update_user_summary(None, "user-2", delta_rides=1)
+    assert aggregator.pending() == {"user-1": (2, 0, None)}
+    assert written == ["user-2"]
+
+    aggregator.start()
+    aggregator.stop()
+    users_repo.update_user_summary(None, "user-3", delta_rides=1)
+
+    assert aggregator.writes == [[("user-1", 2, 0, None)]]
+    assert written == ["user-2", "user-3"]
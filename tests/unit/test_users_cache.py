@@ -0,0 +1,76 @@
+import pytest
+
+from app.models import UserProfile
+from app.repository.cache import users as users_repo
+
+
+def _profile(user_id: str, current_debt: int = 0) -> UserProfile:
+    return UserProfile(
+        id=user_id,
+        has_subscribtion=False,
+        trusted=False,
+        rides_count=1,
+        current_debt=current_debt,
+        total_debt=current_debt,
+        last_payment_status="success",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_users_cache():
+    users_repo._user_cache.clear()
+    users_repo._last_known_cache.clear()
+    yield
+    users_repo._user_cache.clear()
+    users_repo._last_known_cache.clear()
+
+
+def test_profile_is_cached(monkeypatch):
+    """Test that repeat lookups do not call the users service"""
+    calls = []
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", lambda user_id: calls.append(user_id) or _profile(user_id))
+
+    users_repo.get_user_profile("user-1")
+    users_repo.get_user_profile("user-1")
+
+    assert calls == ["user-1"]
+
+
+def test_last_known_profile_served_on_failure(monkeypatch):
+    """Test that a failing users service falls back to the last known profile"""
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", lambda user_id: _profile(user_id))
+    users_repo.get_user_profile("user-1")
+    users_repo._user_cache.clear()
+
+    def failing(user_id):
+        raise TimeoutError("users too slow")
+
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", failing)
+
+    assert users_repo.get_user_profile("user-1").id == "user-1"
+
+
+def test_failure_without_known_profile_raises(monkeypatch):
+    """Test that there is nothing to degrade to for an unseen user"""
+    def failing(user_id):
+        raise TimeoutError("users too slow")
+
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", failing)
+
+    with pytest.raises(TimeoutError):
+        users_repo.get_user_profile("user-1")
+
+
+def test_debt_change_invalidates_profile(monkeypatch):
+    """Test that recording debt forces the next lookup to refetch"""
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", lambda user_id: _profile(user_id))
+    monkeypatch.setattr(users_repo.user_summary_db, "upsert_user_summary", lambda *args: None)
+    users_repo.get_user_profile("user-1")
+
+    users_repo.update_user_summary(None, "user-1", delta_rides=1, delta_debt=0)
+    assert users_repo._user_cache.get("user-1") is not None
+
+    users_repo.update_user_summary(None, "user-1", delta_rides=0, delta_debt=500)
+    monkeypatch.setattr(users_repo.dr, "get_user_profile", lambda user_id: _profile(user_id, current_debt=500))
+
+    assert users_repo.get_user_profile("user-1").current_debt == 500
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.models import TariffZone
+from app.repository.cache import zones as zones_repo
+
+
+def _zone(zone_id: str) -> TariffZone:
+    return TariffZone(id=zone_id, price_per_minute=12, price_unlock=45, default_deposit=300)
+
+
+@pytest.fixture(autouse=True)
+def clear_zone_cache():
+    zones_repo._zone_cache.clear()
+    yield
+    zones_repo._zone_cache.clear()
+
+
+def test_bulk_lookup_fetches_only_missing_zones(monkeypatch):
+    """Test that cached zones are not requested again in a batch call"""
+    calls = []
+
+    async def get_tariff_zones_async(zone_ids):
+        calls.append(list(zone_ids))
+        return {zone_id: _zone(zone_id) for zone_id in zone_ids}
+
+    monkeypatch.setattr(zones_repo.dr, "get_tariff_zones_async", get_tariff_zones_async)
+    zones_repo._zone_cache.set("korolev", _zone("korolev"))
+
+    zones = asyncio.run(zones_repo.get_tariff_zones_async(["korolev", "mytishchi", "korolev"]))
+
+    assert set(zones) == {"korolev", "mytishchi"}
+    assert calls == [["mytishchi"]]
+    assert zones_repo._zone_cache.get("mytishchi") is not None